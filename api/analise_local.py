@@ -0,0 +1,64 @@
+from prompts import ROTULOS_CAMPOS
+
+# Ação sugerida quando o campo puxa a probabilidade para baixo
+ACOES_POR_CAMPO = {
+    "duracao_meses": "Divida o projeto em fases curtas, com entregas a cada 2-3 meses",
+    "orcamento": "Revise o orçamento frente ao escopo e reserve 10-15% para contingência",
+    "tamanho_equipe": "Ajuste o tamanho da equipe: times de 5 a 15 pessoas coordenam melhor",
+    "recursos_disponiveis": "Garanta pessoas, ferramentas e infraestrutura antes do início",
+    "complexidade": "Valide os pontos técnicos críticos com protótipos e reduza o escopo inicial",
+    "experiencia_gerente": "Apoie o gerente com mentoria ou acompanhamento do PMO",
+    "tipo_projeto": "Compare com projetos do mesmo tipo e adote as práticas que funcionaram"
+}
+
+
+UNIDADES = {"duracao_meses": "meses", "tamanho_equipe": "pessoas", "experiencia_gerente": "anos"}
+
+
+def _valor(project, campo):
+    valor = getattr(project, campo)
+    if campo == "orcamento":
+        return f"R$ {valor:,.0f}"
+    return f"{valor} {UNIDADES[campo]}" if campo in UNIDADES else valor
+
+
+def analise_local(project, prediction):
+    """Análise por regras, sem LLM, a partir da previsão e das contribuições de cada campo.
+
+    Segue as seções pedidas ao LLM (fatores, recomendações, referência,
+    próximos passos) e custa microssegundos: é a resposta de
+    /analyze-with-llm quando o LLM está lento ou fora do ar.
+    """
+    p = prediction.probabilidade_sucesso
+    base = prediction.probabilidade_media_modelo
+    ordenadas = sorted(prediction.contribuicoes.items(), key=lambda item: abs(item[1]), reverse=True)
+    riscos = [(campo, valor) for campo, valor in ordenadas if valor < -0.01]
+    forcas = [(campo, valor) for campo, valor in ordenadas if valor > 0.01]
+
+    linhas = ["📏 Análise automática por regras (LLM indisponível no momento)", "", "1) Principais fatores"]
+    for campo, valor in (riscos[:3] + forcas[:2]) or ordenadas[:3]:
+        efeito = "reduz" if valor < 0 else "aumenta"
+        linhas.append(f"• {ROTULOS_CAMPOS[campo]} ({_valor(project, campo)}) {efeito} a chance em {abs(valor) * 100:.1f} p.p.")
+
+    linhas += ["", "2) Recomendações"]
+    acoes = [ACOES_POR_CAMPO[campo] for campo, _ in riscos[:3]]
+    acoes += [r for r in prediction.recomendacoes if not r.startswith("🎉")]
+    linhas += [f"• {acao}" for acao in acoes] or ["• Mantenha o plano atual: nenhum fator relevante puxa a previsão para baixo"]
+
+    linhas += ["", "3) Referência",
+               f"• Média do modelo: {base:.0%} de sucesso; este projeto: {p:.0%} ({(p - base) * 100:+.1f} p.p.)"]
+    usuario = prediction.usuario
+    if usuario is not None:
+        linhas.append(f"• Histórico do responsável: {usuario.historico_projetos} projetos, "
+                      f"{usuario.sucesso_medio:g}% de sucesso médio")
+
+    linhas += ["", "4) Próximos passos"]
+    if p < 0.4:
+        linhas.append("• Reavalie escopo, prazo e recursos antes de aprovar o projeto")
+    elif p < 0.7:
+        linhas.append("• Ataque os dois maiores riscos acima e simule as mudanças em /what-if")
+    else:
+        linhas.append("• Siga o plano e acompanhe os marcos mensalmente")
+    if riscos:
+        linhas.append(f"• Defina um responsável e um indicador para {ROTULOS_CAMPOS[riscos[0][0]].lower()}")
+    return "\n".join(linhas)
@@ -1,29 +1,124 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+from typing import Dict, List, Optional, Union
 import sys
 import os
-import joblib
 import numpy as np
-import pandas as pd
 import json
-from openai import OpenAI
+import asyncio
+import hashlib
+import math
+import time
 from dotenv import load_dotenv
 
+
 load_dotenv('../.env')
 
+sys.path.append("../ml_model")
+
+from analise_local import analise_local
+from cache import DiskBackend, TTLCache
+from circuit_breaker import CircuitoAberto
+from inference import DistilledPredictor
+from llm_client import LLMClient
+from metrics import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram, MetricsMiddleware
+from model_registry import ModelRegistry
+from model_store import CategoriaDesconhecida, load_served_model, normalizar_categoria
+from prompts import LIMITES_SAIDA, contar_tokens_mensagens, mensagens_analise
+from user_store import UserStore
+from what_if import CAMPOS_INTEIROS, FEATURES_POR_CAMPO, Eixo, GradeMuitoGrande, avaliar_grade
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+CAMPO_POR_FEATURE = {feature: campo for campo, feature in FEATURES_POR_CAMPO.items()}
 
-sys.path.append("../ml_model")
+# Diretório dos artefatos do modelo (bundle ou arquivos legados)
+MODEL_DIR = os.getenv("MODEL_DIR", "../ml_model/data")
+# Diretório de usuários, indexado em memória e relido incrementalmente quando o arquivo muda
+USERS_DATA_PATH = os.getenv("USERS_DATA_PATH", "../ml_model/data/users_data.csv")
+USERS_MAX_POR_PAGINA = 100
+# Carregar o modelo no startup de cada worker em vez de no primeiro request
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0") == "1"
+# Servir o modelo destilado do bundle (com fallback para a floresta nos casos incertos)
+MODEL_SERVE_STUDENT = os.getenv("MODEL_SERVE_STUDENT", "1") == "1"
+# Troca do modelo sem reiniciar: artefatos de MODEL_DIR conferidos a cada N segundos (0 desliga)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+# Avaliação em sombra do modelo novo antes da troca: fração de /predict (0 desliga),
+# previsões ou segundos até a decisão, concordância mínima com o modelo atual e
+# amostras mínimas para medi-la (com menos, o modelo novo é rejeitado)
+MODEL_SHADOW_FRACTION = float(os.getenv("MODEL_SHADOW_FRACTION", "0"))
+MODEL_SHADOW_SAMPLES = int(os.getenv("MODEL_SHADOW_SAMPLES", "500"))
+MODEL_SHADOW_MAX_S = float(os.getenv("MODEL_SHADOW_MAX_S", "300"))
+MODEL_SHADOW_MIN_AGREEMENT = float(os.getenv("MODEL_SHADOW_MIN_AGREEMENT", "0"))
+MODEL_SHADOW_MIN_SAMPLES = int(os.getenv("MODEL_SHADOW_MIN_SAMPLES", "50"))
+
+# Servidor: com API_WORKERS > 1 o uvicorn sobe N processos; todos mapeiam o
+# mesmo bundle em memória, então os arrays da floresta são compartilhados
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# Tamanho máximo de cada bloco processado em /predict/batch (memória limitada)
+BATCH_MAX_CHUNK_SIZE = int(os.getenv("BATCH_MAX_CHUNK_SIZE", "1000"))
+# /what-if: valores por campo e variantes distintas (após a deduplicação) por pedido
+WHATIF_MAX_VALORES_CAMPO = int(os.getenv("WHATIF_MAX_VALORES_CAMPO", "10000"))
+WHATIF_MAX_VARIANTES = int(os.getenv("WHATIF_MAX_VARIANTES", "200000"))
+
+# Prazo de /analyze-with-llm para a resposta do LLM, contado desde a chegada da requisição;
+# estourado, a resposta sai com a análise local por regras
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "15"))
+# No streaming, prazo para o primeiro token (depois dele vale LLM_TIMEOUT para a resposta inteira)
+LLM_FIRST_TOKEN_DEADLINE = float(os.getenv("LLM_FIRST_TOKEN_DEADLINE", "5"))
+# Versão do prompt de /analyze-with-llm; alterar o texto do prompt (prompts.py) ou os campos de ml_prediction invalida o cache
+PROMPT_VERSION = "v5"
+# Cache de respostas de /analyze-with-llm
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+# Linhas no arquivo do cache em disco (purga das expiradas e do excesso periódica)
+LLM_CACHE_DISK_MAX_ROWS = int(os.getenv("LLM_CACHE_DISK_MAX_ROWS", "100000"))
+# Memo LRU de /predict e tabela pré-calculada opcional (orçamentos separados por vírgula)
+PREDICT_MEMO_SIZE = int(os.getenv("PREDICT_MEMO_SIZE", "4096"))
+# Micro-batching de /predict: previsões concorrentes agrupadas em uma chamada
+# vetorizada (até N linhas ou espera máxima em ms); tamanho 1 desliga
+PREDICT_MICROBATCH_SIZE = int(os.getenv("PREDICT_MICROBATCH_SIZE", "1"))
+PREDICT_MICROBATCH_WAIT_MS = float(os.getenv("PREDICT_MICROBATCH_WAIT_MS", "1"))
+PREDICT_TABLE_BUDGETS = [float(v) for v in os.getenv("PREDICT_TABLE_BUDGETS", "").split(",") if v.strip()]
+
+# Região "comum" das features inteiras para a tabela: faixas de create_project_data()
+REGIAO_INTEIRAS = {
+    "duracao_meses": range(3, 24),
+    "tamanho_equipe": range(3, 25),
+    "experiencia_gerente": range(1, 20)
+}
 
 app = FastAPI(
     title="Project Success Prediction API",
     description="API para prever sucesso de projetos com ML + LLM",
     version="1.0.0"
 )
+app.add_middleware(MetricsMiddleware, rotas=app.routes)
+
+def _json_finito(valor):
+    """NaN e infinito como texto: o JSON da resposta não os representa"""
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return str(valor)
+    if isinstance(valor, dict):
+        return {chave: _json_finito(v) for chave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_json_finito(v) for v in valor]
+    return valor
+
+@app.exception_handler(RequestValidationError)
+async def erro_validacao(request: Request, exc: RequestValidationError):
+    """O 422 padrão do FastAPI, que ecoa o valor recebido e falharia com NaN no corpo"""
+    return JSONResponse(status_code=422, content={"detail": _json_finito(jsonable_encoder(exc.errors()))})
 
 class ProjectData(BaseModel):
+    # NaN e infinito (aceitos pelo json.loads) viram 422: as árvores e o memo não os tratam igual
+    model_config = ConfigDict(allow_inf_nan=False)
+    
     duracao_meses: int
     orcamento: float
     tamanho_equipe: int
@@ -31,32 +126,189 @@ class ProjectData(BaseModel):
     complexidade: str
     experiencia_gerente: int
     tipo_projeto: str
+    # Responsável pelo projeto (opcional); o histórico dele entra na resposta e na análise LLM
+    usuario_id: Optional[int] = None
+    
+    @field_validator("usuario_id")
+    @classmethod
+    def usuario_existente(cls, usuario_id):
+        if usuario_id is None:
+            return usuario_id
+        try:
+            usuario = usuarios.get(usuario_id)
+        except OSError:
+            # Exceção fora de ValueError escaparia do pydantic como 500
+            raise ValueError(f"cadastro de usuários indisponível; não foi possível verificar o usuário {usuario_id}")
+        if usuario is None:
+            raise ValueError(f"usuário {usuario_id} não encontrado")
+        return usuario_id
+
+class Usuario(BaseModel):
+    usuario_id: int
+    nome: str
+    cargo: str
+    historico_projetos: int
+    experiencia_anos: int
+    sucesso_medio: float
+
+class UsuariosResponse(BaseModel):
+    total: int
+    pagina: int
+    por_pagina: int
+    usuarios: List[Usuario]
 
 class PredictionResponse(BaseModel):
     sucesso_previsto: bool
     probabilidade_sucesso: float
     confianca: str
     recomendacoes: List[str]
+    # Explicação da previsão: probabilidade_media_modelo + soma das contribuições = probabilidade_sucesso
+    probabilidade_media_modelo: float
+    contribuicoes: Dict[str, float]
+    usuario: Optional[Usuario] = None
+
+class FaixaValores(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+    
+    minimo: float
+    maximo: float
+    passo: float
+
+class WhatIfRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+    
+    projeto: ProjectData
+    # Campo -> lista de valores ou faixa {minimo, maximo, passo}
+    variacoes: Dict[str, Union[FaixaValores, List[Union[float, str]]]]
+    top_n: int = 10
+
+class WhatIfVariante(BaseModel):
+    alteracoes: Dict[str, dict]
+    probabilidade_sucesso: float
+    ganho: float
+    sucesso_previsto: bool
+
+class WhatIfResponse(BaseModel):
+    probabilidade_base: float
+    sucesso_previsto_base: bool
+    variantes_solicitadas: int
+    variantes_avaliadas: int
+    melhores: List[WhatIfVariante]
+    por_campo: Dict[str, Optional[WhatIfVariante]]
 
 class LLMAnalysisResponse(BaseModel):
     ml_prediction: dict
     llm_analysis: str
     combined_insights: str
+    # "llm" ou "local" (análise por regras, quando o LLM falhou, estourou o prazo ou está com o circuito aberto)
+    fonte: str = "llm"
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse para geradores que consomem o próprio corpo da requisição.
+
+    A versão padrão escuta desconexões em paralelo e disputa as mensagens do
+    corpo com o gerador; aqui a desconexão chega ao gerador via request.stream().
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+# Cliente LLM assíncrono (criado sob demanda, pool de conexões compartilhado)
+llm = LLMClient()
+llm_cache = TTLCache(
+    maxsize=LLM_CACHE_SIZE,
+    ttl=LLM_CACHE_TTL,
+    backend=DiskBackend(LLM_CACHE_PATH, max_linhas=LLM_CACHE_DISK_MAX_ROWS) if LLM_CACHE_PATH else None
+)
+
+
+# Usuários lidos do CSV no primeiro acesso
+usuarios = UserStore(USERS_DATA_PATH)
+
+# Métricas de /predict por estágio; as séries filhas ficam prontas para o caminho quente
+PREDICT_STAGE = Histogram("predict_stage_seconds", "Duração de cada estágio da previsão", ("mode", "stage"))
+ESTAGIO_ENCODING = PREDICT_STAGE.labels("single", "encoding")
+ESTAGIO_MEMO = PREDICT_STAGE.labels("single", "memo")
+ESTAGIO_MODELO = PREDICT_STAGE.labels("single", "model")
+ESTAGIO_RESPOSTA = PREDICT_STAGE.labels("single", "response")
+ESTAGIO_LOTE_ENCODING = PREDICT_STAGE.labels("batch", "encoding")
+ESTAGIO_LOTE_MODELO = PREDICT_STAGE.labels("batch", "model")
+ESTAGIO_LOTE_RESPOSTA = PREDICT_STAGE.labels("batch", "response")
+PREDICT_BATCH_ROWS = Counter("predict_batch_rows_total", "Linhas previstas em lote")
+TOKENS_PROMPT_ANALISE = Histogram("llm_prompt_tokens_estimated", "Tokens do prompt de análise, contados localmente",
+                                  buckets=(100, 200, 300, 400, 600, 800, 1200, 1600, 3200))
 
-# Carregar modelo
-try:
-    model = joblib.load("../ml_model/data/trained_model.pkl")
-    le_recursos = joblib.load("../ml_model/data/le_recursos.pkl")
-    le_complexidade = joblib.load("../ml_model/data/le_complexidade.pkl")
-    le_tipo = joblib.load("../ml_model/data/le_tipo.pkl")
+def _stats_caches():
+    """Estatísticas dos caches lidas no scrape de /metrics"""
+    caches = {"llm": llm_cache.stats()}
+    modelo = registro.atual
+    if modelo is not None:
+        memo = modelo.memo.stats()
+        # Acertos na tabela pré-calculada contam como acertos do memo
+        caches["predict_memo"] = dict(memo, hits=memo["hits"] + memo["table_hits"])
+    return caches
+
+Counter("cache_hits_total", "Acertos por cache", ("cache",),
+        funcao=lambda: {(nome, ): s["hits"] for nome, s in _stats_caches().items()})
+Counter("cache_misses_total", "Falhas por cache", ("cache",),
+        funcao=lambda: {(nome, ): s["misses"] for nome, s in _stats_caches().items()})
+Gauge("cache_size", "Entradas em cada cache", ("cache",),
+      funcao=lambda: {(nome, ): s["size"] for nome, s in _stats_caches().items()})
+Gauge("cache_hit_ratio", "Taxa de acerto de cada cache", ("cache",),
+      funcao=lambda: {(nome, ): s["hits"] / max(s["hits"] + s["misses"], 1) for nome, s in _stats_caches().items()})
+Gauge("llm_requests_in_flight", "Chamadas ao LLM em andamento", funcao=lambda: llm.in_flight)
+Gauge("llm_circuit_open", "1 com o circuito do LLM aberto", funcao=lambda: int(llm.breaker.aberto))
+Counter("llm_circuit_opened_total", "Aberturas do circuito do LLM", funcao=lambda: llm.breaker.aberturas)
+LLM_FALLBACKS = Counter("llm_fallback_total", "Análises respondidas pelas regras locais, por motivo", ("reason",))
+Counter("predictor_answers_total", "Previsões respondidas pelo aluno destilado ou pela floresta", ("source",),
+        funcao=lambda: {} if not isinstance(getattr(registro.atual, "predictor", None), DistilledPredictor) else {
+            ("student", ): registro.atual.predictor.student_hits,
+            ("teacher", ): registro.atual.predictor.fallbacks
+        })
+Counter("model_swaps_total", "Trocas do modelo servido sem reiniciar", funcao=lambda: registro.trocas)
+Counter("model_rejected_total", "Modelos novos rejeitados na avaliação em sombra", funcao=lambda: registro.rejeitados)
+Gauge("model_shadow_samples", "Previsões do candidato em sombra", funcao=lambda: (registro.sombra or {}).get("amostras", 0))
+Gauge("model_shadow_agreement", "Concordância de classe entre o candidato em sombra e o modelo atual",
+      funcao=lambda: {} if not (registro.sombra or {}).get("amostras") else
+      registro.sombra["concordantes"] / registro.sombra["amostras"])
+
+def montar_modelo():
+    """Carrega e aquece um modelo de MODEL_DIR; roda também fora do event loop (recarga)"""
+    m = load_served_model(
+        MODEL_DIR, memo_size=PREDICT_MEMO_SIZE, serve_student=MODEL_SERVE_STUDENT,
+        batch_max_size=PREDICT_MICROBATCH_SIZE, batch_max_wait=PREDICT_MICROBATCH_WAIT_MS / 1000
+    )
     
-    with open("../ml_model/data/model_metadata.json", "r") as f:
-        metadata = json.load(f)
+    if PREDICT_TABLE_BUDGETS:
+        regiao = dict(REGIAO_INTEIRAS)
+        regiao["orcamento"] = PREDICT_TABLE_BUDGETS
+        regiao["recursos_encoded"] = range(len(m.encoders["recursos_disponiveis"].classes_))
+        regiao["complexidade_encoded"] = range(len(m.encoders["complexidade"].classes_))
+        regiao["tipo_encoded"] = range(len(m.encoders["tipo_projeto"].classes_))
+        n_linhas = m.memo.precompute(regiao)
+        print(f"📋 Tabela de previsões pré-calculada: {n_linhas} combinações")
     
-    print("✅ Modelo carregado com sucesso!")
-except Exception as e:
-    print(f"❌ Erro ao carregar modelo: {e}")
-    model = None
+    # A primeira previsão depois da troca não paga a montagem das tabelas
+    m.aquecer()
+    print(f"✅ Modelo carregado com sucesso! (versão {m.version})")
+    return m
+
+# Modelo servido: carregado sob demanda no primeiro uso e trocado quando os artefatos mudam
+registro = ModelRegistry(
+    montar_modelo, MODEL_DIR, intervalo=MODEL_WATCH_INTERVAL, fracao_sombra=MODEL_SHADOW_FRACTION,
+    amostras_sombra=MODEL_SHADOW_SAMPLES, sombra_max_s=MODEL_SHADOW_MAX_S,
+    concordancia_minima=MODEL_SHADOW_MIN_AGREEMENT, amostras_minimas=MODEL_SHADOW_MIN_SAMPLES
+)
+
+def carregar_modelo():
+    """Modelo atual (carregado na primeira chamada); retorna None se indisponível"""
+    return registro.obter()
+
+def modelo_ou_erro():
+    """Modelo carregado ou HTTP 500 se não for possível carregá-lo"""
+    m = carregar_modelo()
+    if m is None:
+        raise HTTPException(status_code=500, detail="Modelo não carregado")
+    return m
 
 @app.get("/")
 async def root():
@@ -69,119 +321,587 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    m = carregar_modelo()
     return {
-        "status": "healthy" if model is not None else "unhealthy",
-        "model_loaded": model is not None,
-        "llm_available": bool(os.getenv("OPENAI_API_KEY"))
+        "status": "healthy" if m is not None else "unhealthy",
+        "model_loaded": m is not None,
+        "model_version": m.version if m is not None else None,
+        "predictor": m.predictor.stats() if m is not None else None,
+        "model_registry": registro.stats(),
+        "llm_available": llm.available,
+        "llm_in_flight": llm.in_flight,
+        "llm_circuit": llm.breaker.stats(),
+        "llm_cache": llm_cache.stats(),
+        "predict_memo": m.memo.stats() if m is not None else None,
+        "predict_microbatch": m.batcher.stats() if m is not None else None,
+        "usuarios": stats_usuarios()
     }
 
+def cadastro_indisponivel(e: OSError) -> HTTPException:
+    return HTTPException(status_code=503, detail=f"Cadastro de usuários indisponível: {e}")
+
+def usuario_por_id(usuario_id: int) -> Optional[dict]:
+    """Usuário do cadastro ou None; HTTP 503 se o CSV de usuários não puder ser lido"""
+    try:
+        return usuarios.get(usuario_id)
+    except OSError as e:
+        raise cadastro_indisponivel(e)
+
+def stats_usuarios():
+    try:
+        return usuarios.stats()
+    except OSError:
+        return None  # CSV de usuários ausente
+
+@app.get("/metrics")
+async def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/users", response_model=UsuariosResponse)
+async def listar_usuarios(busca: str = "", pagina: int = 1, por_pagina: int = 20):
+    """Usuários paginados; com busca, os que têm alguma palavra do nome começando pelo texto"""
+    por_pagina = max(1, min(por_pagina, USERS_MAX_POR_PAGINA))
+    pagina = max(pagina, 1)
+    try:
+        encontrados, total = usuarios.buscar(busca, pagina=pagina, por_pagina=por_pagina)
+    except OSError as e:
+        raise cadastro_indisponivel(e)
+    return UsuariosResponse(total=total, pagina=pagina, por_pagina=por_pagina, usuarios=encontrados)
+
+@app.get("/users/{usuario_id}", response_model=Usuario)
+async def obter_usuario(usuario_id: int):
+    usuario = usuario_por_id(usuario_id)
+    if usuario is None:
+        raise HTTPException(status_code=404, detail=f"Usuário {usuario_id} não encontrado")
+    return usuario
+
+def usuario_do_projeto(project: ProjectData) -> Optional[Usuario]:
+    """Registro do responsável pelo projeto, se informado"""
+    if project.usuario_id is None:
+        return None
+    usuario = usuario_por_id(project.usuario_id)
+    return Usuario(**usuario) if usuario is not None else None
+
+def gerar_recomendacoes(project: ProjectData, probabilidade: float, usuario: Optional[Usuario] = None) -> List[str]:
+    """Recomendações baseadas em regras para um projeto"""
+    recomendacoes = []
+    if probabilidade < 0.6:
+        if usuario is not None and usuario.sucesso_medio < 70:
+            recomendacoes.append("📚 Histórico do responsável abaixo de 70% de sucesso: revise as lições dos projetos anteriores")
+        if project.duracao_meses > 18:
+            recomendacoes.append("⏰ Considere reduzir duração para 12-15 meses")
+        if project.orcamento < 500000:
+            recomendacoes.append("💰 Orçamento pode estar baixo")
+        if project.tamanho_equipe > 20:
+            recomendacoes.append("👥 Equipe muito grande pode gerar overhead")
+        if project.recursos_disponiveis == "Baixo":
+            recomendacoes.append("🔧 Recursos insuficientes são críticos")
+        if project.experiencia_gerente < 5:
+            recomendacoes.append("🎓 Considere mentoria para o gerente")
+    else:
+        recomendacoes.append("🎉 Excelente! Projeto com alta probabilidade de sucesso")
+    return recomendacoes
+
+def campos_do_modelo(m) -> List[str]:
+    """Campo do ProjectData de cada feature, na ordem das colunas do modelo"""
+    return [CAMPO_POR_FEATURE[nome] for nome in m.metadata['features']]
+
+def montar_resposta(project: ProjectData, probabilidade: float, predicao, explicacao, campos: List[str]) -> PredictionResponse:
+    """Monta a resposta de previsão a partir da probabilidade e da explicação (base, contribuições)"""
+    base, contribuicoes = explicacao
+    usuario = usuario_do_projeto(project)
+    return PredictionResponse(
+        sucesso_previsto=bool(predicao),
+        probabilidade_sucesso=float(probabilidade),
+        confianca="Alta" if abs(probabilidade - 0.5) > 0.3 else "Média",
+        recomendacoes=gerar_recomendacoes(project, probabilidade, usuario),
+        probabilidade_media_modelo=base,
+        contribuicoes=dict(zip(campos, contribuicoes)),
+        usuario=usuario
+    )
+
+def erro_categoria(e: CategoriaDesconhecida, loc: Optional[list] = None) -> HTTPException:
+    """HTTP 422 no formato dos erros de validação do FastAPI"""
+    if loc is None:
+        loc = ["body"] + ([e.indice] if e.indice is not None else []) + [e.campo]
+    return HTTPException(status_code=422, detail=[{
+        "loc": loc,
+        "msg": str(e),
+        "type": "categoria_desconhecida",
+        "input": e.valor,
+        "opcoes": e.opcoes
+    }])
+
+def codificar_categorias(project: ProjectData, m) -> dict:
+    """Códigos das categorias de um projeto; os campos passam para a grafia canônica ("medio" -> "Médio")"""
+    codigos = {}
+    for campo, encoder in m.encoders.items():
+        valor = getattr(project, campo)
+        codigo = encoder.encode(valor)
+        if encoder.classes_[codigo] != valor:
+            setattr(project, campo, encoder.classes_[codigo])
+        codigos[campo] = codigo
+    return codigos
+
+def codificar_lote(projects: List[ProjectData], m) -> dict:
+    """Códigos de cada coluna categórica de um lote, com a mesma canonização"""
+    codigos = {}
+    for campo, encoder in m.encoders.items():
+        valores = [getattr(p, campo) for p in projects]
+        codigos[campo] = encoder.transform(valores)
+        canonicos = encoder.classes_[codigos[campo]].tolist()
+        if canonicos != valores:
+            for project, canonico in zip(projects, canonicos):
+                setattr(project, campo, canonico)
+    return codigos
+
+def predict_projects_batch(projects: List[ProjectData]) -> List[PredictionResponse]:
+    """Prevê um lote de projetos com uma única passada pela floresta"""
+    if not projects:
+        return []
+    m = modelo_ou_erro()
+    
+    # Encoding em lote (uma tabela de códigos por coluna categórica)
+    inicio = time.perf_counter()
+    codigos = codificar_lote(projects, m)
+    
+    colunas = {
+        "duracao_meses": [p.duracao_meses for p in projects],
+        "orcamento": [p.orcamento for p in projects],
+        "tamanho_equipe": [p.tamanho_equipe for p in projects],
+        "recursos_encoded": codigos["recursos_disponiveis"],
+        "complexidade_encoded": codigos["complexidade"],
+        "experiencia_gerente": [p.experiencia_gerente for p in projects],
+        "tipo_encoded": codigos["tipo_projeto"]
+    }
+    features = np.column_stack([colunas[nome] for nome in m.metadata['features']]).astype(np.float32)
+    t_encoding = time.perf_counter()
+    
+    # Previsão: classe derivada da probabilidade (mesmo critério de model.predict)
+    probabilidades, bases, contribuicoes = m.predictor.explicar(features)
+    predicoes = m.predictor.classes[np.argmax(probabilidades, axis=1)]
+    t_modelo = time.perf_counter()
+    
+    campos = campos_do_modelo(m)
+    respostas = [
+        montar_resposta(project, probabilidades[i][1], predicoes[i], explicacao, campos)
+        for i, (project, explicacao) in enumerate(zip(projects, zip(bases.tolist(), contribuicoes.tolist())))
+    ]
+    ESTAGIO_LOTE_ENCODING.observe(t_encoding - inicio)
+    ESTAGIO_LOTE_MODELO.observe(t_modelo - t_encoding)
+    ESTAGIO_LOTE_RESPOSTA.observe(time.perf_counter() - t_modelo)
+    PREDICT_BATCH_ROWS.inc(len(projects))
+    return respostas
+
+def _validar_bloco(itens: list) -> List[ProjectData]:
+    return [ProjectData(**item) for item in itens]
+
+def _predict_chunk(chunk: List[ProjectData], inicio: int) -> List[PredictionResponse]:
+    try:
+        return predict_projects_batch(chunk)
+    except CategoriaDesconhecida as e:
+        # Posição do projeto no pedido inteiro, não no bloco
+        e.indice += inicio
+        raise
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_project_success(project: ProjectData):
-    if model is None:
-        raise HTTPException(status_code=500, detail="Modelo não carregado")
-    
+    return await prever_projeto(project, modelo_ou_erro())
+
+async def prever_projeto(project: ProjectData, m) -> PredictionResponse:
+    """Previsão de um projeto com o modelo m (o mesmo do início ao fim da requisição)"""
     try:
         # Encoding
-        recursos_encoded = le_recursos.transform([project.recursos_disponiveis])[0]
-        complexidade_encoded = le_complexidade.transform([project.complexidade])[0]
-        tipo_encoded = le_tipo.transform([project.tipo_projeto])[0]
+        inicio = time.perf_counter()
+        codigos = codificar_categorias(project, m)
         
         # Features
         features_dict = {
             "duracao_meses": project.duracao_meses,
             "orcamento": project.orcamento,
             "tamanho_equipe": project.tamanho_equipe,
-            "recursos_encoded": recursos_encoded,
-            "complexidade_encoded": complexidade_encoded,
+            "recursos_encoded": codigos["recursos_disponiveis"],
+            "complexidade_encoded": codigos["complexidade"],
             "experiencia_gerente": project.experiencia_gerente,
-            "tipo_encoded": tipo_encoded
+            "tipo_encoded": codigos["tipo_projeto"]
         }
         
-        features = pd.DataFrame([features_dict])
+        t_encoding = time.perf_counter()
+        ESTAGIO_ENCODING.observe(t_encoding - inicio)
         
-        # Previsão
-        probabilidade = model.predict_proba(features)[0][1]
-        predicao = model.predict(features)[0]
-        
-        # Recomendações
-        recomendacoes = []
-        if probabilidade < 0.6:
-            if project.duracao_meses > 18:
-                recomendacoes.append("⏰ Considere reduzir duração para 12-15 meses")
-            if project.orcamento < 500000:
-                recomendacoes.append("💰 Orçamento pode estar baixo")
-            if project.tamanho_equipe > 20:
-                recomendacoes.append("👥 Equipe muito grande pode gerar overhead")
-            if project.recursos_disponiveis == "Baixo":
-                recomendacoes.append("🔧 Recursos insuficientes são críticos")
-            if project.experiencia_gerente < 5:
-                recomendacoes.append("🎓 Considere mentoria para o gerente")
+        # Previsão: memo/tabela sobre o espaço discreto; senão o preditor servido
+        chave = m.memo.chave(features_dict)
+        resultado = m.memo.get(chave)
+        t_memo = time.perf_counter()
+        ESTAGIO_MEMO.observe(t_memo - t_encoding)
+        if resultado is None:
+            resultado = await m.batcher.predict(features_dict)
+            m.memo.set(chave, resultado)
+            t_modelo = time.perf_counter()
+            ESTAGIO_MODELO.observe(t_modelo - t_memo)
         else:
-            recomendacoes.append("🎉 Excelente! Projeto com alta probabilidade de sucesso")
+            t_modelo = t_memo
+        probabilidade, predicao, explicacao = resultado
+        registro.observar(features_dict, resultado, t_modelo - t_encoding)
         
-        return PredictionResponse(
-            sucesso_previsto=bool(predicao),
-            probabilidade_sucesso=float(probabilidade),
-            confianca="Alta" if abs(probabilidade - 0.5) > 0.3 else "Média",
-            recomendacoes=recomendacoes
-        )
+        resposta = montar_resposta(project, probabilidade, predicao, explicacao, campos_do_modelo(m))
+        ESTAGIO_RESPOSTA.observe(time.perf_counter() - t_modelo)
+        return resposta
         
+    except CategoriaDesconhecida as e:
+        raise erro_categoria(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na previsão: {str(e)}")
 
+@app.post("/predict/batch", response_model=List[PredictionResponse])
+async def predict_batch(request: Request, chunk_size: int = BATCH_MAX_CHUNK_SIZE):
+    """Previsão em lote: lista JSON de projetos ou stream NDJSON (um projeto por linha)"""
+    modelo_ou_erro()
+    
+    chunk_size = max(1, min(chunk_size, BATCH_MAX_CHUNK_SIZE))
+    
+    if "ndjson" in request.headers.get("content-type", ""):
+        return BodyStreamingResponse(
+            _predict_ndjson(request, chunk_size),
+            media_type="application/x-ndjson"
+        )
+    
+    # Parse, validação e previsão em threads, um bloco por vez: um lote grande não
+    # segura o event loop (e com ele /predict, o micro-batcher e os streams SSE)
+    try:
+        payload = await asyncio.to_thread(json.loads, await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Projeto inválido: {str(e)}")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=422, detail="Envie uma lista de projetos")
+    
+    blocos = []
+    for inicio in range(0, len(payload), chunk_size):
+        try:
+            blocos.append(await asyncio.to_thread(_validar_bloco, payload[inicio:inicio + chunk_size]))
+        except (ValidationError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=f"Projeto inválido: {str(e)}")
+    
+    respostas = []
+    try:
+        for i, projects in enumerate(blocos):
+            respostas += await asyncio.to_thread(_predict_chunk, projects, i * chunk_size)
+    except CategoriaDesconhecida as e:
+        raise erro_categoria(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na previsão: {str(e)}")
+    return respostas
+
+async def _predict_ndjson(request: Request, chunk_size: int):
+    """Lê NDJSON em streaming e devolve uma linha de resultado por projeto"""
+    chunk = []
+    buffer = b""
+    
+    def processar(linhas):
+        # Linhas inválidas viram {"erro": ...} para manter o alinhamento com a entrada
+        projects, saida = [], []
+        for linha in linhas:
+            try:
+                projects.append(ProjectData(**json.loads(linha)))
+                saida.append(None)
+            except (ValidationError, TypeError, ValueError) as e:
+                saida.append({"erro": f"Projeto inválido: {str(e)}"})
+        posicoes = [i for i, item in enumerate(saida) if item is None]
+        try:
+            while True:
+                try:
+                    resultados = iter(predict_projects_batch(projects))
+                    break
+                except CategoriaDesconhecida as e:
+                    # Só a linha com a categoria desconhecida vira erro; o resto do bloco segue
+                    saida[posicoes.pop(e.indice)] = {"erro": f"Projeto inválido: {str(e)}"}
+                    del projects[e.indice]
+            saida = [item if item is not None else next(resultados).model_dump() for item in saida]
+        except Exception as e:
+            saida = [item if item is not None else {"erro": f"Erro na previsão: {str(e)}"} for item in saida]
+        return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in saida)
+    
+    async for data in request.stream():
+        buffer += data
+        *linhas, buffer = buffer.split(b"\n")
+        for linha in linhas:
+            if linha.strip():
+                chunk.append(linha)
+            if len(chunk) >= chunk_size:
+                yield await asyncio.to_thread(processar, chunk)
+                chunk = []
+    if buffer.strip():
+        chunk.append(buffer)
+    if chunk:
+        yield await asyncio.to_thread(processar, chunk)
+
+def erro_variacao(campo: str, msg: str) -> HTTPException:
+    return HTTPException(status_code=422, detail=[{"loc": ["body", "variacoes", campo], "msg": msg, "type": "value_error"}])
+
+def expandir_variacao(campo: str, variacao) -> list:
+    """Lista de valores de um campo: a própria lista ou os pontos da faixa"""
+    if isinstance(variacao, FaixaValores):
+        if variacao.passo <= 0 or variacao.maximo < variacao.minimo:
+            raise erro_variacao(campo, "Faixa inválida: use passo > 0 e maximo >= minimo")
+        n = int((variacao.maximo - variacao.minimo) // variacao.passo) + 1
+        if n > WHATIF_MAX_VALORES_CAMPO:
+            raise erro_variacao(campo, f"A faixa tem {n} valores; o máximo por campo é {WHATIF_MAX_VALORES_CAMPO}")
+        valores = (variacao.minimo + variacao.passo * np.arange(n)).tolist()
+    else:
+        valores = list(variacao)
+        if len(valores) > WHATIF_MAX_VALORES_CAMPO:
+            raise erro_variacao(campo, f"{len(valores)} valores; o máximo por campo é {WHATIF_MAX_VALORES_CAMPO}")
+    if not valores:
+        raise erro_variacao(campo, "Informe ao menos um valor")
+    return valores
+
+@app.post("/what-if", response_model=WhatIfResponse)
+async def what_if(pedido: WhatIfRequest):
+    """Cenários hipotéticos: pontua a grade de variações do projeto e retorna as mudanças de maior ganho.
+    
+    Valores que caem no mesmo intervalo entre limiares das árvores têm a mesma
+    previsão e são avaliados uma vez só; a grade distinta vai em uma única
+    chamada vetorizada, fora do event loop.
+    """
+    m = modelo_ou_erro()
+    projeto = pedido.projeto
+    try:
+        codigos = codificar_categorias(projeto, m)
+    except CategoriaDesconhecida as e:
+        raise erro_categoria(e, loc=["body", "projeto", e.campo])
+    
+    base = {}
+    for campo, feature in FEATURES_POR_CAMPO.items():
+        base[feature] = codigos[campo] if campo in codigos else getattr(projeto, campo)
+    
+    eixos = {}
+    for campo, variacao in pedido.variacoes.items():
+        if campo not in FEATURES_POR_CAMPO:
+            raise erro_variacao(campo, f"Campo desconhecido; use: {', '.join(FEATURES_POR_CAMPO)}")
+        valores = expandir_variacao(campo, variacao)
+        feature = FEATURES_POR_CAMPO[campo]
+        try:
+            if campo in m.encoders:
+                encoder = m.encoders[campo]
+                codigos_eixo = encoder.transform([str(v) for v in valores])
+                valores = encoder.classes_[codigos_eixo].tolist()
+            else:
+                valores = [int(round(float(v))) if campo in CAMPOS_INTEIROS else float(v) for v in valores]
+                codigos_eixo = valores
+        except CategoriaDesconhecida as e:
+            raise erro_categoria(e, loc=["body", "variacoes", campo, e.indice])
+        except ValueError:
+            raise erro_variacao(campo, "Valores numéricos inválidos")
+        limiares = m.memo.limiares[m.metadata['features'].index(feature)]
+        eixos[feature] = Eixo(campo, [getattr(projeto, campo)] + valores, [base[feature]] + list(codigos_eixo), limiares)
+    
+    try:
+        resultado = await asyncio.to_thread(
+            avaliar_grade, m.predictor, m.metadata['features'], base, eixos,
+            top_n=max(pedido.top_n, 0), max_variantes=WHATIF_MAX_VARIANTES
+        )
+    except GradeMuitoGrande as e:
+        raise HTTPException(status_code=422, detail=[{"loc": ["body", "variacoes"], "msg": str(e), "type": "value_error"}])
+    return WhatIfResponse(**resultado)
+
+def chave_analise(project: ProjectData, m) -> str:
+    """Chave de cache: campos normalizados do projeto + histórico do responsável + modelos ML (m) e LLM + versão do prompt"""
+    campos = {
+        "duracao_meses": project.duracao_meses,
+        "orcamento": round(project.orcamento, 2),
+        "tamanho_equipe": project.tamanho_equipe,
+        "recursos_disponiveis": normalizar_categoria(project.recursos_disponiveis),
+        "complexidade": normalizar_categoria(project.complexidade),
+        "experiencia_gerente": project.experiencia_gerente,
+        "tipo_projeto": normalizar_categoria(project.tipo_projeto),
+        "usuario": usuario_por_id(project.usuario_id) if project.usuario_id is not None else None,
+        "ml_model": m.version,
+        "llm_model": llm.model,
+        "prompt_version": PROMPT_VERSION
+    }
+    canonico = json.dumps(campos, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+def mensagens_analise_com_metrica(project: ProjectData, prediction: PredictionResponse) -> list:
+    """Mensagens da análise, registrando o tamanho estimado do prompt"""
+    messages = mensagens_analise(project, prediction)
+    TOKENS_PROMPT_ANALISE.observe(contar_tokens_mensagens(messages, llm.model))
+    return messages
+
+def resposta_local(project: ProjectData, prediction: PredictionResponse, motivo: str, erro: str) -> LLMAnalysisResponse:
+    """Predição ML + análise por regras, para quando o LLM não responde a tempo"""
+    LLM_FALLBACKS.labels(motivo).inc()
+    return LLMAnalysisResponse(
+        ml_prediction=prediction.dict(),
+        llm_analysis=analise_local(project, prediction),
+        combined_insights=f"📊 Predição ML + análise local por regras (LLM: {erro})",
+        fonte="local"
+    )
+
+def motivo_da_falha(e: Exception, msg_timeout: str) -> tuple:
+    """(motivo para a métrica, mensagem) de uma falha do LLM"""
+    if isinstance(e, CircuitoAberto):
+        return "circuit_open", str(e)
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout", msg_timeout
+    return "error", str(e)
+
 @app.post("/analyze-with-llm", response_model=LLMAnalysisResponse)
 async def analyze_project_with_llm(project: ProjectData):
-    """Endpoint que combina ML + LLM"""
+    """Endpoint que combina ML + LLM.
+    
+    O LLM tem até LLM_DEADLINE segundos desde a chegada da requisição. Se
+    falhar, estourar o prazo ou estiver com o circuito aberto, a resposta sai
+    com a análise local por regras (fonte "local"), no tempo da predição.
+    """
+    inicio = time.perf_counter()
+    
+    # Análises repetidas do mesmo projeto saem do cache; a chave usa o modelo que vai prever
+    m = modelo_ou_erro()
+    chave = chave_analise(project, m)
+    cached = llm_cache.get(chave)
+    if cached is not None:
+        return LLMAnalysisResponse(**cached)
     
     # Fazer predição com ML
-    prediction = await predict_project_success(project)
+    prediction = await prever_projeto(project, m)
     
     # Análise contextual com LLM
-    llm_prompt = f"""
-    Como especialista em gestão de projetos, analise este projeto:
-    
-    📊 DADOS DO PROJETO:
-    - Duração: {project.duracao_meses} meses
-    - Orçamento: R$ {project.orcamento:,.2f}
-    - Equipe: {project.tamanho_equipe} pessoas
-    - Recursos: {project.recursos_disponiveis}
-    - Complexidade: {project.complexidade}
-    - Experiência do gerente: {project.experiencia_gerente} anos
-    - Tipo: {project.tipo_projeto}
-    
-    🤖 PREDIÇÃO ML: {prediction.probabilidade_sucesso:.1%} de sucesso
-    
-    Forneça uma análise detalhada incluindo:
-    1. Principais fatores de risco/sucesso
-    2. Recomendações específicas para melhorar
-    3. Benchmarks da indústria para este tipo de projeto
-    4. Próximos passos sugeridos
-    
-    Seja específico e prático.
-    """
+    messages = mensagens_analise_com_metrica(project, prediction)
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": llm_prompt}],
-            max_tokens=600,
-            temperature=0.7
+        restante = LLM_DEADLINE - (time.perf_counter() - inicio)
+        if restante <= 0:
+            raise asyncio.TimeoutError
+        llm_analysis = await llm.complete(
+            messages=messages,
+            max_tokens=LIMITES_SAIDA["analise"],
+            temperature=0.7,
+            timeout=restante
         )
         
-        llm_analysis = response.choices[0].message.content
-        
-        return LLMAnalysisResponse(
+        resposta = LLMAnalysisResponse(
             ml_prediction=prediction.dict(),
             llm_analysis=llm_analysis,
             combined_insights="✅ Análise híbrida ML + LLM concluída com sucesso"
         )
+        # Só respostas completas do LLM entram no cache (nunca o fallback)
+        llm_cache.set(chave, resposta.model_dump())
+        return resposta
     except Exception as e:
-        return LLMAnalysisResponse(
-            ml_prediction=prediction.dict(),
-            llm_analysis=f"⚠️ Análise LLM temporariamente indisponível: {str(e)}",
-            combined_insights="📊 Usando apenas predição ML"
-        )
+        motivo, erro = motivo_da_falha(e, f"prazo de {LLM_DEADLINE:g}s excedido")
+    
+    return resposta_local(project, prediction, motivo, erro)
+
+def evento_sse(evento: str, dados: dict) -> str:
+    """Formata um evento server-sent events"""
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+@app.post("/analyze-with-llm/stream")
+async def analyze_project_with_llm_stream(project: ProjectData):
+    """Versão em streaming (SSE): predição ML primeiro, depois os tokens do LLM.
+    
+    Eventos: prediction (resultado ML), token ({"text": ...}) e done
+    (análise completa, combined_insights e fonte; inclui "erro" quando o LLM
+    falha). Sem o primeiro token em LLM_FIRST_TOKEN_DEADLINE segundos (ou com
+    o circuito aberto), a análise local por regras vai como um único token.
+    """
+    inicio = time.perf_counter()
+    m = modelo_ou_erro()
+    chave = chave_analise(project, m)
+    cached = llm_cache.get(chave)
+    prediction = None if cached is not None else await prever_projeto(project, m)
+    
+    async def eventos():
+        if cached is not None:
+            yield evento_sse("prediction", cached["ml_prediction"])
+            yield evento_sse("token", {"text": cached["llm_analysis"]})
+            yield evento_sse("done", {
+                "llm_analysis": cached["llm_analysis"],
+                "combined_insights": cached["combined_insights"],
+                "fonte": cached.get("fonte", "llm")
+            })
+            return
+        
+        yield evento_sse("prediction", prediction.dict())
+        
+        partes = []
+        prazo = min(LLM_FIRST_TOKEN_DEADLINE, LLM_DEADLINE - (time.perf_counter() - inicio))
+        try:
+            if prazo <= 0:
+                raise asyncio.TimeoutError
+            async for texto in llm.stream(
+                messages=mensagens_analise_com_metrica(project, prediction),
+                max_tokens=LIMITES_SAIDA["analise"],
+                temperature=0.7,
+                primeiro_token=prazo
+            ):
+                partes.append(texto)
+                yield evento_sse("token", {"text": texto})
+            
+            resposta = LLMAnalysisResponse(
+                ml_prediction=prediction.dict(),
+                llm_analysis="".join(partes),
+                combined_insights="✅ Análise híbrida ML + LLM concluída com sucesso"
+            )
+            llm_cache.set(chave, resposta.model_dump())
+            yield evento_sse("done", {
+                "llm_analysis": resposta.llm_analysis,
+                "combined_insights": resposta.combined_insights,
+                "fonte": resposta.fonte
+            })
+            return
+        except Exception as e:
+            if partes:
+                motivo, erro = motivo_da_falha(e, f"tempo limite de {llm.timeout:g}s excedido")
+            else:
+                motivo, erro = motivo_da_falha(e, f"sem resposta em {max(prazo, 0):g}s")
+        
+        if partes:
+            # O texto parcial já foi exibido: fica como está
+            yield evento_sse("done", {
+                "llm_analysis": "".join(partes),
+                "combined_insights": "📊 Usando apenas predição ML",
+                "fonte": "llm",
+                "erro": erro
+            })
+            return
+        
+        local = resposta_local(project, prediction, motivo, erro)
+        yield evento_sse("token", {"text": local.llm_analysis})
+        yield evento_sse("done", {
+            "llm_analysis": local.llm_analysis,
+            "combined_insights": local.combined_insights,
+            "fonte": local.fonte,
+            "erro": erro
+        })
+    
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.on_event("startup")
+async def startup():
+    if MODEL_PRELOAD:
+        carregar_modelo()
+    registro.iniciar()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await registro.aclose()
+    await llm.aclose()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if API_WORKERS > 1:
+        # Multi-processo: o uvicorn precisa importar a app em cada worker
+        uvicorn.run("app:app", host=API_HOST, port=API_PORT, workers=API_WORKERS)
+    else:
+        uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+
+class DiskBackend:
+    """Armazenamento persistente (SQLite) para o TTLCache, sobrevive a reinícios.
+
+    Linhas expiradas são apagadas na abertura e a cada purga_a_cada gravações;
+    na mesma purga, acima de max_linhas saem as que expiram primeiro (sem
+    expiração, as mais antigas). Entre duas purgas o arquivo pode passar de
+    max_linhas em até purga_a_cada linhas.
+    """
+
+    def __init__(self, path, max_linhas=None, purga_a_cada=256):
+        self.max_linhas = max_linhas
+        self.purga_a_cada = purga_a_cada
+        self._gravacoes = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+        self.purgar()
+
+    def purgar(self):
+        """Apaga as linhas expiradas e o excesso sobre max_linhas"""
+        self.conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        if self.max_linhas is not None:
+            excesso = self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_linhas
+            if excesso > 0:
+                self.conn.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache "
+                    "ORDER BY COALESCE(expires, ?), rowid LIMIT ?)",
+                    (float("inf"), excesso)
+                )
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key):
+        row = self.conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, expires):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), expires)
+        )
+        self.conn.commit()
+        self._gravacoes += 1
+        if self._gravacoes % self.purga_a_cada == 0:
+            self.purgar()
+
+    def delete(self, key):
+        self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM cache")
+        self.conn.commit()
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração opcional e backend em disco opcional.
+
+    Os valores precisam ser serializáveis em JSON quando há backend em disco.
+    ttl=None desliga a expiração.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, backend=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expires(self):
+        return time.time() + self.ttl if self.ttl else None
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None and self.backend is not None:
+            value, expires = self.backend.get(key)
+            if value is not None:
+                item = (value, expires)
+                self._store(key, item)
+        if item is not None:
+            value, expires = item
+            if expires is None or expires > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.delete(key)
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        item = (value, self._expires())
+        self._store(key, item)
+        if self.backend is not None:
+            self.backend.set(key, value, item[1])
+
+    def _store(self, key, item):
+        self._data[key] = item
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def clear(self):
+        self._data.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
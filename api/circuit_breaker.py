@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+
+class CircuitoAberto(Exception):
+    """Chamada recusada sem tentar: a dependência falhou seguidamente e está em pausa"""
+
+
+class CircuitBreaker:
+    """Disjuntor em volta de uma dependência externa (o LLM).
+
+    Fechado, as chamadas passam; erros, timeouts e respostas mais lentas que
+    lento segundos contam como falha, e limite_falhas seguidas abrem o
+    circuito. Aberto, verificar() recusa as chamadas na hora e uma sonda roda
+    em segundo plano depois de espera segundos (o intervalo dobra a cada
+    sonda que falha, até espera_maxima). Enquanto a sonda roda o circuito
+    fica meio-aberto: só ela chega à dependência, e a primeira sonda rápida e
+    sem erro fecha o circuito. Requisições de usuários nunca servem de sonda.
+
+    Vive no event loop da API: sem locks.
+    """
+
+    def __init__(self, sonda, limite_falhas=3, lento=10.0, espera=15.0, espera_maxima=120.0,
+                 relogio=time.monotonic, dormir=asyncio.sleep):
+        """sonda: corrotina sem argumentos que chama a dependência com o menor custo possível.
+
+        relogio e dormir medem e esperam o tempo entre as sondas (substituíveis nos testes).
+        """
+        self.sonda = sonda
+        self.relogio = relogio
+        self.dormir = dormir
+        self.limite_falhas = limite_falhas
+        self.lento = lento
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.aberto = False
+        self.sondando = False
+        self.falhas_seguidas = 0
+        self.aberto_desde = None
+        self.aberturas = 0
+        self.recusadas = 0
+        self.sondas = 0
+        self._tarefa = None
+
+    def verificar(self):
+        """Lança CircuitoAberto se o circuito estiver aberto"""
+        if self.aberto:
+            self.recusadas += 1
+            raise CircuitoAberto("LLM em pausa após falhas seguidas")
+
+    def registrar_sucesso(self, duracao):
+        if duracao > self.lento:
+            self.registrar_falha()
+        else:
+            self.falhas_seguidas = 0
+
+    def registrar_falha(self):
+        self.falhas_seguidas += 1
+        if not self.aberto and self.falhas_seguidas >= self.limite_falhas:
+            self._abrir()
+
+    def _abrir(self):
+        self.aberto = True
+        self.aberto_desde = self.relogio()
+        self.aberturas += 1
+        print(f"⚡ Circuito do LLM aberto após {self.falhas_seguidas} falhas seguidas; nova tentativa em {self.espera:g}s")
+        self._tarefa = asyncio.get_running_loop().create_task(self._sondar())
+
+    def _fechar(self):
+        self.aberto = False
+        self.aberto_desde = None
+        self.falhas_seguidas = 0
+        print("✅ Circuito do LLM fechado: a sonda respondeu")
+
+    async def _sondar(self):
+        espera = self.espera
+        while self.aberto:
+            await self.dormir(espera)
+            self.sondas += 1
+            self.sondando = True
+            try:
+                # Sonda lenta também falha
+                await asyncio.wait_for(self.sonda(), timeout=self.lento)
+            except Exception:
+                espera = min(espera * 2, self.espera_maxima)
+            else:
+                self._fechar()
+            finally:
+                self.sondando = False
+
+    async def aclose(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    def stats(self):
+        return {
+            "estado": "meio-aberto" if self.sondando else "aberto" if self.aberto else "fechado",
+            "falhas_seguidas": self.falhas_seguidas,
+            "aberto_ha_s": round(self.relogio() - self.aberto_desde, 1) if self.aberto_desde is not None else None,
+            "aberturas": self.aberturas,
+            "recusadas": self.recusadas,
+            "sondas": self.sondas
+        }
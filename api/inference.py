@@ -0,0 +1,148 @@
+import threading
+
+import numpy as np
+
+
+class FastPredictor:
+    """Inferência de baixa latência para uma linha por vez.
+
+    Evita o DataFrame de uma linha e a validação do sklearn: as features vão
+    para um buffer NumPy pré-alocado (float32, o dtype usado pelas árvores)
+    e a floresta achatada (FlatForest) é percorrida uma única vez; a classe é
+    derivada da probabilidade, com o mesmo critério de model.predict (argmax).
+
+    O buffer de predict_one é compartilhado, então predict_one deve ser
+    chamado de uma única thread (o event loop da API). Os métodos de lote
+    (predict_proba, explicar, predict_many) não usam o buffer e também rodam
+    em threads (/predict/batch, /what-if).
+    """
+
+    def __init__(self, forest, feature_names):
+        self.forest = forest
+        self.forests = [forest]
+        self.feature_names = list(feature_names)
+        self.classes = forest.classes_
+        self.indice_sucesso = int(np.flatnonzero(self.classes == 1)[0])
+        self._buffer = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+
+    def _preencher(self, valores):
+        buffer = self._buffer[0]
+        for i, nome in enumerate(self.feature_names):
+            buffer[i] = valores[nome]
+        return self._buffer
+
+    def predict_one(self, valores, explicar=False):
+        """Retorna (probabilidade de sucesso, classe prevista) para um dict de features.
+
+        Com explicar=True, acrescenta (base, contribuições por feature) na
+        mesma passada pelas árvores: base + soma das contribuições = probabilidade.
+        """
+        if explicar:
+            proba, base, contribuicoes = self.forest.explicar(self._preencher(valores), self.indice_sucesso)
+            proba = proba[0]
+            return (float(proba[self.indice_sucesso]), self.classes[int(np.argmax(proba))],
+                    (base, contribuicoes[0].tolist()))
+        proba = self.forest.predict_proba(self._preencher(valores))[0]
+        return float(proba[self.indice_sucesso]), self.classes[int(np.argmax(proba))]
+
+    def predict_proba(self, X, contabilizar=True):
+        return self.forest.predict_proba(X)
+
+    def explicar(self, X, contabilizar=True):
+        """predict_proba mais a base (por linha) e as contribuições de cada feature para a classe de sucesso"""
+        proba, base, contribuicoes = self.forest.explicar(X, self.indice_sucesso)
+        return proba, np.full(len(proba), base), contribuicoes
+
+    def predict_many(self, lista_valores, explicar=False):
+        """predict_one para vários dicts de features em uma única chamada vetorizada"""
+        X = np.array([[valores[nome] for nome in self.feature_names] for valores in lista_valores], dtype=np.float32)
+        if not explicar:
+            proba = self.predict_proba(X)
+            classes = self.classes[np.argmax(proba, axis=1)]
+            return [(float(p), classe) for p, classe in zip(proba[:, self.indice_sucesso], classes)]
+        proba, base, contribuicoes = self.explicar(X)
+        classes = self.classes[np.argmax(proba, axis=1)]
+        return [(float(p), classe, (float(b), c)) for p, classe, b, c
+                in zip(proba[:, self.indice_sucesso], classes, base, contribuicoes.tolist())]
+
+    def stats(self):
+        return {"tipo": "floresta", "arvores": self.forest.n_estimators}
+
+
+class DistilledPredictor(FastPredictor):
+    """Serve o modelo destilado (aluno) e recorre à floresta (professor) quando
+    o aluno está inseguro: |p - 0.5| < margem.
+
+    O aluno é pequeno, então uma linha é avaliada com
+    FlatForest.predict_proba_one (Python puro, sem arrays NumPy). Os
+    contadores de respostas são atualizados sob lock: os métodos de lote
+    rodam em threads enquanto o event loop conta as previsões de uma linha.
+    """
+
+    def __init__(self, student, teacher, feature_names, margin):
+        super().__init__(teacher, feature_names)
+        self.student = student
+        self.forests = [student, teacher]
+        self.margin = float(margin)
+        self.student_hits = 0
+        self.fallbacks = 0
+        self._lock_contadores = threading.Lock()
+
+    def _contar(self, aluno, professor):
+        with self._lock_contadores:
+            self.student_hits += aluno
+            self.fallbacks += professor
+
+    def predict_one(self, valores, explicar=False):
+        """A explicação vem do modelo que respondeu (aluno ou professor)"""
+        linha = [float(np.float32(valores[nome])) for nome in self.feature_names]
+        if explicar:
+            proba, base, contribuicoes = self.student.explicar_one(linha, self.indice_sucesso)
+            p = proba[self.indice_sucesso]
+        else:
+            p = self.student.predict_proba_one(linha)[self.indice_sucesso]
+        if abs(p - 0.5) < self.margin:
+            self._contar(0, 1)
+            return super().predict_one(valores, explicar)
+        self._contar(1, 0)
+        # Classes binárias: argmax de [1 - p, p]
+        classe = self.classes[self.indice_sucesso if p > 0.5 else 1 - self.indice_sucesso]
+        return (p, classe, (base, contribuicoes)) if explicar else (p, classe)
+
+    def predict_proba(self, X, contabilizar=True):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = self.student.predict_proba(X)
+        incertos = np.abs(proba[:, self.indice_sucesso] - 0.5) < self.margin
+        if incertos.any():
+            proba[incertos] = self.forest.predict_proba(X[incertos])
+        if contabilizar:
+            n_incertos = int(incertos.sum())
+            self._contar(len(X) - n_incertos, n_incertos)
+        return proba
+
+    def explicar(self, X, contabilizar=True):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba, base_aluno, contribuicoes = self.student.explicar(X, self.indice_sucesso)
+        base = np.full(len(X), base_aluno)
+        incertos = np.abs(proba[:, self.indice_sucesso] - 0.5) < self.margin
+        if incertos.any():
+            proba[incertos], base[incertos], contribuicoes[incertos] = self.forest.explicar(
+                X[incertos], self.indice_sucesso)
+        if contabilizar:
+            n_incertos = int(incertos.sum())
+            self._contar(len(X) - n_incertos, n_incertos)
+        return proba, base, contribuicoes
+
+    def stats(self):
+        with self._lock_contadores:
+            student_hits, fallbacks = self.student_hits, self.fallbacks
+        total = student_hits + fallbacks
+        return {
+            "tipo": "destilado",
+            "arvores_aluno": self.student.n_estimators,
+            "arvores_professor": self.forest.n_estimators,
+            "margem": self.margin,
+            "respostas_aluno": student_hits,
+            "fallbacks_professor": fallbacks,
+            "taxa_aluno": student_hits / total if total else 0.0
+        }
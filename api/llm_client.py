@@ -0,0 +1,213 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+from circuit_breaker import CircuitBreaker
+from metrics import BUCKETS_LLM, Counter, Histogram
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+# Tempo máximo por chamada (inclui a espera por uma vaga no limite de concorrência)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+# Chamadas simultâneas ao LLM; as demais aguardam na fila
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Pool de conexões HTTP compartilhado com a API da OpenAI
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+# Circuit breaker: falhas seguidas (erros, timeouts ou respostas lentas) que abrem o circuito
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+# Resposta (ou, no streaming, primeiro token) acima disso conta como falha
+LLM_BREAKER_SLOW = float(os.getenv("LLM_BREAKER_SLOW", "10"))
+# Espera até a primeira sonda com o circuito aberto; dobra a cada sonda que falha, até 120s
+LLM_BREAKER_WAIT = float(os.getenv("LLM_BREAKER_WAIT", "15"))
+
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Duração das chamadas ao LLM (inclui fila)",
+                        ("mode",), buckets=BUCKETS_LLM)
+LLM_TIME_TO_FIRST_TOKEN = Histogram("llm_time_to_first_token_seconds",
+                                    "Tempo até o primeiro trecho de texto no streaming", buckets=BUCKETS_LLM)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens consumidos no LLM, segundo o usage da resposta", ("type",))
+LLM_ERRORS = Counter("llm_errors_total", "Falhas nas chamadas ao LLM", ("mode", "type"))
+
+
+class LLMClient:
+    """Cliente assíncrono do LLM com pool de conexões e concorrência limitada.
+
+    O AsyncOpenAI é criado na primeira chamada (não no import), então a API
+    sobe mesmo sem OPENAI_API_KEY. OPENAI_BASE_URL permite apontar para um
+    servidor local que simula a OpenAI (benchmarks/fake_llm_server.py).
+
+    As chamadas passam por um circuit breaker: com o circuito aberto, complete
+    e stream lançam CircuitoAberto na hora, sem ocupar vaga nem conexão.
+    """
+
+    def __init__(self, model=LLM_MODEL, timeout=LLM_TIMEOUT, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_connections=LLM_MAX_CONNECTIONS, max_retries=LLM_MAX_RETRIES,
+                 breaker_failures=LLM_BREAKER_FAILURES, breaker_slow=LLM_BREAKER_SLOW, breaker_wait=LLM_BREAKER_WAIT):
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = None
+        self.in_flight = 0
+        self.breaker = CircuitBreaker(self._sondar, limite_falhas=breaker_failures, lento=breaker_slow,
+                                      espera=breaker_wait)
+
+    @property
+    def available(self):
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    def _get_client(self):
+        if self._client is None:
+            # Import tardio: o SDK da OpenAI pesa no tempo de startup da API
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(self.timeout)
+            )
+            self._client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL"),
+                max_retries=self.max_retries,
+                http_client=http_client
+            )
+        return self._client
+
+    async def complete(self, messages, max_tokens, temperature=0.7, timeout=None):
+        """Executa uma chat completion e retorna o texto da resposta.
+
+        Lança asyncio.TimeoutError se a espera na fila mais a chamada
+        ultrapassarem o timeout, e CircuitoAberto se o circuito estiver aberto.
+        """
+        self.breaker.verificar()
+        inicio = time.perf_counter()
+        try:
+            texto = await asyncio.wait_for(
+                self._complete(messages, max_tokens, temperature),
+                timeout=timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            LLM_ERRORS.labels("complete", "timeout").inc()
+            self.breaker.registrar_falha()
+            raise
+        except Exception:
+            LLM_ERRORS.labels("complete", "error").inc()
+            self.breaker.registrar_falha()
+            raise
+        finally:
+            LLM_LATENCY.labels("complete").observe(time.perf_counter() - inicio)
+        self.breaker.registrar_sucesso(time.perf_counter() - inicio)
+        return texto
+
+    async def _complete(self, messages, max_tokens, temperature):
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                response = await self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+            finally:
+                self.in_flight -= 1
+        _contar_tokens(response.usage)
+        return response.choices[0].message.content
+
+    async def stream(self, messages, max_tokens, temperature=0.7, timeout=None, primeiro_token=None):
+        """Gera os trechos de texto da resposta conforme chegam do LLM.
+
+        O timeout vale para a resposta inteira e primeiro_token (opcional)
+        para o primeiro trecho; ao estourar, lança asyncio.TimeoutError no
+        meio da geração. Com o circuito aberto, lança CircuitoAberto antes
+        do primeiro trecho.
+        """
+        self.breaker.verificar()
+        inicio = time.perf_counter()
+        trechos = self._stream(messages, max_tokens, temperature, timeout, primeiro_token)
+        primeiro = None
+        try:
+            async for texto in trechos:
+                if primeiro is None:
+                    primeiro = time.perf_counter() - inicio
+                    LLM_TIME_TO_FIRST_TOKEN.observe(primeiro)
+                yield texto
+        except asyncio.TimeoutError:
+            LLM_ERRORS.labels("stream", "timeout").inc()
+            self.breaker.registrar_falha()
+            raise
+        except Exception:
+            LLM_ERRORS.labels("stream", "error").inc()
+            self.breaker.registrar_falha()
+            raise
+        else:
+            # No streaming, a lentidão que importa é a espera pelo primeiro trecho
+            self.breaker.registrar_sucesso(primeiro if primeiro is not None else time.perf_counter() - inicio)
+        finally:
+            # Fecha já o gerador interno (libera a vaga) se o consumidor parou antes do fim
+            await trechos.aclose()
+            LLM_LATENCY.labels("stream").observe(time.perf_counter() - inicio)
+
+    async def _stream(self, messages, max_tokens, temperature, timeout, primeiro_token=None):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+        # Até o primeiro trecho com texto, vale o menor dos dois prazos
+        deadline_primeiro = min(deadline, loop.time() + primeiro_token) if primeiro_token else deadline
+        recebeu = False
+
+        def restante():
+            return max((deadline if recebeu else deadline_primeiro) - loop.time(), 0)
+
+        await asyncio.wait_for(self._semaphore.acquire(), timeout=restante())
+        self.in_flight += 1
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ),
+                timeout=restante()
+            )
+            chunks = response.__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=restante())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        recebeu = True
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, "usage", None):
+                        _contar_tokens(chunk.usage)
+            finally:
+                await response.close()
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _sondar(self):
+        """Chamada mínima ao LLM usada pelo circuit breaker para saber se ele voltou"""
+        await self._complete([{"role": "user", "content": "ping"}], max_tokens=1, temperature=0)
+
+    async def aclose(self):
+        await self.breaker.aclose()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+def _contar_tokens(usage):
+    if usage is not None:
+        LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
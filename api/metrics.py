@@ -0,0 +1,241 @@
+import time
+from bisect import bisect_left
+
+# Buckets padrão (segundos): de microssegundos (estágios da previsão) a segundos (LLM)
+BUCKETS_LATENCIA = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+BUCKETS_LLM = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# O charset=utf-8 é acrescentado pelo Response do Starlette
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _rotulos(nomes, valores, extra=()):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    pares += [f'{nome}="{valor}"' for nome, valor in extra]
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, descricao, rotulos=(), registry=None, funcao=None):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        # funcao: valores lidos só no momento do scrape ({tupla de rótulos: valor}
+        # ou um número sem rótulos), sem custo nenhum no caminho da requisição
+        self.funcao = funcao
+        self._filhos = {}
+        (registry if registry is not None else REGISTRY).registrar(self)
+
+    def labels(self, *valores, **nomeados):
+        """Série filha para uma combinação de rótulos; guarde-a para o caminho quente"""
+        if nomeados:
+            valores = tuple(nomeados[nome] for nome in self.rotulos)
+        filho = self._filhos.get(valores)
+        if filho is None:
+            if len(valores) != len(self.rotulos):
+                raise ValueError(f"{self.nome} espera os rótulos {self.rotulos}")
+            filho = self._filhos[valores] = self._novo_filho()
+        return filho
+
+    def _amostras(self):
+        if self.funcao is None:
+            return [(valores, filho.valor) for valores, filho in self._filhos.items()]
+        resultado = self.funcao()
+        if isinstance(resultado, dict):
+            return list(resultado.items())
+        return [((), resultado)]
+
+    def render(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, valor in self._amostras():
+            linhas.append(f"{self.nome}{_rotulos(self.rotulos, valores)} {_numero(valor)}")
+        return linhas
+
+
+class _Valor:
+    __slots__ = ("valor",)
+
+    def __init__(self):
+        self.valor = 0
+
+    def inc(self, quantidade=1):
+        self.valor += quantidade
+
+    def dec(self, quantidade=1):
+        self.valor -= quantidade
+
+    def set(self, valor):
+        self.valor = valor
+
+
+class Counter(_Metrica):
+    tipo = "counter"
+
+    def _novo_filho(self):
+        return _Valor()
+
+    def inc(self, quantidade=1):
+        self.labels().inc(quantidade)
+
+
+class Gauge(_Metrica):
+    tipo = "gauge"
+
+    def _novo_filho(self):
+        return _Valor()
+
+    def inc(self, quantidade=1):
+        self.labels().inc(quantidade)
+
+    def dec(self, quantidade=1):
+        self.labels().dec(quantidade)
+
+    def set(self, valor):
+        self.labels().set(valor)
+
+
+class _HistogramaFilho:
+    __slots__ = ("limites", "contagens", "soma")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+
+    def observe(self, valor):
+        # bisect_left: o bucket i conta valores <= limites[i], como no Prometheus
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+
+    def time(self):
+        return _Cronometro(self)
+
+
+class _Cronometro:
+    __slots__ = ("filho", "inicio")
+
+    def __init__(self, filho):
+        self.filho = filho
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.filho.observe(time.perf_counter() - self.inicio)
+        return False
+
+
+class Histogram(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS_LATENCIA, registry=None):
+        self.limites = sorted(float(b) for b in buckets)
+        super().__init__(nome, descricao, rotulos, registry)
+
+    def _novo_filho(self):
+        return _HistogramaFilho(self.limites)
+
+    def observe(self, valor):
+        self.labels().observe(valor)
+
+    def time(self):
+        return self.labels().time()
+
+    def render(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, filho in list(self._filhos.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.limites + [float("inf")], filho.contagens):
+                acumulado += contagem
+                rotulos = _rotulos(self.rotulos, valores, extra=[("le", _numero(limite))])
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {_numero(filho.soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, valores)} {acumulado}")
+        return linhas
+
+
+class Registry:
+    """Conjunto de métricas expostas em /metrics (formato texto do Prometheus).
+
+    As métricas vivem no processo: com API_WORKERS > 1 cada worker tem as suas.
+    Os incrementos não usam lock; a API atualiza tudo a partir do event loop.
+    """
+
+    def __init__(self):
+        self._metricas = {}
+
+    def registrar(self, metrica):
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+
+    def render(self):
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.extend(metrica.render())
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requisições HTTP por endpoint, método e status",
+                        ("endpoint", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Duração das requisições HTTP por endpoint",
+                         ("endpoint",))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requisições HTTP em andamento")
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: contagem, latência e requisições em andamento por endpoint.
+
+    Caminhos que não são rotas da app entram como "outros", para não criar
+    uma série por URL desconhecida. Em respostas em streaming a duração vai
+    até o fim do corpo.
+    """
+
+    def __init__(self, app, rotas):
+        self.app = app
+        self.rotas = rotas  # lista de rotas da app (lida no primeiro request)
+        self._caminhos = None
+        self._em_andamento = HTTP_IN_FLIGHT.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._caminhos is None:
+            self._caminhos = frozenset(rota.path for rota in self.rotas)
+        endpoint = scope["path"] if scope["path"] in self._caminhos else "outros"
+        status = 500
+
+        async def send_com_status(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        self._em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            self._em_andamento.dec()
+            HTTP_LATENCY.labels(endpoint).observe(time.perf_counter() - inicio)
+            HTTP_REQUESTS.labels(endpoint, scope["method"], status).inc()
@@ -0,0 +1,100 @@
+import asyncio
+
+from metrics import Counter, Histogram
+
+BUCKETS_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+BATCH_SIZE = Histogram("predict_microbatch_size", "Linhas por lote do micro-batcher de /predict",
+                       buckets=BUCKETS_LOTE)
+BATCH_FLUSHES = Counter("predict_microbatch_flushes_total", "Lotes processados por motivo de disparo", ("reason",))
+
+
+class MicroBatcher:
+    """Agrupa as previsões de uma linha que chegam juntas em uma chamada vetorizada.
+
+    Cada chamada entra na fila e aguarda seu futuro; a fila é processada quando
+    atinge max_batch_size linhas ou max_wait segundos após a primeira chegada
+    (com max_wait=0, na próxima volta do event loop). Um lote de uma linha só
+    usa predict_one, então sem concorrência o custo extra é apenas a espera.
+    Com max_batch_size <= 1 o agrupamento fica desligado.
+
+    Roda inteiramente no event loop da API, como o preditor que envolve.
+    """
+
+    def __init__(self, predictor, max_batch_size=64, max_wait=0.001):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._fila = []
+        self._timer = None
+        self.lotes = 0
+        self.linhas = 0
+        self.maior_lote = 0
+        self.distribuicao = [0] * (len(BUCKETS_LOTE) + 1)
+        self._por_motivo = {motivo: BATCH_FLUSHES.labels(motivo) for motivo in ("size", "timeout")}
+
+    @property
+    def ativo(self):
+        return self.max_batch_size > 1
+
+    async def predict(self, valores):
+        """Retorna (probabilidade de sucesso, classe prevista, explicação), como predictor.predict_one(valores, explicar=True)"""
+        if not self.ativo:
+            return self.predictor.predict_one(valores, explicar=True)
+
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._fila.append((valores, futuro))
+        if len(self._fila) >= self.max_batch_size:
+            self._processar("size")
+        elif self._timer is None:
+            if self.max_wait > 0:
+                self._timer = loop.call_later(self.max_wait, self._processar, "timeout")
+            else:
+                self._timer = loop.call_soon(self._processar, "timeout")
+        return await futuro
+
+    def _processar(self, motivo):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        lote, self._fila = self._fila, []
+        if not lote:
+            return
+
+        try:
+            if len(lote) == 1:
+                resultados = [self.predictor.predict_one(lote[0][0], explicar=True)]
+            else:
+                resultados = self.predictor.predict_many([valores for valores, _ in lote], explicar=True)
+        except Exception as e:
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        # Chamadas canceladas (cliente desconectado) já têm o futuro concluído
+        for (_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+        tamanho = len(lote)
+        self.lotes += 1
+        self.linhas += tamanho
+        self.maior_lote = max(self.maior_lote, tamanho)
+        self.distribuicao[sum(tamanho > limite for limite in BUCKETS_LOTE)] += 1
+        BATCH_SIZE.observe(tamanho)
+        self._por_motivo[motivo].inc()
+
+    def stats(self):
+        limites = [f"<={limite}" for limite in BUCKETS_LOTE] + [f">{BUCKETS_LOTE[-1]}"]
+        return {
+            "ativo": self.ativo,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "lotes": self.lotes,
+            "linhas": self.linhas,
+            "tamanho_medio": self.linhas / self.lotes if self.lotes else 0.0,
+            "maior_lote": self.maior_lote,
+            "distribuicao": {limite: n for limite, n in zip(limites, self.distribuicao) if n}
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import random
+import time
+
+from model_bundle import BUNDLE_FILENAME
+
+# Arquivos lidos por load_served_model quando não há bundle
+ARQUIVOS_LEGADO = ("trained_model.pkl", "le_recursos.pkl", "le_complexidade.pkl", "le_tipo.pkl", "model_metadata.json")
+
+
+def assinatura_artefatos(model_dir):
+    """(arquivo, mtime, tamanho) dos artefatos que seriam carregados; None se faltar algum"""
+    nomes = [BUNDLE_FILENAME] if os.path.exists(os.path.join(model_dir, BUNDLE_FILENAME)) else ARQUIVOS_LEGADO
+    try:
+        return tuple((nome, st.st_mtime_ns, st.st_size)
+                     for nome in nomes for st in [os.stat(os.path.join(model_dir, nome))])
+    except FileNotFoundError:
+        return None
+
+
+class ModelRegistry:
+    """Modelo servido pela API, trocado sem reiniciar quando os artefatos mudam.
+
+    Um watcher no event loop confere a cada intervalo segundos os artefatos
+    de model_dir (os que train_model() grava). Quando mudam e ficam parados
+    por uma verificação, o modelo novo é carregado e aquecido em uma thread,
+    enquanto o atual segue atendendo. Com fracao_sombra > 0, o candidato
+    responde em sombra a essa fração de /predict (a resposta continua vindo
+    do modelo atual) até amostras_sombra previsões ou sombra_max_s segundos;
+    a concordância e a diferença de latência ficam registradas. Com
+    concordancia_minima > 0, o candidato só é promovido se a concordância
+    foi medida em ao menos amostras_minimas previsões (ou amostras_sombra,
+    se menor) e ficou acima do mínimo. A troca substitui a referência ao
+    modelo atual de uma vez: cada requisição usa o modelo que obteve no
+    início, nunca um modelo pela metade.
+    """
+
+    def __init__(self, carregar, model_dir, intervalo=10.0, fracao_sombra=0.0, amostras_sombra=500,
+                 sombra_max_s=300.0, concordancia_minima=0.0, amostras_minimas=50):
+        """carregar(): ServedModel pronto para servir (carga, tabela e aquecimento), chamado fora do event loop"""
+        self.carregar = carregar
+        self.model_dir = model_dir
+        self.intervalo = intervalo
+        self.fracao_sombra = fracao_sombra
+        self.amostras_sombra = amostras_sombra
+        self.sombra_max_s = sombra_max_s
+        self.concordancia_minima = concordancia_minima
+        self.amostras_minimas = min(amostras_minimas, amostras_sombra)
+        self.atual = None
+        self.assinatura = None
+        self.candidato = None
+        self.sombra = None
+        self.trocas = 0
+        self.rejeitados = 0
+        self.erro = None
+        self.historico = []
+        self._pendente = None
+        self._assinatura_candidato = None
+        self._tarefa = None
+
+    def obter(self):
+        """Modelo atual; o primeiro é carregado na primeira chamada (None se indisponível)"""
+        if self.atual is None:
+            try:
+                assinatura = assinatura_artefatos(self.model_dir)
+                self.atual = self.carregar()
+                self.assinatura = assinatura
+                self.erro = None
+            except Exception as e:
+                print(f"❌ Erro ao carregar modelo: {e}")
+                self.erro = str(e)
+        return self.atual
+
+    def iniciar(self):
+        if self.intervalo > 0 and self._tarefa is None:
+            self._tarefa = asyncio.get_running_loop().create_task(self._vigiar())
+
+    async def aclose(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    async def _vigiar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.verificar()
+            except Exception as e:
+                print(f"❌ Erro ao verificar artefatos do modelo: {e}")
+
+    async def verificar(self):
+        """Uma volta do watcher: encerra a sombra vencida ou carrega artefatos novos"""
+        if self.candidato is not None:
+            if time.monotonic() - self.sombra["inicio"] >= self.sombra_max_s:
+                self._encerrar_sombra()
+            return
+        if self.atual is None:
+            return  # o primeiro modelo é carregado sob demanda (obter)
+        assinatura = assinatura_artefatos(self.model_dir)
+        if assinatura is None or assinatura == self.assinatura:
+            self._pendente = None
+            return
+        if assinatura != self._pendente:
+            # Arquivos mudando: espera ficarem parados por uma verificação
+            self._pendente = assinatura
+            return
+        self._pendente = None
+
+        inicio = time.perf_counter()
+        try:
+            candidato = await asyncio.to_thread(self.carregar)
+        except Exception as e:
+            # Não tenta de novo os mesmos arquivos; o modelo atual continua
+            print(f"❌ Erro ao carregar o modelo novo, mantendo {self.atual.version}: {e}")
+            self.erro = str(e)
+            self.assinatura = assinatura
+            return
+        if assinatura_artefatos(self.model_dir) != assinatura:
+            return  # mudou durante a carga: a próxima volta carrega a versão final
+        self.erro = None
+        print(f"📦 Modelo {candidato.version} carregado em segundo plano em {time.perf_counter() - inicio:.2f}s")
+
+        if self.fracao_sombra > 0:
+            self.candidato = candidato
+            self._assinatura_candidato = assinatura
+            self.sombra = {"inicio": time.monotonic(), "amostras": 0, "concordantes": 0, "soma_dif_prob": 0.0,
+                           "soma_atual_s": 0.0, "soma_candidato_s": 0.0}
+            print(f"🌓 Modelo {candidato.version} em sombra em {self.fracao_sombra:.0%} do tráfego de /predict")
+        else:
+            self._trocar(candidato, assinatura, None)
+
+    def observar(self, valores, resultado, duracao):
+        """Registra uma previsão do modelo atual (valores do /predict, resultado, duração do memo + modelo).
+
+        Sorteada para a sombra, a previsão do candidato roda logo depois, no
+        event loop, sem atrasar a resposta desta requisição.
+        """
+        if self.candidato is not None and random.random() < self.fracao_sombra:
+            asyncio.get_running_loop().call_soon(self._sombrear, self.candidato, valores, resultado, duracao)
+
+    def _sombrear(self, candidato, valores, resultado, duracao):
+        if candidato is not self.candidato:
+            return  # sombra encerrada enquanto aguardava
+        # Mesmo caminho do /predict no candidato: memo e preditor (o memo dele já chega aquecido na troca)
+        inicio = time.perf_counter()
+        chave = candidato.memo.chave(valores)
+        previsto = candidato.memo.get(chave)
+        if previsto is None:
+            previsto = candidato.predictor.predict_one(valores, explicar=True)
+            candidato.memo.set(chave, previsto)
+        sombra = self.sombra
+        sombra["soma_candidato_s"] += time.perf_counter() - inicio
+        sombra["soma_atual_s"] += duracao
+        sombra["amostras"] += 1
+        sombra["concordantes"] += bool(previsto[1] == resultado[1])
+        sombra["soma_dif_prob"] += abs(previsto[0] - resultado[0])
+        if sombra["amostras"] >= self.amostras_sombra:
+            self._encerrar_sombra()
+
+    def _relatorio_sombra(self):
+        sombra = self.sombra
+        n = sombra["amostras"]
+        return {
+            "amostras": n,
+            "duracao_s": round(time.monotonic() - sombra["inicio"], 1),
+            "concordancia": sombra["concordantes"] / n if n else None,
+            "dif_prob_media": sombra["soma_dif_prob"] / n if n else None,
+            "latencia_atual_ms": sombra["soma_atual_s"] / n * 1000 if n else None,
+            "latencia_candidato_ms": sombra["soma_candidato_s"] / n * 1000 if n else None
+        }
+
+    def _encerrar_sombra(self):
+        candidato, assinatura, relatorio = self.candidato, self._assinatura_candidato, self._relatorio_sombra()
+        self.candidato = self.sombra = self._assinatura_candidato = None
+        motivo = None
+        if self.concordancia_minima > 0:
+            if relatorio["amostras"] < self.amostras_minimas:
+                # Sombra vencida sem tráfego suficiente: a concordância não foi medida
+                motivo = f"só {relatorio['amostras']} previsões em sombra (mínimo {self.amostras_minimas})"
+            elif relatorio["concordancia"] < self.concordancia_minima:
+                motivo = f"concordância {relatorio['concordancia']:.1%} abaixo de {self.concordancia_minima:.1%}"
+        if motivo is not None:
+            self.rejeitados += 1
+            self.assinatura = assinatura
+            self._registrar(candidato, relatorio, trocado=False, anterior=self.atual.version, motivo=motivo)
+            print(f"⛔ Modelo {candidato.version} rejeitado: {motivo}")
+            return
+        self._trocar(candidato, assinatura, relatorio)
+
+    def _trocar(self, candidato, assinatura, relatorio):
+        anterior = self.atual
+        # Uma atribuição: quem já obteve o modelo anterior termina com ele
+        self.atual = candidato
+        self.assinatura = assinatura
+        self.trocas += 1
+        self._registrar(candidato, relatorio, trocado=True, anterior=anterior.version)
+        print(f"🔄 Modelo trocado: {anterior.version} -> {candidato.version}")
+
+    def _registrar(self, candidato, relatorio, trocado, anterior, motivo=None):
+        self.historico = (self.historico + [{
+            "versao": candidato.version,
+            "anterior": anterior,
+            "trocado": trocado,
+            "motivo": motivo,
+            "em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sombra": relatorio
+        }])[-10:]
+
+    def stats(self):
+        return {
+            "versao": self.atual.version if self.atual is not None else None,
+            "fonte": self.atual.fonte if self.atual is not None else None,
+            "vigiando": self._tarefa is not None,
+            "candidato": self.candidato.version if self.candidato is not None else None,
+            "sombra": self._relatorio_sombra() if self.sombra is not None else None,
+            "trocas": self.trocas,
+            "rejeitados": self.rejeitados,
+            "erro": self.erro,
+            "historico": self.historico
+        }
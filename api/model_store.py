@@ -0,0 +1,134 @@
+import json
+import os
+import unicodedata
+
+import joblib
+import numpy as np
+
+from flat_forest import FlatForest, flatten_forest
+from inference import DistilledPredictor, FastPredictor
+from micro_batcher import MicroBatcher
+from model_bundle import BUNDLE_FILENAME, load_model_bundle, model_version
+from prediction_memo import PredictionMemo
+
+# Campos categóricos do ProjectData e o pickle legado de cada encoder
+CAMPOS_CATEGORICOS = {
+    'recursos_disponiveis': 'le_recursos.pkl',
+    'complexidade': 'le_complexidade.pkl',
+    'tipo_projeto': 'le_tipo.pkl'
+}
+
+
+def normalizar_categoria(valor):
+    """Forma de comparação das categorias: sem espaços nas pontas, sem acentos e em minúsculas"""
+    decomposto = unicodedata.normalize("NFKD", str(valor).strip())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+class CategoriaDesconhecida(ValueError):
+    """Valor categórico fora das classes do encoder (vira HTTP 422 na API)"""
+
+    def __init__(self, campo, valor, opcoes, indice=None):
+        self.campo = campo
+        self.valor = valor
+        self.opcoes = list(opcoes)
+        self.indice = indice
+        super().__init__(f"{campo}: valor desconhecido {valor!r}; opções: {', '.join(self.opcoes)}")
+
+
+class LabelEncoding:
+    """Equivalente leve ao LabelEncoder.transform a partir das classes salvas.
+
+    A tabela de códigos aceita a grafia exata das classes e as variantes de
+    caixa, acento e espaços ("medio", " MÉDIO" -> "Médio").
+    """
+
+    def __init__(self, classes, campo=None):
+        self.campo = campo
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._codigos = {classe: i for i, classe in enumerate(classes)}
+        self._normalizados = {}
+        for i, classe in enumerate(classes):
+            if self._normalizados.setdefault(normalizar_categoria(classe), i) != i:
+                raise ValueError(f"{campo}: classes indistinguíveis após normalização: {classe!r}")
+
+    def encode(self, valor, indice=None):
+        """Código de um único valor (consulta direta no dict, sem arrays)"""
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._normalizados.get(normalizar_categoria(valor))
+            if codigo is None:
+                raise CategoriaDesconhecida(self.campo, valor, self.classes_, indice)
+        return codigo
+
+    def transform(self, valores):
+        try:
+            return np.fromiter(map(self._codigos.__getitem__, valores), dtype=np.int64, count=len(valores))
+        except KeyError:
+            # Há variantes de grafia (ou valores desconhecidos): valor a valor
+            return np.fromiter((self.encode(valor, i) for i, valor in enumerate(valores)),
+                               dtype=np.int64, count=len(valores))
+
+
+class ServedModel:
+    """Tudo o que a API precisa para prever: floresta, encoders, metadados e caches"""
+
+    def __init__(self, forest, encoders, metadata, version, fonte, memo_size=4096,
+                 student=None, student_margin=None, batch_max_size=1, batch_max_wait=0.001):
+        self.forest = forest
+        self.encoders = encoders
+        self.metadata = metadata
+        self.version = version
+        self.fonte = fonte
+        self.student = student
+        if student is not None:
+            self.predictor = DistilledPredictor(student, forest, metadata['features'], student_margin)
+        else:
+            self.predictor = FastPredictor(forest, metadata['features'])
+        self.memo = PredictionMemo(self.predictor, metadata['features'], maxsize=memo_size)
+        self.batcher = MicroBatcher(self.predictor, max_batch_size=batch_max_size, max_wait=batch_max_wait)
+
+    def aquecer(self):
+        """Monta antes de servir o que as florestas criam no primeiro uso (tabelas de contribuição, listas Python)"""
+        X = np.zeros((1, len(self.metadata['features'])), dtype=np.float32)
+        for forest in self.predictor.forests:
+            forest.explicar(X, self.predictor.indice_sucesso)
+        if self.student is not None:
+            # Só o aluno responde uma linha em Python puro (DistilledPredictor.predict_one)
+            self.student.explicar_one(X[0].tolist(), self.predictor.indice_sucesso)
+
+
+def load_served_model(model_dir, memo_size=4096, serve_student=True, batch_max_size=1, batch_max_wait=0.001):
+    """Carrega o bundle consolidado (mmap); sem ele, usa os artefatos legados.
+
+    Se o bundle traz um modelo destilado e serve_student está ligado, o
+    aluno responde e a floresta fica como fallback para os casos incertos.
+    batch_max_size > 1 liga o micro-batcher das previsões de uma linha.
+    """
+    path = os.path.join(model_dir, BUNDLE_FILENAME)
+    if os.path.exists(path):
+        bundle = load_model_bundle(path)
+        encoders = {campo: LabelEncoding(classes, campo) for campo, classes in bundle['encoders'].items()}
+        aluno = bundle.get('student') if serve_student else None
+        return ServedModel(
+            FlatForest(bundle['forest']), encoders, bundle['metadata'],
+            bundle['model_version'], fonte=path, memo_size=memo_size,
+            batch_max_size=batch_max_size, batch_max_wait=batch_max_wait,
+            student=FlatForest(aluno['forest']) if aluno else None,
+            student_margin=aluno['margin'] if aluno else None
+        )
+
+    # Legado: pickle do sklearn + três encoders + metadados em JSON
+    model = joblib.load(os.path.join(model_dir, "trained_model.pkl"))
+    encoders = {
+        campo: LabelEncoding(joblib.load(os.path.join(model_dir, arquivo)).classes_.tolist(), campo)
+        for campo, arquivo in CAMPOS_CATEGORICOS.items()
+    }
+    with open(os.path.join(model_dir, "model_metadata.json"), "r") as f:
+        metadata = json.load(f)
+    arrays = flatten_forest(model)
+    return ServedModel(
+        FlatForest(arrays), encoders, metadata, model_version(arrays),
+        fonte=os.path.join(model_dir, "trained_model.pkl"), memo_size=memo_size,
+        batch_max_size=batch_max_size, batch_max_wait=batch_max_wait
+    )
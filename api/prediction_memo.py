@@ -0,0 +1,111 @@
+import math
+from bisect import bisect_left
+
+import numpy as np
+
+from cache import TTLCache
+
+
+class PredictionMemo:
+    """Memoização das previsões do preditor servido sobre o espaço discreto das features.
+
+    As árvores só enxergam cada feature através dos seus limiares: dois
+    valores que caem no mesmo intervalo entre limiares têm sempre a mesma
+    previsão. A chave é a tupla desses intervalos (o orçamento, contínuo,
+    colapsa em faixas), então um acerto no memo é exato. Com aluno e
+    professor, os limiares das duas florestas são unidos.
+
+    Consultas passam primeiro pela tabela pré-calculada (opcional) e depois
+    pelo LRU. Os resultados guardados são (probabilidade, classe, explicação):
+    as contribuições das features também só dependem das folhas alcançadas.
+    """
+
+    def __init__(self, predictor, feature_names, maxsize=4096):
+        self.predictor = predictor
+        self.feature_names = list(feature_names)
+        # Limiares como float do Python: bisect é mais rápido que NumPy para uma linha
+        self.limiares = [
+            np.unique(np.concatenate([
+                forest.threshold[(forest.children_left != np.arange(len(forest.feature))) & (forest.feature == i)]
+                for forest in predictor.forests
+            ])).astype(np.float64).tolist()
+            for i in range(len(self.feature_names))
+        ]
+        self.lru = TTLCache(maxsize=maxsize)
+        self.table = None
+        self.table_hits = 0
+
+    def chave(self, valores):
+        """Intervalo de cada feature (mesma conversão para float32 das árvores).
+
+        None se algum valor não for finito (também após a conversão para
+        float32): NaN cairia no primeiro intervalo, mas as árvores o mandam
+        para a direita. Sem chave, a previsão não passa pelo memo.
+        """
+        chave = []
+        for nome, limiares in zip(self.feature_names, self.limiares):
+            valor = float(np.float32(valores[nome]))
+            if not math.isfinite(valor):
+                return None
+            chave.append(bisect_left(limiares, valor))
+        return tuple(chave)
+
+    def get(self, chave):
+        if chave is None:
+            return None
+        if self.table is not None:
+            resultado = self._consultar_tabela(chave)
+            if resultado is not None:
+                self.table_hits += 1
+                return resultado
+        return self.lru.get(chave)
+
+    def set(self, chave, resultado):
+        if chave is None:
+            return
+        self.lru.set(chave, resultado)
+
+    def precompute(self, regiao):
+        """Pré-calcula as previsões de uma região (feature -> lista de valores).
+
+        A região é o produto cartesiano dos valores; cada feature contribui
+        apenas com os intervalos distintos que seus valores alcançam, e todas
+        as combinações são pontuadas em uma única chamada vetorizada.
+        """
+        eixos, posicoes = [], []
+        for nome, limiares in zip(self.feature_names, self.limiares):
+            representantes = {}
+            for valor in regiao[nome]:
+                intervalo = bisect_left(limiares, float(np.float32(valor)))
+                representantes.setdefault(intervalo, valor)
+            eixos.append(list(representantes.values()))
+            posicoes.append({intervalo: i for i, intervalo in enumerate(representantes)})
+
+        grades = np.meshgrid(*[np.asarray(eixo, dtype=np.float32) for eixo in eixos], indexing="ij")
+        X = np.stack([grade.ravel() for grade in grades], axis=1)
+        proba, base, contribuicoes = self.predictor.explicar(X, contabilizar=False)
+        self.table = {
+            "posicoes": posicoes,
+            "dimensoes": [len(eixo) for eixo in eixos],
+            "proba": proba[:, self.predictor.indice_sucesso],
+            "classe": self.predictor.classes[np.argmax(proba, axis=1)],
+            "base": base,
+            "contribuicoes": contribuicoes
+        }
+        return len(X)
+
+    def _consultar_tabela(self, chave):
+        indice = 0
+        for intervalo, posicoes, dimensao in zip(chave, self.table["posicoes"], self.table["dimensoes"]):
+            posicao = posicoes.get(intervalo)
+            if posicao is None:
+                return None
+            indice = indice * dimensao + posicao
+        return (float(self.table["proba"][indice]), self.table["classe"][indice],
+                (float(self.table["base"][indice]), self.table["contribuicoes"][indice].tolist()))
+
+    def stats(self):
+        stats = self.lru.stats()
+        stats["table_size"] = len(self.table["proba"]) if self.table is not None else 0
+        stats["table_hits"] = self.table_hits
+        return stats
@@ -0,0 +1,99 @@
+import re
+from functools import lru_cache
+
+# Instruções fixas da análise: vão primeiro e idênticas em toda chamada, para
+# que o cache de prompt do provedor reaproveite o prefixo. Os dados do
+# projeto (a parte que muda) vão por último, na mensagem do usuário.
+SISTEMA_ANALISE = (
+    "Você é especialista em gestão de projetos. Recebe um projeto, a probabilidade de sucesso "
+    "prevista por um modelo de ML e a contribuição de cada fator em pontos percentuais (p.p.) "
+    "sobre a média do modelo e, quando houver, o histórico do responsável. Responda em português, em até 250 palavras, com tópicos curtos: "
+    "1) principais fatores de risco/sucesso; 2) recomendações específicas; "
+    "3) benchmarks do setor para o tipo de projeto; 4) próximos passos. Seja específico e prático."
+)
+
+# Tokens de saída por tipo de chamada (o texto pedido cabe com folga no limite)
+LIMITES_SAIDA = {
+    "analise": 450
+}
+
+# Nomes dos campos no prompt
+ROTULOS_CAMPOS = {
+    "duracao_meses": "Duração",
+    "orcamento": "Orçamento",
+    "tamanho_equipe": "Equipe",
+    "recursos_disponiveis": "Recursos",
+    "complexidade": "Complexidade",
+    "experiencia_gerente": "Experiência do gerente",
+    "tipo_projeto": "Tipo"
+}
+
+# Tokens extras por mensagem no formato de chat da OpenAI, mais os da resposta
+TOKENS_POR_MENSAGEM = 3
+TOKENS_RESPOSTA = 3
+
+_PEDACOS = re.compile(r"\w+|[^\w\s]|\n\s*|\s{2,}")
+
+
+@lru_cache(maxsize=None)
+def _codificador(modelo):
+    """Tokenizador do tiktoken para o modelo, se o pacote estiver instalado"""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(modelo)
+    except Exception:
+        # Sem o pacote, modelo desconhecido ou sem acesso aos arquivos do BPE
+        return None
+
+
+def contar_tokens(texto, modelo="gpt-4o-mini"):
+    """Tokens de um texto, contados localmente (sem chamar o LLM).
+
+    Usa o tiktoken quando disponível; senão, uma aproximação: cada palavra
+    conta um token a cada 4 caracteres, cada pontuação conta um, emojis e
+    outros símbolos fora do BMP contam dois e cada quebra de linha ou
+    sequência de espaços (indentação) conta um.
+    """
+    codificador = _codificador(modelo)
+    if codificador is not None:
+        return len(codificador.encode(texto))
+    tokens = 0
+    for pedaco in _PEDACOS.findall(texto):
+        if pedaco[0].isalnum() or pedaco[0] == "_":
+            tokens += (len(pedaco) + 3) // 4
+        else:
+            tokens += 2 if ord(pedaco[0]) > 0xFFFF else 1
+    return tokens
+
+
+def contar_tokens_mensagens(messages, modelo="gpt-4o-mini"):
+    """Tokens de entrada de uma chamada de chat completion"""
+    return sum(TOKENS_POR_MENSAGEM + contar_tokens(m["content"], modelo) for m in messages) + TOKENS_RESPOSTA
+
+
+def formatar_fatores(contribuicoes):
+    """Contribuições em pontos percentuais, da maior para a menor em módulo"""
+    ordenadas = sorted(contribuicoes.items(), key=lambda item: abs(item[1]), reverse=True)
+    return "; ".join(f"{ROTULOS_CAMPOS[campo]} {valor * 100:+.1f}" for campo, valor in ordenadas)
+
+
+def mensagens_analise(project, prediction):
+    """Mensagens de /analyze-with-llm: instruções fixas + dados compactos do projeto"""
+    dados = (
+        f"Duração {project.duracao_meses} meses; orçamento R$ {project.orcamento:,.0f}; "
+        f"equipe {project.tamanho_equipe}; recursos {project.recursos_disponiveis}; "
+        f"complexidade {project.complexidade}; gerente {project.experiencia_gerente} anos; "
+        f"tipo {project.tipo_projeto}.\n"
+        f"Sucesso previsto: {prediction.probabilidade_sucesso:.1%} (média {prediction.probabilidade_media_modelo:.1%}).\n"
+        f"Fatores (p.p.): {formatar_fatores(prediction.contribuicoes)}"
+    )
+    usuario = prediction.usuario
+    if usuario is not None:
+        dados += (
+            f"\nResponsável: {usuario.cargo}, {usuario.experiencia_anos} anos; "
+            f"{usuario.historico_projetos} projetos, sucesso médio {usuario.sucesso_medio:g}%."
+        )
+    return [
+        {"role": "system", "content": SISTEMA_ANALISE},
+        {"role": "user", "content": dados}
+    ]
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+
+# Campo do ProjectData -> feature do modelo
+FEATURES_POR_CAMPO = {
+    "duracao_meses": "duracao_meses",
+    "orcamento": "orcamento",
+    "tamanho_equipe": "tamanho_equipe",
+    "recursos_disponiveis": "recursos_encoded",
+    "complexidade": "complexidade_encoded",
+    "experiencia_gerente": "experiencia_gerente",
+    "tipo_projeto": "tipo_encoded"
+}
+CAMPOS_INTEIROS = {"duracao_meses", "tamanho_equipe", "experiencia_gerente"}
+
+
+class GradeMuitoGrande(ValueError):
+    """Mais variantes distintas do que o limite configurado (vira HTTP 422 na API)"""
+
+
+class Eixo:
+    """Valores de uma feature na grade, já reduzidos a um por intervalo de limiares.
+
+    Dois valores no mesmo intervalo têm a mesma previsão; fica o mais próximo
+    do valor atual do projeto (a menor mudança com aquele efeito). A posição
+    0 é sempre o valor atual.
+    """
+
+    def __init__(self, campo, valores, codigos, limiares):
+        """valores: como o usuário os vê (o primeiro é o atual); codigos: o que entra no modelo"""
+        self.campo = campo
+        self.atual = valores[0]
+        self.solicitados = len(set(valores))
+        # Mesma conversão e mesmo bisect_left do memo de previsões
+        codigos = np.asarray(codigos, dtype=np.float32).astype(np.float64)
+        intervalos = np.searchsorted(np.asarray(limiares, dtype=np.float64), codigos, side="left")
+        distancia = np.abs(codigos - codigos[0])
+        distancia[0] = -1  # o valor atual representa o próprio intervalo
+
+        escolhido = {}
+        for i in np.lexsort((distancia, intervalos)):
+            escolhido.setdefault(intervalos[i], i)
+        ordem = sorted(escolhido.values(), key=lambda i: distancia[i])
+        self.valores = [valores[i] for i in ordem]
+        self.codigos = codigos[ordem].astype(np.float32)
+
+
+def avaliar_grade(predictor, feature_names, base, eixos, top_n=10, max_variantes=200_000):
+    """Pontua a grade de variantes do projeto e retorna as melhores mudanças.
+
+    base: {feature: código atual}; eixos: {feature: Eixo}. Todas as variantes
+    distintas vão em uma única chamada vetorizada ao preditor.
+    """
+    eixos_grade = [eixos[nome] for nome in feature_names if nome in eixos]
+    dimensoes = [len(eixo.codigos) for eixo in eixos_grade]
+    # Inteiros do Python: np.prod em int64 estouraria calado em grades enormes
+    n_variantes = math.prod(dimensoes)
+    if n_variantes > max_variantes:
+        raise GradeMuitoGrande(f"A grade tem {n_variantes} variantes distintas; o máximo é {max_variantes}")
+
+    # Índice de cada variante em cada eixo (0 = valor atual)
+    indices = np.indices(dimensoes).reshape(len(dimensoes), -1) if dimensoes else np.zeros((0, 1), dtype=np.int64)
+    X = np.empty((n_variantes, len(feature_names)), dtype=np.float32)
+    posicao = {eixo.campo: i for i, eixo in enumerate(eixos_grade)}
+    for j, nome in enumerate(feature_names):
+        eixo = eixos.get(nome)
+        if eixo is None:
+            X[:, j] = base[nome]
+        else:
+            X[:, j] = eixo.codigos[indices[posicao[eixo.campo]]]
+
+    proba = predictor.predict_proba(X, contabilizar=False)
+    p = proba[:, predictor.indice_sucesso]
+    classes = predictor.classes[np.argmax(proba, axis=1)]
+    ganho = p - p[0]  # a variante 0 é o projeto atual
+    n_alteracoes = (indices != 0).sum(axis=0)
+
+    def variante(i):
+        return {
+            "alteracoes": {
+                eixo.campo: {"de": eixo.atual, "para": eixo.valores[indices[k, i]]}
+                for k, eixo in enumerate(eixos_grade) if indices[k, i] != 0
+            },
+            "probabilidade_sucesso": float(p[i]),
+            "ganho": float(ganho[i]),
+            "sucesso_previsto": bool(classes[i])
+        }
+
+    # Maior ganho primeiro; no empate, menos campos alterados e valores mais próximos dos atuais.
+    # Os eixos seguem os limiares de aluno e professor juntos, mas só um deles responde cada
+    # variante: uma variante com a mesma previsão de outra já listada que altera só parte dos
+    # seus campos (ou os mesmos, com valores mais próximos) não acrescenta nada
+    ordem = np.lexsort((indices.sum(axis=0), n_alteracoes, -ganho))
+    melhores, listadas = [], []
+    for i in ordem:
+        if len(melhores) >= top_n or ganho[i] <= 0:
+            break
+        campos = frozenset(np.flatnonzero(indices[:, i]).tolist())
+        if not any(p_listada == p[i] and campos_listada <= campos for p_listada, campos_listada in listadas):
+            listadas.append((p[i], campos))
+            melhores.append(variante(i))
+
+    # Melhor mudança de um único campo, mantendo os demais
+    por_campo = {}
+    for k, eixo in enumerate(eixos_grade):
+        so_este = np.flatnonzero((n_alteracoes == 1) & (indices[k] != 0))
+        melhor = so_este[np.argmax(ganho[so_este])] if len(so_este) else None
+        por_campo[eixo.campo] = variante(melhor) if melhor is not None and ganho[melhor] > 0 else None
+
+    return {
+        "probabilidade_base": float(p[0]),
+        "sucesso_previsto_base": bool(classes[0]),
+        "variantes_solicitadas": math.prod(eixo.solicitados for eixo in eixos_grade),
+        "variantes_avaliadas": n_variantes,
+        "melhores": melhores,
+        "por_campo": por_campo
+    }
@@ -0,0 +1,107 @@
+"""Microbenchmark da previsão de uma linha: caminho antigo vs FastPredictor vs
+modelo destilado (aluno com fallback para a floresta, destilado na hora).
+
+Uso: cd benchmarks && python bench_predict.py [repeticoes]
+"""
+import json
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append("../api")
+sys.path.append("../ml_model")
+from flat_forest import FlatForest, flatten_distilled
+from inference import DistilledPredictor, FastPredictor
+from train_model import create_encoders, distill_model, encode_projects
+
+DATA_DIR = "../ml_model/data"
+
+
+def medir(func, repeticoes):
+    """Executa func repetidas vezes e retorna as latências em microssegundos"""
+    func()  # aquecimento
+    tempos = np.empty(repeticoes)
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos[i] = (time.perf_counter() - inicio) * 1e6
+    return tempos
+
+
+def main(repeticoes=300):
+    model = joblib.load(f"{DATA_DIR}/trained_model.pkl")
+    with open(f"{DATA_DIR}/model_metadata.json", "r") as f:
+        metadata = json.load(f)
+
+    features_dict = {
+        "duracao_meses": 12,
+        "orcamento": 150000.0,
+        "tamanho_equipe": 6,
+        "recursos_encoded": 1,
+        "complexidade_encoded": 2,
+        "experiencia_gerente": 8,
+        "tipo_encoded": 3
+    }
+    forest = FlatForest.from_model(model)
+    predictor = FastPredictor(forest, metadata['features'])
+
+    def caminho_antigo():
+        features = pd.DataFrame([features_dict])
+        return model.predict_proba(features)[0][1], model.predict(features)[0]
+
+    def caminho_rapido():
+        return predictor.predict_one(features_dict)
+
+    antigo, rapido = caminho_antigo(), caminho_rapido()
+    assert antigo[0] == rapido[0] and antigo[1] == rapido[1], "Resultados divergentes"
+
+    # Aluno destilado a partir da floresta salva
+    df = pd.read_csv(f"{DATA_DIR}/projects_data.csv")
+    encoders = create_encoders()
+    X_teste, y_teste = encode_projects(df, encoders)
+    student, margem, relatorio = distill_model(model, encoders, X_teste, y_teste, n_transfer=100_000)
+    destilado = DistilledPredictor(FlatForest(flatten_distilled(student, model.classes_)), forest,
+                                   metadata['features'], margem)
+    print(f"🎓 Aluno: {relatorio['student_nodes']} nós, fidelidade servida {relatorio['served_agreement']:.4f}, "
+          f"responde {relatorio['student_coverage']:.1%} das linhas")
+
+    def caminho_destilado():
+        return destilado.predict_one(features_dict)
+
+    resultados = {"uma_linha_us": {}, "lote_ms": {}, "lote_linhas": len(df)}
+    print(f"\n📊 Latência de uma previsão ({repeticoes} repetições)")
+    for nome, func in [("DataFrame + predict_proba + predict", caminho_antigo),
+                       ("FastPredictor", caminho_rapido),
+                       ("DistilledPredictor", caminho_destilado)]:
+        tempos = medir(func, repeticoes)
+        resultados["uma_linha_us"][nome] = {"p50": float(np.percentile(tempos, 50)),
+                                            "p99": float(np.percentile(tempos, 99))}
+        print(f"  {nome:<38} p50={np.percentile(tempos, 50):9.1f}µs  "
+              f"p99={np.percentile(tempos, 99):9.1f}µs")
+
+    # Lote: sklearn predict_proba vs FlatForest sobre o dataset de treino
+    lote = pd.DataFrame({nome: np.resize(np.arange(10), len(df)) for nome in metadata['features']})
+    lote[["duracao_meses", "orcamento", "tamanho_equipe", "experiencia_gerente"]] = \
+        df[["duracao_meses", "orcamento", "tamanho_equipe", "experiencia_gerente"]]
+    lote["recursos_encoded"] %= 3
+    lote["complexidade_encoded"] %= 3
+    lote["tipo_encoded"] %= 4
+    lote = lote[metadata['features']]
+    matriz = lote.to_numpy(dtype=np.float32)
+    assert np.array_equal(model.predict_proba(lote), forest.predict_proba(matriz)), "Resultados divergentes"
+
+    print(f"\n📊 Lote de {len(lote)} linhas ({max(repeticoes // 20, 5)} repetições)")
+    for nome, func in [("sklearn predict_proba", lambda: model.predict_proba(lote)),
+                       ("FlatForest.predict_proba", lambda: forest.predict_proba(matriz)),
+                       ("DistilledPredictor.predict_proba", lambda: destilado.predict_proba(matriz))]:
+        tempos = medir(func, max(repeticoes // 20, 5)) / 1000
+        resultados["lote_ms"][nome] = {"p50": float(np.percentile(tempos, 50))}
+        print(f"  {nome:<38} p50={np.percentile(tempos, 50):9.2f}ms")
+    return resultados
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,88 @@
+"""Cold start e memória por worker: artefatos legados vs bundle consolidado.
+
+Cada modo roda em um processo novo que importa a API e carrega o modelo,
+reportando o tempo total e o RSS do processo.
+
+Uso: cd benchmarks && python bench_startup.py [repeticoes]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import joblib
+
+sys.path.append("../ml_model")
+from model_bundle import BUNDLE_FILENAME, save_model_bundle
+
+DATA_DIR = "../ml_model/data"
+API_DIR = "../api"
+ARQUIVOS_LEGADOS = ["trained_model.pkl", "le_recursos.pkl", "le_complexidade.pkl", "le_tipo.pkl", "model_metadata.json"]
+
+# Executado no processo filho, a partir do diretório da API
+SCRIPT_FILHO = """
+import json, resource, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+app.carregar_modelo()
+fim = time.perf_counter()
+rss_kb = 0
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = int(next(l for l in f if l.startswith("VmRSS")).split()[1])
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"startup_s": fim - inicio, "import_s": importado - inicio,
+                  "model_load_s": fim - importado, "rss_mb": rss_kb / 1024}))
+"""
+
+
+def preparar_diretorios(tmp):
+    """Cria um diretório só com os arquivos legados e outro só com o bundle"""
+    legado = os.path.join(tmp, "legado")
+    bundle = os.path.join(tmp, "bundle")
+    os.makedirs(legado)
+    os.makedirs(bundle)
+    for arquivo in ARQUIVOS_LEGADOS:
+        shutil.copy(os.path.join(DATA_DIR, arquivo), legado)
+
+    model = joblib.load(os.path.join(DATA_DIR, "trained_model.pkl"))
+    encoders = {
+        "recursos_disponiveis": joblib.load(os.path.join(DATA_DIR, "le_recursos.pkl")),
+        "complexidade": joblib.load(os.path.join(DATA_DIR, "le_complexidade.pkl")),
+        "tipo_projeto": joblib.load(os.path.join(DATA_DIR, "le_tipo.pkl"))
+    }
+    with open(os.path.join(DATA_DIR, "model_metadata.json"), "r") as f:
+        metadata = json.load(f)
+    save_model_bundle(model, encoders, metadata, os.path.join(bundle, BUNDLE_FILENAME))
+    return {"legado (pickles + json)": legado, "bundle (mmap)": bundle}
+
+
+def medir_startup(model_dir):
+    env = dict(os.environ, MODEL_DIR=os.path.abspath(model_dir), PYTHONWARNINGS="ignore")
+    saida = subprocess.run(
+        [sys.executable, "-c", SCRIPT_FILHO], cwd=API_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main(repeticoes=3):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, model_dir in preparar_diretorios(tmp).items():
+            medidas = [medir_startup(model_dir) for _ in range(repeticoes)]
+            resultados[nome] = {chave: min(m[chave] for m in medidas) for chave in medidas[0]}
+
+    print(f"🚀 Cold start da API (melhor de {repeticoes})")
+    for nome, r in resultados.items():
+        print(f"  {nome:<26} startup={r['startup_s']:6.2f}s  (import {r['import_s']:5.2f}s + "
+              f"modelo {r['model_load_s']:5.2f}s)  RSS={r['rss_mb']:7.1f}MB")
+    return resultados
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,149 @@
+"""Servidor local que simula a API de chat completions da OpenAI.
+
+Permite testar e medir a API sem chamar a OpenAI de verdade:
+
+    cd benchmarks && python fake_llm_server.py --port 8001 --latency 2.0
+    cd api && OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=fake python app.py
+
+Latência e taxa de erros podem mudar com o servidor no ar, para simular
+uma degradação do LLM e a recuperação:
+
+    curl -X POST localhost:8001/config -H 'Content-Type: application/json' -d '{"latency": 30}'
+    curl -X POST localhost:8001/config -H 'Content-Type: application/json' -d '{"latency": 1, "error_rate": 0}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake LLM Server")
+
+# Latência simulada por resposta (segundos)
+LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "1.0"))
+# Com stream=True: a latência vira o tempo até o primeiro token e cada token leva TOKEN_DELAY
+TOKEN_DELAY = float(os.getenv("FAKE_LLM_TOKEN_DELAY", "0.02"))
+# Fração das chamadas que falham com HTTP 500 (depois da latência)
+ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+
+stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "prompt_tokens": 0, "completion_tokens": 0, "errors": 0}
+
+
+def resposta_texto(messages):
+    """Texto determinístico baseado no tamanho do prompt"""
+    prompt = " ".join(m.get("content", "") for m in messages)
+    return f"Análise simulada ({len(prompt)} caracteres de prompt): projeto viável com ajustes de escopo."
+
+
+def usage(messages, texto):
+    """Contagem aproximada de tokens (palavras), no formato de usage da OpenAI"""
+    prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+    completion_tokens = len(texto.split())
+    stats["prompt_tokens"] += prompt_tokens
+    stats["completion_tokens"] += completion_tokens
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+async def gerar_stream(body, texto):
+    """Chunks no formato SSE de chat.completion.chunk da OpenAI"""
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "fake")
+    }
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        await asyncio.sleep(LATENCY)
+        for i, palavra in enumerate(texto.split(" ")):
+            delta = {"content": palavra if i == 0 else " " + palavra}
+            if i == 0:
+                delta["role"] = "assistant"
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(TOKEN_DELAY)
+        chunk = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        yield f"data: {json.dumps(chunk)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = dict(base, choices=[], usage=usage(body.get("messages", []), texto))
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    finally:
+        stats["in_flight"] -= 1
+
+
+def erro_simulado():
+    stats["errors"] += 1
+    return JSONResponse(status_code=500, content={"error": {"message": "Erro simulado", "type": "server_error"}})
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    falhar = random.random() < ERROR_RATE
+    if body.get("stream") and not falhar:
+        texto = resposta_texto(body.get("messages", []))
+        return StreamingResponse(gerar_stream(body, texto), media_type="text/event-stream")
+
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        await asyncio.sleep(LATENCY)
+    finally:
+        stats["in_flight"] -= 1
+    if falhar:
+        return erro_simulado()
+
+    texto = resposta_texto(body.get("messages", []))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": texto},
+            "finish_reason": "stop"
+        }],
+        "usage": usage(body.get("messages", []), texto)
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+@app.post("/config")
+async def configurar(request: Request):
+    """Altera latency, token_delay e error_rate com o servidor no ar"""
+    global LATENCY, TOKEN_DELAY, ERROR_RATE
+    config = await request.json()
+    LATENCY = float(config.get("latency", LATENCY))
+    TOKEN_DELAY = float(config.get("token_delay", TOKEN_DELAY))
+    ERROR_RATE = float(config.get("error_rate", ERROR_RATE))
+    return {"latency": LATENCY, "token_delay": TOKEN_DELAY, "error_rate": ERROR_RATE}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Servidor LLM falso para testes")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--token-delay", type=float, default=TOKEN_DELAY)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="Fração de respostas com HTTP 500")
+    args = parser.parse_args()
+    LATENCY = args.latency
+    TOKEN_DELAY = args.token_delay
+    ERROR_RATE = args.error_rate
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,124 @@
+"""Teste de carga de /predict com 1..N workers do uvicorn.
+
+Para cada quantidade de workers sobe a API (python app.py com API_WORKERS),
+dispara clientes em processos separados durante alguns segundos e mede
+requisições por segundo e latência. O memo de previsões é desligado e os
+orçamentos variam a cada requisição, para que a floresta seja de fato
+avaliada.
+
+Uso: cd benchmarks && python load_test.py --workers 1,2,4 --clientes 8 --duracao 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import requests
+
+API_DIR = "../api"
+
+RECURSOS = ["Baixo", "Médio", "Alto"]
+COMPLEXIDADES = ["Baixa", "Média", "Alta"]
+TIPOS = ["TI", "Construção", "Marketing", "P&D"]
+
+
+def gerar_projeto(rng):
+    return {
+        "duracao_meses": int(rng.integers(3, 24)),
+        "orcamento": float(rng.uniform(100000, 5000000)),
+        "tamanho_equipe": int(rng.integers(3, 25)),
+        "recursos_disponiveis": RECURSOS[rng.integers(3)],
+        "complexidade": COMPLEXIDADES[rng.integers(3)],
+        "experiencia_gerente": int(rng.integers(1, 20)),
+        "tipo_projeto": TIPOS[rng.integers(4)]
+    }
+
+
+def cliente(args):
+    """Loop de um cliente: envia /predict até o fim da janela e devolve as latências"""
+    url, duracao, semente = args
+    rng = np.random.default_rng(semente)
+    latencias = []
+    with requests.Session() as session:
+        fim = time.perf_counter() + duracao
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            response = session.post(f"{url}/predict", json=gerar_projeto(rng), timeout=30)
+            response.raise_for_status()
+            latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def subir_api(workers, porta):
+    env = dict(
+        os.environ, API_WORKERS=str(workers), API_PORT=str(porta), API_HOST="127.0.0.1",
+        PREDICT_MEMO_SIZE="0", MODEL_PRELOAD="1", PYTHONWARNINGS="ignore"
+    )
+    processo = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=API_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{porta}"
+    for _ in range(120):
+        try:
+            if requests.get(f"{url}/health", timeout=1).json().get("model_loaded"):
+                return processo, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    processo.terminate()
+    raise RuntimeError(f"API com {workers} workers não respondeu")
+
+
+def medir(workers, clientes, duracao, porta):
+    processo, url = subir_api(workers, porta)
+    try:
+        # Aquecimento: garante o modelo carregado em todos os workers
+        cliente((url, 1.0, 0))
+        with multiprocessing.Pool(clientes) as pool:
+            resultados = pool.map(cliente, [(url, duracao, i + 1) for i in range(clientes)])
+    finally:
+        processo.terminate()
+        processo.wait()
+
+    latencias = np.concatenate([np.asarray(r) for r in resultados]) * 1000
+    return {
+        "workers": workers,
+        "clientes": clientes,
+        "requisicoes": int(len(latencias)),
+        "rps": len(latencias) / duracao,
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p99_ms": float(np.percentile(latencias, 99))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga de /predict")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}",
+                        help="Quantidades de workers separadas por vírgula")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--porta", type=int, default=8010)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    workers = sorted({int(w) for w in args.workers.split(",")})
+    print(f"⚡ Teste de carga: {args.clientes} clientes, {args.duracao:.0f}s por rodada, {os.cpu_count()} CPUs")
+    resultados = []
+    for n in workers:
+        r = medir(n, args.clientes, args.duracao, args.porta)
+        resultados.append(r)
+        print(f"  workers={n:<3} rps={r['rps']:8.1f}  p50={r['p50_ms']:7.2f}ms  p99={r['p99_ms']:7.2f}ms")
+
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(resultados, f, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
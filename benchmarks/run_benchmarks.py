@@ -0,0 +1,532 @@
+"""Suíte de benchmarks reprodutível da API, do modelo e do fluxo com LLM.
+
+Cenários (sementes fixas, mesmos dados a cada rodada):
+  scoring   previsão de uma linha e em lote (bench_predict.py)
+  predict   /predict de ponta a ponta com um cliente ASGI no mesmo processo
+  llm       /analyze-with-llm concorrente contra o LLM falso com latência injetada
+  degradacao  LLM falso lento e depois com erros: circuito aberto, análise local e recuperação
+  recarga   /predict sob carga enquanto um modelo novo é avaliado em sombra e trocado sem reiniciar
+  startup   import da API e carga do modelo, legado vs bundle (bench_startup.py)
+  training  tempo de treino vs tamanho do dataset, cada tamanho em um processo novo
+
+Os resultados vão para um JSON com o ambiente da rodada; --comparar aponta
+as métricas que pioraram além da tolerância em relação a outra rodada
+(código de saída 1 se houver regressão).
+
+Uso: cd benchmarks && python run_benchmarks.py [--cenarios scoring,predict] [--comparar resultados/base.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+import requests
+
+sys.path.append("../api")
+sys.path.append("../ml_model")
+
+CENARIOS = ["scoring", "predict", "llm", "degradacao", "recarga", "startup", "training"]
+ML_DIR = os.path.abspath("../ml_model")
+
+RECURSOS = ["Baixo", "Médio", "Alto"]
+COMPLEXIDADES = ["Baixa", "Média", "Alta"]
+TIPOS = ["TI", "Construção", "Marketing", "P&D"]
+
+# Executado em um diretório temporário com data/, para não tocar nos artefatos do repositório
+SCRIPT_TREINO = """
+import json, sys, time
+sys.path.insert(0, {ml_dir!r})
+from train_model import train_model
+inicio = time.perf_counter()
+train_model(n_samples={n}, seed=42, n_jobs={n_jobs}, distill={distill})
+tempo = time.perf_counter() - inicio
+with open("data/model_metadata.json") as f:
+    metadata = json.load(f)
+print(json.dumps({{"total_s": tempo, "fit_s": metadata["training"]["wall_time_s"],
+                  "peak_memory_mb": metadata["training"]["peak_memory_mb"],
+                  "accuracy": metadata["accuracy"]}}))
+"""
+
+
+def gerar_projetos(n, semente):
+    """Projetos distintos e reprodutíveis (orçamentos contínuos: o memo quase não acerta)"""
+    rng = np.random.default_rng(semente)
+    return [{
+        "duracao_meses": int(rng.integers(3, 24)),
+        "orcamento": round(float(rng.uniform(100000, 5000000)), 2),
+        "tamanho_equipe": int(rng.integers(3, 25)),
+        "recursos_disponiveis": RECURSOS[rng.integers(3)],
+        "complexidade": COMPLEXIDADES[rng.integers(3)],
+        "experiencia_gerente": int(rng.integers(1, 20)),
+        "tipo_projeto": TIPOS[rng.integers(4)]
+    } for _ in range(n)]
+
+
+def resumo_latencias(latencias, duracao):
+    latencias = np.asarray(latencias) * 1000
+    return {
+        "requisicoes": int(len(latencias)),
+        "rps": len(latencias) / duracao,
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p99_ms": float(np.percentile(latencias, 99))
+    }
+
+
+async def disparar(client, caminho, projetos, concorrencia):
+    """Envia os projetos com no máximo `concorrencia` requisições em aberto"""
+    fila = iter(projetos)
+    latencias, respostas = [], []
+
+    async def trabalhador():
+        for projeto in fila:
+            inicio = time.perf_counter()
+            response = await client.post(caminho, json=projeto)
+            latencias.append(time.perf_counter() - inicio)
+            response.raise_for_status()
+            respostas.append(response.json())
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[trabalhador() for _ in range(concorrencia)])
+    return latencias, respostas, time.perf_counter() - inicio
+
+
+def cliente_asgi(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+
+def bench_scoring(args):
+    import bench_predict
+    return bench_predict.main(args.repeticoes)
+
+
+def bench_predict_asgi(args):
+    import app
+
+    app.carregar_modelo()
+    distintos = gerar_projetos(args.requisicoes, semente=1)
+    repetidos = gerar_projetos(50, semente=2) * (args.requisicoes // 50 + 1)
+
+    async def rodar():
+        resultados = {}
+        async with cliente_asgi(app.app) as client:
+            await disparar(client, "/predict", distintos[:50], 1)  # aquecimento
+            for nome, projetos in [("distintos", distintos), ("repetidos", repetidos[:args.requisicoes])]:
+                latencias, _, duracao = await disparar(client, "/predict", projetos, args.concorrencia)
+                resultados[nome] = resumo_latencias(latencias, duracao)
+                print(f"  /predict {nome:<10} rps={resultados[nome]['rps']:8.1f}  "
+                      f"p50={resultados[nome]['p50_ms']:6.2f}ms  p99={resultados[nome]['p99_ms']:6.2f}ms")
+        return resultados
+
+    print(f"\n🌐 /predict via ASGI ({args.requisicoes} requisições, concorrência {args.concorrencia})")
+    return asyncio.run(rodar())
+
+
+def subir_llm_falso(porta, latencia):
+    processo = subprocess.Popen(
+        [sys.executable, "fake_llm_server.py", "--port", str(porta), "--latency", str(latencia)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{porta}"
+    for _ in range(60):
+        try:
+            requests.get(f"{url}/stats", timeout=1)
+            return processo, url
+        except requests.RequestException:
+            time.sleep(0.25)
+    processo.terminate()
+    raise RuntimeError("Servidor LLM falso não respondeu")
+
+
+def bench_llm(args):
+    import app
+
+    app.carregar_modelo()
+    processo, url = subir_llm_falso(args.porta_llm, args.latencia_llm)
+    os.environ["OPENAI_BASE_URL"] = f"{url}/v1"
+    os.environ["OPENAI_API_KEY"] = "fake"
+    # Projetos distintos: nenhuma resposta sai do cache do LLM
+    projetos = gerar_projetos(args.requisicoes_llm, semente=3)
+
+    async def rodar():
+        try:
+            async with cliente_asgi(app.app) as client:
+                # Aquecimento fora da medição: import do SDK e abertura da conexão
+                await disparar(client, "/analyze-with-llm", gerar_projetos(1, semente=4), 1)
+                latencias, respostas, duracao = await disparar(
+                    client, "/analyze-with-llm", projetos, args.concorrencia_llm
+                )
+        finally:
+            await app.llm.aclose()
+        return latencias, respostas, duracao
+
+    print(f"\n🤖 /analyze-with-llm ({len(projetos)} requisições, concorrência {args.concorrencia_llm}, "
+          f"LLM falso com {args.latencia_llm:g}s)")
+    try:
+        latencias, respostas, duracao = asyncio.run(rodar())
+        max_em_andamento = requests.get(f"{url}/stats", timeout=5).json()["max_in_flight"]
+    finally:
+        processo.terminate()
+        processo.wait()
+
+    resultado = resumo_latencias(latencias, duracao)
+    paralelo = min(args.concorrencia_llm, app.llm.max_concurrency)
+    resultado.update({
+        "wall_s": duracao,
+        # Melhor caso: ondas de `paralelo` chamadas, cada uma com a latência injetada
+        "ideal_s": -(-len(projetos) // paralelo) * args.latencia_llm,
+        "falhas_llm": sum(r["fonte"] != "llm" for r in respostas),
+        "max_llm_em_andamento": max_em_andamento,
+        # Tamanho médio do prompt de análise, contado localmente (prompts.contar_tokens)
+        "tokens_prompt": app.TOKENS_PROMPT_ANALISE.labels().soma / max(sum(app.TOKENS_PROMPT_ANALISE.labels().contagens), 1)
+    })
+    print(f"  rps={resultado['rps']:6.1f}  p50={resultado['p50_ms']:7.1f}ms  p99={resultado['p99_ms']:7.1f}ms  "
+          f"total={duracao:5.2f}s (ideal {resultado['ideal_s']:.2f}s)  falhas={resultado['falhas_llm']}  "
+          f"LLM em paralelo={max_em_andamento}  tokens de prompt={resultado['tokens_prompt']:.0f}")
+    return resultado
+
+
+def bench_degradacao(args):
+    """Fases normal -> LLM lento -> recuperação -> LLM com erros, com o LLM falso reconfigurado no ar"""
+    import app
+
+    app.carregar_modelo()
+    processo, url = subir_llm_falso(args.porta_llm, args.latencia_llm)
+    os.environ["OPENAI_BASE_URL"] = f"{url}/v1"
+    os.environ["OPENAI_API_KEY"] = "fake"
+    # Cliente novo (o circuito começa fechado) com esperas curtas para caber no benchmark
+    app.llm = app.LLMClient(breaker_slow=args.prazo_llm, breaker_wait=args.espera_sonda)
+    app.LLM_DEADLINE = args.prazo_llm
+    normal = {"latency": args.latencia_llm, "error_rate": 0}
+    fases = [("normal", normal), ("lento", {"latency": 30}), ("recuperado", normal), ("erros", {"error_rate": 1})]
+    n = args.requisicoes_degradacao
+
+    async def disparar_fase(client, projetos):
+        """disparar com o estado do circuito no início de cada requisição"""
+        fila = iter(projetos)
+        latencias, respostas, com_circuito_aberto = [], [], []
+
+        async def trabalhador():
+            for projeto in fila:
+                aberto = app.llm.breaker.aberto
+                inicio = time.perf_counter()
+                response = await client.post("/analyze-with-llm", json=projeto)
+                response.raise_for_status()
+                latencias.append(time.perf_counter() - inicio)
+                respostas.append(response.json())
+                com_circuito_aberto.append(aberto)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*[trabalhador() for _ in range(args.concorrencia_degradacao)])
+        return latencias, respostas, com_circuito_aberto, time.perf_counter() - inicio
+
+    async def rodar():
+        resultados = {}
+        try:
+            async with cliente_asgi(app.app) as client:
+                await disparar(client, "/analyze-with-llm", gerar_projetos(1, semente=4), 1)
+                for i, (fase, config) in enumerate(fases):
+                    requests.post(f"{url}/config", json=config, timeout=5)
+                    recuperacao = None
+                    if fase == "recuperado":
+                        # Só a sonda em segundo plano pode fechar o circuito
+                        inicio = time.perf_counter()
+                        while app.llm.breaker.aberto:
+                            await asyncio.sleep(0.05)
+                        recuperacao = time.perf_counter() - inicio
+                    latencias, respostas, com_circuito_aberto, duracao = await disparar_fase(
+                        client, gerar_projetos(n, semente=10 + i)
+                    )
+                    resultado = resumo_latencias(latencias, duracao)
+                    resultado["respostas_locais"] = sum(r["fonte"] == "local" for r in respostas)
+                    # O p50 da fase mistura as requisições que esperaram o LLM (até o prazo) antes de o
+                    # circuito abrir com as respondidas na hora depois; cada grupo sai separado
+                    antes = [l for l, aberto in zip(latencias, com_circuito_aberto) if not aberto]
+                    depois = [l for l, aberto in zip(latencias, com_circuito_aberto) if aberto]
+                    resultado["antes_de_abrir"] = resumo_latencias(antes, duracao) if antes else {"requisicoes": 0}
+                    resultado["com_circuito_aberto"] = resumo_latencias(depois, duracao) if depois else {"requisicoes": 0}
+                    if recuperacao is not None:
+                        resultado["recuperacao_s"] = recuperacao
+                    resultados[fase] = resultado
+                    detalhe = "".join(
+                        f"  {nome}={r['requisicoes']:>3} (p50 {r['p50_ms']:.1f}ms)" for nome, r in
+                        [("fechado", resultado["antes_de_abrir"]), ("aberto", resultado["com_circuito_aberto"])]
+                        if r["requisicoes"]
+                    )
+                    print(f"  {fase:<10} p50={resultado['p50_ms']:8.1f}ms  p99={resultado['p99_ms']:8.1f}ms  "
+                          f"locais={resultado['respostas_locais']:>3}/{n}  circuito={app.llm.breaker.stats()['estado']}"
+                          + detalhe
+                          + (f"  (fechou {recuperacao:.1f}s após o LLM voltar)" if recuperacao is not None else ""))
+        finally:
+            await app.llm.aclose()
+        resultados["aberturas"] = app.llm.breaker.aberturas
+        return resultados
+
+    print(f"\n⚡ Degradação do LLM ({n} requisições por fase, concorrência {args.concorrencia_degradacao}, "
+          f"prazo {args.prazo_llm:g}s, sonda após {args.espera_sonda:g}s)")
+    try:
+        return asyncio.run(rodar())
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def bench_recarga(args):
+    """/predict contínuo antes e durante a troca do modelo: o bundle de um treino novo substitui os artefatos vigiados"""
+    import app
+    from model_bundle import BUNDLE_FILENAME
+    from model_registry import ARQUIVOS_LEGADO, ModelRegistry
+
+    vigiado = tempfile.mkdtemp()
+    preparo = tempfile.mkdtemp()
+    try:
+        # Artefatos atuais em um diretório vigiado à parte; candidato treinado em outro
+        for nome in ARQUIVOS_LEGADO + (BUNDLE_FILENAME,):
+            if os.path.exists(os.path.join(ML_DIR, "data", nome)):
+                shutil.copy(os.path.join(ML_DIR, "data", nome), vigiado)
+        os.makedirs(os.path.join(preparo, "data"))
+        script = SCRIPT_TREINO.format(ml_dir=ML_DIR, n=args.treino_recarga, n_jobs=args.n_jobs, distill=False)
+        subprocess.run([sys.executable, "-c", script], cwd=preparo, capture_output=True, check=True,
+                       env=dict(os.environ, PYTHONWARNINGS="ignore"))
+        candidato = os.path.join(preparo, "data", BUNDLE_FILENAME)
+
+        app.MODEL_DIR = vigiado
+        app.registro = ModelRegistry(
+            app.montar_modelo, vigiado, intervalo=args.intervalo_recarga, fracao_sombra=args.fracao_sombra,
+            amostras_sombra=args.amostras_sombra, sombra_max_s=30
+        )
+        app.carregar_modelo()
+        n = args.requisicoes_recarga
+
+        async def fase(client, projetos, trocar):
+            """Dispara os projetos; com trocar, publica o candidato logo no início e para pouco depois da troca"""
+            fila = iter(projetos)
+            latencias, momentos = [], []
+            troca = {}
+
+            async def trabalhador():
+                for projeto in fila:
+                    if "fim" in troca:
+                        break
+                    inicio = time.perf_counter()
+                    response = await client.post("/predict", json=projeto)
+                    response.raise_for_status()
+                    latencias.append(time.perf_counter() - inicio)
+                    momentos.append(inicio)
+                    # O transporte ASGI não passa pela rede: sem isto um trabalhador esvazia a fila
+                    # sem devolver o event loop aos timers (watcher, sombra)
+                    await asyncio.sleep(0)
+
+            async def publicar():
+                await asyncio.sleep(0.2)
+                troca["publicado"] = time.perf_counter()
+                os.replace(candidato, os.path.join(vigiado, BUNDLE_FILENAME))
+                while app.registro.trocas == 0:
+                    await asyncio.sleep(0.01)
+                troca["trocado"] = time.perf_counter()
+                await asyncio.sleep(0.5)
+                troca["fim"] = time.perf_counter()
+
+            inicio = time.perf_counter()
+            tarefas = [trabalhador() for _ in range(args.concorrencia)]
+            if trocar:
+                tarefas.append(asyncio.wait_for(publicar(), timeout=60))
+            await asyncio.gather(*tarefas)
+            return latencias, momentos, time.perf_counter() - inicio, troca
+
+        async def rodar():
+            app.registro.iniciar()
+            try:
+                async with cliente_asgi(app.app) as client:
+                    await fase(client, gerar_projetos(50, semente=20), False)  # aquecimento
+                    resultados = {}
+                    latencias, _, duracao, _ = await fase(client, gerar_projetos(n, semente=21), False)
+                    resultados["sem_recarga"] = resumo_latencias(latencias, duracao)
+                    # A fase termina 0,5s depois da troca; os projetos só precisam sobrar
+                    latencias, momentos, duracao, troca = await fase(client, gerar_projetos(n * 50, semente=22), True)
+                    resultados["com_recarga"] = resumo_latencias(latencias, duracao)
+                    # Só as requisições entre a publicação dos arquivos e a troca
+                    janela = [l for l, m in zip(latencias, momentos) if troca["publicado"] <= m <= troca["trocado"]]
+                    resultados["janela_recarga"] = resumo_latencias(janela, troca["trocado"] - troca["publicado"])
+                    resultados["troca_s"] = troca["trocado"] - troca["publicado"]
+            finally:
+                await app.registro.aclose()
+            return resultados
+
+        print(f"\n🔄 Recarga do modelo ({n} requisições sem recarga, concorrência {args.concorrencia}, "
+              f"verificação a cada {args.intervalo_recarga:g}s, sombra em {args.fracao_sombra:.0%})")
+        resultados = asyncio.run(rodar())
+    finally:
+        shutil.rmtree(vigiado, ignore_errors=True)
+        shutil.rmtree(preparo, ignore_errors=True)
+
+    ultima = app.registro.historico[-1]
+    resultados["versoes"] = f"{ultima['anterior']} -> {ultima['versao']}"
+    if ultima["sombra"]:
+        resultados["sombra"] = ultima["sombra"]
+    for nome in ("sem_recarga", "com_recarga", "janela_recarga"):
+        r = resultados[nome]
+        print(f"  {nome:<15} requisições={r['requisicoes']:>5}  p50={r['p50_ms']:6.2f}ms  p99={r['p99_ms']:6.2f}ms")
+    print(f"  troca {resultados['versoes']} {resultados['troca_s']:.2f}s após a publicação dos arquivos")
+    if ultima["sombra"]:
+        sombra = ultima["sombra"]
+        print(f"  sombra: {sombra['amostras']} previsões, concordância {sombra['concordancia']:.1%}, "
+              f"|Δp| médio {sombra['dif_prob_media']:.3f}, modelo {sombra['latencia_atual_ms']:.3f}ms "
+              f"-> candidato {sombra['latencia_candidato_ms']:.3f}ms")
+    return resultados
+
+
+def bench_startup(args):
+    import bench_startup
+    return bench_startup.main(args.repeticoes_startup)
+
+
+def bench_training(args):
+    resultados = {}
+    print(f"\n🏋️ Treino vs tamanho do dataset (n_jobs={args.n_jobs})")
+    for n in args.tamanhos:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "data"))
+            script = SCRIPT_TREINO.format(ml_dir=ML_DIR, n=n, n_jobs=args.n_jobs, distill=args.com_destilacao)
+            saida = subprocess.run(
+                [sys.executable, "-c", script], cwd=tmp, capture_output=True, text=True, check=True,
+                env=dict(os.environ, PYTHONWARNINGS="ignore")
+            ).stdout
+        resultados[str(n)] = json.loads(saida.strip().splitlines()[-1])
+        r = resultados[str(n)]
+        print(f"  {n:>10} projetos  total={r['total_s']:7.2f}s  treino={r['fit_s']:7.2f}s  "
+              f"pico={r['peak_memory_mb']:7.1f}MB  acurácia={r['accuracy']:.3f}")
+    return resultados
+
+
+def ambiente():
+    """Contexto da rodada, para saber se duas rodadas são comparáveis"""
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+def achatar(resultados, prefixo=""):
+    """{"a": {"b": 1}} -> {"a.b": 1}, só com os valores numéricos"""
+    valores = {}
+    for chave, valor in resultados.items():
+        caminho = f"{prefixo}{chave}"
+        if isinstance(valor, dict):
+            valores.update(achatar(valor, caminho + "."))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            valores[caminho] = valor
+    return valores
+
+
+def sentido(metrica):
+    """+1 se maior é melhor, -1 se menor é melhor, 0 se não é métrica de desempenho"""
+    nome = metrica.rsplit(".", 1)[-1]
+    if nome in ("rps",):
+        return 1
+    if nome in ("p50", "p99", "startup_s", "import_s", "model_load_s", "rss_mb", "total_s", "fit_s",
+                "peak_memory_mb", "wall_s", "tokens_prompt", "recuperacao_s", "troca_s") or nome.endswith("_ms"):
+        return -1
+    return 0
+
+
+def comparar(atual, base, tolerancia):
+    """Imprime a variação de cada métrica e retorna as que pioraram além da tolerância"""
+    atual, base = achatar(atual), achatar(base)
+    regressoes = []
+    print(f"\n🔍 Comparação com a rodada base (tolerância {tolerancia:.0%})")
+    for metrica in sorted(set(atual) & set(base)):
+        direcao = sentido(metrica)
+        if direcao == 0 or not base[metrica]:
+            continue
+        variacao = (atual[metrica] - base[metrica]) / abs(base[metrica])
+        piorou = -direcao * variacao > tolerancia
+        marca = "❌" if piorou else ("✅" if direcao * variacao > tolerancia else "  ")
+        print(f"  {marca} {metrica:<70} {base[metrica]:12.4g} -> {atual[metrica]:12.4g} ({variacao:+.1%})")
+        if piorou:
+            regressoes.append(metrica)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks com resultados em JSON")
+    parser.add_argument("--cenarios", default=",".join(CENARIOS),
+                        help=f"Cenários separados por vírgula ({', '.join(CENARIOS)})")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: resultados/<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma rodada anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Piora relativa tolerada antes de acusar regressão")
+    parser.add_argument("--repeticoes", type=int, default=300, help="Repetições do cenário scoring")
+    parser.add_argument("--requisicoes", type=int, default=2000, help="Requisições do cenário predict")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas em /predict")
+    parser.add_argument("--requisicoes-llm", type=int, default=64)
+    parser.add_argument("--concorrencia-llm", type=int, default=16)
+    parser.add_argument("--latencia-llm", type=float, default=0.5, help="Latência injetada no LLM falso (s)")
+    parser.add_argument("--porta-llm", type=int, default=8011)
+    parser.add_argument("--requisicoes-degradacao", type=int, default=32, help="Requisições por fase do cenário degradacao")
+    parser.add_argument("--concorrencia-degradacao", type=int, default=4)
+    parser.add_argument("--prazo-llm", type=float, default=2.0, help="LLM_DEADLINE no cenário degradacao (s)")
+    parser.add_argument("--espera-sonda", type=float, default=1.0, help="Espera até a sonda do circuito aberto (s)")
+    parser.add_argument("--requisicoes-recarga", type=int, default=1000,
+                        help="Requisições da fase sem recarga (a fase com recarga vai até 0,5s depois da troca)")
+    parser.add_argument("--treino-recarga", type=int, default=5000, help="Projetos do treino do modelo candidato")
+    parser.add_argument("--intervalo-recarga", type=float, default=0.2, help="MODEL_WATCH_INTERVAL no cenário recarga (s)")
+    parser.add_argument("--fracao-sombra", type=float, default=0.25, help="MODEL_SHADOW_FRACTION no cenário recarga")
+    parser.add_argument("--amostras-sombra", type=int, default=200, help="MODEL_SHADOW_SAMPLES no cenário recarga")
+    parser.add_argument("--repeticoes-startup", type=int, default=3)
+    parser.add_argument("--tamanhos", default="1000,10000,100000",
+                        help="Tamanhos de dataset do cenário training")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--com-destilacao", action="store_true", help="Inclui a destilação no tempo de treino")
+    args = parser.parse_args()
+    args.tamanhos = [int(n) for n in args.tamanhos.split(",")]
+
+    cenarios = [c.strip() for c in args.cenarios.split(",") if c.strip()]
+    desconhecidos = set(cenarios) - set(CENARIOS)
+    if desconhecidos:
+        parser.error(f"Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    executores = {"scoring": bench_scoring, "predict": bench_predict_asgi, "llm": bench_llm,
+                  "degradacao": bench_degradacao, "recarga": bench_recarga, "startup": bench_startup, "training": bench_training}
+    rodada = {"ambiente": ambiente(), "parametros": vars(args), "resultados": {}}
+    for cenario in cenarios:
+        inicio = time.perf_counter()
+        rodada["resultados"][cenario] = executores[cenario](args)
+        print(f"⏱️  {cenario}: {time.perf_counter() - inicio:.1f}s")
+
+    saida = args.saida or os.path.join("resultados", time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w") as f:
+        json.dump(rodada, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados salvos em {saida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        regressoes = comparar(rodada["resultados"], base["resultados"], args.tolerancia)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} métrica(s) pioraram mais que {args.tolerancia:.0%}")
+            sys.exit(1)
+        print("\n✅ Nenhuma regressão acima da tolerância")
+
+
+if __name__ == "__main__":
+    main()
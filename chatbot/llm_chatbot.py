@@ -1,102 +1,286 @@
 import os
+import sys
+import queue
+import random
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from openai import OpenAI
 from dotenv import load_dotenv
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
 import json
 import time
 
+sys.path.append('../ml_model')
+from user_store import UserStore
+
 
 load_dotenv('../.env')
 
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Tempo máximo (s) de cada chamada do chatbot ao LLM (saudação, resumo); estourado, a conversa segue sem o texto
+CHATBOT_LLM_TIMEOUT = float(os.getenv("CHATBOT_LLM_TIMEOUT", "10"))
+
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=CHATBOT_LLM_TIMEOUT, max_retries=1)
+
+# Gerar em paralelo os textos do LLM que não dependem da próxima resposta do
+# usuário (boas-vindas, despedida, resumo)
+CHATBOT_PREFETCH = os.getenv("CHATBOT_PREFETCH", "1") == "1"
+# Iniciar a análise ML + LLM antes da confirmação do usuário (especulativa: uma
+# sessão que recusa a análise paga a chamada ao LLM mesmo assim)
+CHATBOT_PREFETCH_ANALISE = os.getenv("CHATBOT_PREFETCH_ANALISE", "0") == "1"
+# Pool local de textos fixos (boas-vindas, despedida, perguntas dos campos),
+# gerado antes com `python llm_chatbot.py --gerar-textos`; vazio desliga
+CHATBOT_TEXTOS = os.getenv("CHATBOT_TEXTOS", "textos_estaticos.json")
+USERS_DATA_PATH = os.getenv("USERS_DATA_PATH", "../ml_model/data/users_data.csv")
+# Usuários listados por página no login
+USUARIOS_POR_PAGINA = 10
+
+# System prompt idêntico em todas as chamadas (o provedor reaproveita o
+# prefixo em cache); o que muda a cada chamada vai na mensagem do usuário
+SYSTEM_PROMPT = (
+    "Você é o ProjectAI, assistente especialista em gestão de projetos que ajuda gestores "
+    "a avaliar o sucesso de projetos com dados e IA. Seja conversacional, profissional e breve, "
+    "com emojis para deixar a conversa amigável. Não repita cumprimentos como \"Olá\" depois "
+    "que a conversa já começou."
+)
+
+# Tokens de saída por tipo de chamada
+LIMITES_SAIDA = {
+    "boas_vindas": 150,
+    "saudacao": 80,
+    "pergunta": 80,
+    "resumo": 150,
+    "despedida": 60,
+    "conversa": 200
+}
+
+ERRO_LLM_MSG = "🤖 Ops, estou com dificuldades técnicas, mas vamos continuar!"
+
+# Perguntas usadas quando o pool não está disponível
+PERGUNTAS_PADRAO = {
+    'duracao_meses': "⏱️ Quantos meses o projeto vai durar? Esta informação é crucial para planejar marcos e avaliar o cronograma.",
+    'orcamento': "💰 Qual o orçamento total do projeto em R$? O orçamento nos ajuda a avaliar a viabilidade e gerenciar recursos.",
+    'tamanho_equipe': "👥 Quantas pessoas vão trabalhar no projeto? O tamanho da equipe impacta diretamente na capacidade de entrega.",
+    'experiencia_gerente': "🎓 Quantos anos de experiência tem o gerente? A experiência é fundamental para a liderança e tomada de decisões.",
+    'recursos_disponiveis': "🛠️ Como você avalia os recursos disponíveis? Isso inclui pessoal, tecnologia e ferramentas necessárias.",
+    'complexidade': "🎯 Qual a complexidade técnica do projeto? Complexidade maior pode exigir mais tempo e especialização.",
+    'tipo_projeto': "🏗️ Qual o tipo de projeto? Diferentes tipos têm características e desafios específicos."
+}
+
+WELCOME_MSG = """
+        Seja bem-vindo! Sou o ProjectAI, seu assistente inteligente.
+        
+        Vou ajudar você a prever o sucesso do seu próximo projeto usando:
+        • Machine Learning treinado com 1000 projetos
+        • Análise de IA contextual
+        • Recomendações personalizadas
+        
+        Primeiro, preciso te conhecer melhor! 😊
+        """
+GOODBYE_MSG = "O usuário está encerrando a sessão. Faça uma despedida amigável e profissional, em até 2 frases."
+SUMMARY_PROMPT = "Faça um resumo amigável e conciso (até 3 frases) dos dados do projeto que coletamos. Seja positivo e mencione se algo chama atenção. NÃO use cumprimentos repetitivos."
+REWRITE_QUESTION_PROMPT = "Reescreva esta pergunta com outras palavras, mantendo o emoji inicial e a breve explicação de por que a informação importa. Responda só com a pergunta: {pergunta}"
+
+
+def carregar_textos(caminho):
+    """Pool de textos fixos ({} se desligado ou ausente)"""
+    if not caminho or not os.path.exists(caminho):
+        return {}
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class AnaliseEmSegundoPlano:
+    """Stream SSE de /analyze-with-llm/stream lido em uma thread.
+
+    Os eventos ficam numa fila até serem exibidos, então a análise pode
+    começar antes da confirmação do usuário. cancelar() fecha a conexão e a
+    API interrompe a chamada ao LLM.
+    """
+    FIM = object()
+
+    def __init__(self, chatbot):
+        self.fila = queue.Queue()
+        self.erro = None
+        self._response = None
+        self._cancelada = threading.Event()
+        chatbot.executor.submit(self._consumir, chatbot)
+
+    def _consumir(self, chatbot):
+        try:
+            # Endpoint híbrido em streaming: predição ML primeiro, depois os tokens do LLM
+            response = chatbot.session.post(
+                f"{chatbot.api_url}/analyze-with-llm/stream",
+                json=dict(chatbot.project_data, usuario_id=chatbot.current_user['usuario_id']),
+                stream=True,
+                timeout=(5, 30)
+            )
+            self._response = response
+            if self._cancelada.is_set():
+                response.close()
+            elif response.status_code != 200:
+                self.erro = f"❌ Erro na API: {response.status_code}"
+                response.close()
+            else:
+                response.encoding = "utf-8"
+                for evento in chatbot.iter_sse_events(response):
+                    self.fila.put(evento)
+        except requests.exceptions.ConnectionError:
+            if not self._cancelada.is_set():
+                self.erro = "❌ Erro: API não está rodando!\n💡 Execute: cd api && python app.py"
+        except Exception as e:
+            if not self._cancelada.is_set():
+                self.erro = f"❌ Conexão com a API interrompida: {e}"
+        finally:
+            self.fila.put(self.FIM)
+
+    def eventos(self):
+        """Eventos (evento, dados) na ordem em que chegaram; None se a análise falhou antes do primeiro"""
+        primeiro = self.fila.get()
+        if primeiro is self.FIM:
+            if self.erro:
+                print(self.erro)
+            return None
+
+        def restantes():
+            item = primeiro
+            while item is not self.FIM:
+                yield item
+                item = self.fila.get()
+            if self.erro:
+                print(f"\n{self.erro}")
+        return restantes()
+
+    def cancelar(self):
+        self._cancelada.set()
+        if self._response is not None:
+            self._response.close()
+
 
 class LLMProjectChatbot:
-    def __init__(self, api_url="http://localhost:8000"):
+    def __init__(self, api_url="http://localhost:8000", prefetch=CHATBOT_PREFETCH, textos=CHATBOT_TEXTOS,
+                 prefetch_analise=CHATBOT_PREFETCH_ANALISE):
         self.api_url = api_url
+        self.textos = carregar_textos(textos)
+        self.usuarios = UserStore(USERS_DATA_PATH)
         self.current_user = None
         self.project_data = {}
         self.questions_asked = 0  # Contador para evitar cumprimentos repetitivos
+        self.prefetch = prefetch
+        self.prefetch_analise = prefetch_analise
         
-    def get_llm_response(self, user_message, context=""):
-        """Usar GPT-4o-mini para respostas inteligentes"""
-        system_prompt = f"""
-        Você é um assistente especialista em gestão de projetos chamado ProjectAI.
-        Seu objetivo é ajudar gestores a avaliar o sucesso de projetos usando dados e IA.
-        
-        Contexto: {context}
+        # Conexões com a API reaproveitadas entre as chamadas (keep-alive)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
-        Seja conversacional, profissional e faça perguntas de forma natural.
-        Quando coletar dados, explique brevemente por que cada informação é importante.
-        Use emojis para tornar a conversa mais amigável.
+        # Chamadas ao LLM e à API em paralelo com a conversa
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self._despedida = None
+        self._analise = None
+    
+    def em_paralelo(self, func, *args):
+        """Executa func em segundo plano e retorna o Future"""
+        return self.executor.submit(func, *args)
+    
+    def aguardar(self, futuro, mensagem="🤖 pensando"):
+        """Resultado de um Future, com indicador de progresso no terminal enquanto espera"""
+        if futuro.done() or not sys.stdout.isatty():
+            return futuro.result()
+        inicio = time.perf_counter()
+        quadros = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+        i = 0
+        while not futuro.done():
+            print(f"\r{quadros[i % len(quadros)]} {mensagem}... {time.perf_counter() - inicio:.1f}s", end="", flush=True)
+            i += 1
+            try:
+                futuro.result(timeout=0.1)
+            except Exception:
+                pass
+        print("\r" + " " * (len(mensagem) + 16) + "\r", end="", flush=True)
+        return futuro.result()
+    
+    def texto_fixo(self, chave, prompt):
+        """Future com um texto do pool (já concluído) ou, sem pool, gerado pelo LLM"""
+        variantes = self.textos.get(chave)
+        if variantes:
+            futuro = Future()
+            futuro.set_result(random.choice(variantes))
+            return futuro
+        return self.em_paralelo(self.get_llm_response, prompt, "", chave)
         
-        IMPORTANTE: Não repita cumprimentos como "Olá" se já foi estabelecido o contexto da conversa.
-        """
+    def get_llm_response(self, user_message, context="", tipo="conversa"):
+        """Usar GPT-4o-mini para respostas inteligentes (saída limitada por tipo de chamada)"""
+        # Pedido antes do contexto: o início da mensagem se repete entre sessões
+        conteudo = f"{user_message}\n\nContexto: {context}" if context else user_message
         
         try:
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": conteudo}
                 ],
-                max_tokens=200,
+                max_tokens=LIMITES_SAIDA[tipo],
                 temperature=0.7
             )
             return response.choices[0].message.content
         except Exception as e:
-            return f"🤖 Ops, estou com dificuldades técnicas, mas vamos continuar!"
+            return ERRO_LLM_MSG
     
-    def intelligent_welcome(self):
-        """Boas-vindas inteligentes com LLM"""
+    def intelligent_welcome(self, boas_vindas=None):
+        """Boas-vindas inteligentes com LLM (boas_vindas: Future já em andamento)"""
         print("🤖 " + "="*60)
         print("🎯 CHATBOT INTELIGENTE DE ANÁLISE DE PROJETOS")
         print("="*60)
         
-        welcome_msg = """
-        Seja bem-vindo! Sou o ProjectAI, seu assistente inteligente.
-        
-        Vou ajudar você a prever o sucesso do seu próximo projeto usando:
-        • Machine Learning treinado com 1000 projetos
-        • Análise de IA contextual
-        • Recomendações personalizadas
-        
-        Primeiro, preciso te conhecer melhor! 😊
-        """
-        
-        response = self.get_llm_response(welcome_msg)
+        if boas_vindas is None:
+            boas_vindas = self.texto_fixo("boas_vindas", WELCOME_MSG)
+        response = self.aguardar(boas_vindas)
         print(f"\n🤖: {response}")
     
     def authenticate_user(self):
         """Autenticação de usuário"""
         try:
-            users_df = pd.read_csv('../ml_model/data/users_data.csv')
+            # Índice carregado uma vez; o login só consulta (sem reler o CSV)
+            usuarios, total = self.usuarios.buscar(por_pagina=USUARIOS_POR_PAGINA)
             
             print("\n👥 Usuários disponíveis:")
-            for _, user in users_df.iterrows():
+            for user in usuarios:
                 print(f"  {user['usuario_id']}. {user['nome']} ({user['cargo']})")
+            if total > len(usuarios):
+                print(f"  ... e mais {total - len(usuarios)}. Digite parte do nome para buscar.")
             
             while True:
-                try:
-                    user_id = int(input("\n🔑 Digite seu ID de usuário: "))
-                    user = users_df[users_df['usuario_id'] == user_id]
+                entrada = input("\n🔑 Digite seu ID de usuário (ou parte do nome): ").strip()
+                if not entrada:
+                    continue
+                if not entrada.isdigit():
+                    usuarios, total = self.usuarios.buscar(entrada, por_pagina=USUARIOS_POR_PAGINA)
+                    if not usuarios:
+                        print("❌ Nenhum usuário com esse nome. Tente novamente.")
+                    for user in usuarios:
+                        print(f"  {user['usuario_id']}. {user['nome']} ({user['cargo']})")
+                    if total > len(usuarios):
+                        print(f"  ... e mais {total - len(usuarios)}. Refine a busca.")
+                    continue
+                
+                user = self.usuarios.get(int(entrada))
+                if user is not None:
+                    self.current_user = user
                     
-                    if not user.empty:
-                        self.current_user = user.iloc[0].to_dict()
-                        
-                        # Cumprimento personalizado
-                        greeting_context = f"Usuário: {self.current_user['nome']}, {self.current_user['cargo']}, {self.current_user['experiencia_anos']} anos de experiência"
-                        greeting_msg = f"O usuário {self.current_user['nome']} acabou de fazer login. Cumprimente-o e comente sobre sua experiência."
-                        
-                        greeting = self.get_llm_response(greeting_msg, greeting_context)
-                        print(f"\n🤖: {greeting}")
-                        return True
-                    else:
-                        print("❌ Usuário não encontrado. Tente novamente.")
-                        
-                except ValueError:
-                    print("❌ Digite um número válido.")
+                    # Cumprimento personalizado
+                    greeting_context = f"Usuário: {self.current_user['nome']}, {self.current_user['cargo']}, {self.current_user['experiencia_anos']} anos de experiência"
+                    greeting_msg = "O usuário acabou de fazer login. Cumprimente-o pelo nome e comente sobre sua experiência, em até 2 frases."
+                    
+                    greeting = self.aguardar(self.em_paralelo(self.get_llm_response, greeting_msg, greeting_context, "saudacao"))
+                    print(f"\n🤖: {greeting}")
+                    return True
+                else:
+                    print("❌ Usuário não encontrado. Tente novamente.")
         except Exception as e:
             print(f"❌ Erro ao carregar usuários: {e}")
             return False
@@ -104,20 +288,12 @@ class LLMProjectChatbot:
     def get_question_for_field(self, field, config):
         """Gerar pergunta específica para cada campo sem cumprimentos repetitivos"""
         
-        # Perguntas pré-definidas para evitar repetição de cumprimentos
-        predefined_questions = {
-            'duracao_meses': "⏱️ Quantos meses o projeto vai durar? Esta informação é crucial para planejar marcos e avaliar o cronograma.",
-            'orcamento': "💰 Qual o orçamento total do projeto em R$? O orçamento nos ajuda a avaliar a viabilidade e gerenciar recursos.",
-            'tamanho_equipe': "👥 Quantas pessoas vão trabalhar no projeto? O tamanho da equipe impacta diretamente na capacidade de entrega.",
-            'experiencia_gerente': "🎓 Quantos anos de experiência tem o gerente? A experiência é fundamental para a liderança e tomada de decisões.",
-            'recursos_disponiveis': "🛠️ Como você avalia os recursos disponíveis? Isso inclui pessoal, tecnologia e ferramentas necessárias.",
-            'complexidade': "🎯 Qual a complexidade técnica do projeto? Complexidade maior pode exigir mais tempo e especialização.",
-            'tipo_projeto': "🏗️ Qual o tipo de projeto? Diferentes tipos têm características e desafios específicos."
-        }
-        
-        # Usar pergunta pré-definida se disponível
-        if field in predefined_questions:
-            return predefined_questions[field]
+        # Perguntas fixas: do pool (variando entre sessões) ou pré-definidas, sem chamar o LLM
+        variantes = self.textos.get('perguntas', {}).get(field)
+        if variantes:
+            return random.choice(variantes)
+        if field in PERGUNTAS_PADRAO:
+            return PERGUNTAS_PADRAO[field]
         
         # Fallback para geração dinâmica (sem cumprimentos se já passaram da primeira pergunta)
         if self.questions_asked > 0:
@@ -127,7 +303,7 @@ class LLMProjectChatbot:
         
         context = f"Coletando {field} para análise de projeto. Usuário: {self.current_user['nome']}. Pergunta número: {self.questions_asked + 1}"
         
-        return self.get_llm_response(question_prompt, context)
+        return self.aguardar(self.em_paralelo(self.get_llm_response, question_prompt, context, "pergunta"))
     
     def collect_project_data(self):
         """Coleta dados do projeto com conversação natural"""
@@ -196,16 +372,20 @@ class LLMProjectChatbot:
         
         return True
     
-    def display_project_summary(self):
-        """Mostrar resumo do projeto"""
+    def iniciar_resumo(self):
+        """Pede ao LLM o resumo do projeto em segundo plano"""
+        summary_context = f"Dados coletados: {self.project_data}. Usuário: {self.current_user['nome']}"
+        return self.em_paralelo(self.get_llm_response, SUMMARY_PROMPT, summary_context, "resumo")
+    
+    def display_project_summary(self, resumo=None):
+        """Mostrar resumo do projeto (resumo: Future já em andamento)"""
         print("\n" + "="*50)
         print("📋 RESUMO DO PROJETO")
         print("="*50)
         
-        summary_context = f"Dados coletados: {self.project_data}. Usuário: {self.current_user['nome']}"
-        summary_prompt = "Faça um resumo amigável e conciso dos dados do projeto que coletamos. Seja positivo e mencione se algo chama atenção. NÃO use cumprimentos repetitivos."
-        
-        summary = self.get_llm_response(summary_prompt, summary_context)
+        if resumo is None:
+            resumo = self.iniciar_resumo()
+        summary = self.aguardar(resumo, "🤖 resumindo o projeto")
         print(f"\n🤖: {summary}")
         
         # Dados técnicos
@@ -218,46 +398,46 @@ class LLMProjectChatbot:
         print(f"   🎓 Exp. Gerente: {self.project_data['experiencia_gerente']} anos")
         print(f"   🏗️  Tipo: {self.project_data['tipo_projeto']}")
     
+    def iniciar_analise(self):
+        """Começa a análise ML + LLM em segundo plano (antes da confirmação do usuário)"""
+        self.cancelar_analise()
+        self._analise = AnaliseEmSegundoPlano(self)
+    
+    def cancelar_analise(self):
+        if self._analise is not None:
+            self._analise.cancelar()
+            self._analise = None
+    
     def get_ai_analysis(self):
-        """Obter análise completa ML + LLM"""
+        """Obter análise completa ML + LLM como stream de eventos (SSE)"""
         print("\n🔮 ANALISANDO COM IA...")
         print("-" * 30)
         
-        # Animação de loading
-        for i in range(3):
-            print("🤖 Processando", "." * (i+1), end="\r")
-            time.sleep(0.8)
-        print("🤖 Análise concluída! ✅    ")
-        
+        analise = self._analise or AnaliseEmSegundoPlano(self)
+        self._analise = None
+        return self.aguardar(self.em_paralelo(analise.eventos), "🔮 aguardando a predição")
+    
+    def iter_sse_events(self, response):
+        """Converte a resposta SSE em tuplas (evento, dados)"""
+        evento, dados = None, []
         try:
-            # Chamar endpoint híbrido
-            response = requests.post(
-                f"{self.api_url}/analyze-with-llm",
-                json=self.project_data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"❌ Erro na API: {response.status_code}")
-                return None
-                
-        except requests.exceptions.ConnectionError:
-            print("❌ Erro: API não está rodando!")
-            print("💡 Execute: cd api && python app.py")
-            return None
-        except Exception as e:
-            print(f"❌ Erro: {e}")
-            return None
+            for linha in response.iter_lines(decode_unicode=True):
+                if linha.startswith("event:"):
+                    evento = linha[len("event:"):].strip()
+                elif linha.startswith("data:"):
+                    dados.append(linha[len("data:"):].strip())
+                elif not linha and evento:
+                    yield evento, json.loads("\n".join(dados))
+                    evento, dados = None, []
+        finally:
+            response.close()
     
-    def display_results(self, analysis):
-        """Exibir resultados da análise"""
+    def display_prediction(self, ml_pred):
+        """Exibir a predição ML assim que ela chega"""
         print("\n" + "="*60)
         print("📊 RESULTADO DA ANÁLISE INTELIGENTE")
         print("="*60)
         
-        ml_pred = analysis['ml_prediction']
         prob = ml_pred['probabilidade_sucesso']
         
         # Status visual
@@ -273,26 +453,50 @@ class LLMProjectChatbot:
         filled = int(prob * bar_length)
         bar = "█" * filled + "░" * (bar_length - filled)
         print(f"📊 [{bar}] {prob:.1%}")
+    
+    def display_results(self, analysis):
+        """Exibir resultados da análise conforme os eventos chegam"""
+        ml_pred = None
+        recebeu_tokens = False
         
-        # Análise LLM
-        print(f"\n🤖 ANÁLISE ESPECIALISTA:")
-        print("=" * 40)
-        print(analysis['llm_analysis'])
-        
-        # Recomendações ML
-        if ml_pred['recomendacoes']:
-            print(f"\n💡 RECOMENDAÇÕES RÁPIDAS:")
-            for i, rec in enumerate(ml_pred['recomendacoes'], 1):
-                print(f"{i}. {rec}")
-        
-        print(f"\n✨ {analysis['combined_insights']}")
+        for evento, dados in analysis:
+            if evento == "prediction":
+                ml_pred = dados
+                self.display_prediction(ml_pred)
+                
+                # Análise LLM (renderizada token a token)
+                print(f"\n🤖 ANÁLISE ESPECIALISTA:")
+                print("=" * 40)
+            elif evento == "token":
+                recebeu_tokens = True
+                print(dados['text'], end="", flush=True)
+            elif evento == "done":
+                if not recebeu_tokens:
+                    print(dados['llm_analysis'])
+                elif dados.get('erro') and dados.get('fonte') != 'local':
+                    print(f"\n⚠️ Análise interrompida: {dados['erro']}")
+                else:
+                    print()
+                
+                # Recomendações ML
+                if ml_pred and ml_pred['recomendacoes']:
+                    print(f"\n💡 RECOMENDAÇÕES RÁPIDAS:")
+                    for i, rec in enumerate(ml_pred['recomendacoes'], 1):
+                        print(f"{i}. {rec}")
+                
+                print(f"\n✨ {dados['combined_insights']}")
     
     def run(self):
         """Executar chatbot inteligente"""
         try:
+            # Textos do LLM que não dependem do usuário, gerados enquanto a API é verificada
+            boas_vindas = self.texto_fixo("boas_vindas", WELCOME_MSG)
+            if self.prefetch:
+                self._despedida = self.texto_fixo("despedida", GOODBYE_MSG)
+            
             # Verificar API
             try:
-                response = requests.get(f"{self.api_url}/health", timeout=5)
+                response = self.session.get(f"{self.api_url}/health", timeout=5)
                 if response.status_code != 200:
                     print("❌ API não está funcionando!")
                     return
@@ -302,7 +506,7 @@ class LLMProjectChatbot:
                 return
             
             # Fluxo principal
-            self.intelligent_welcome()
+            self.intelligent_welcome(boas_vindas)
             
             if not self.authenticate_user():
                 return
@@ -318,11 +522,18 @@ class LLMProjectChatbot:
                 if not self.collect_project_data():
                     break
                 
-                self.display_project_summary()
+                # O resumo começa enquanto o usuário lê; a análise só após o "s", salvo CHATBOT_PREFETCH_ANALISE
+                resumo = self.iniciar_resumo()
+                if self.prefetch_analise:
+                    self.iniciar_analise()
+                
+                self.display_project_summary(resumo)
                 
                 confirm = input(f"\n❓ Analisar este projeto com IA? (s/n): ").lower().strip()
                 
-                if confirm == 's':
+                if confirm != 's':
+                    self.cancelar_analise()
+                else:
                     analysis = self.get_ai_analysis()
                     if analysis:
                         self.display_results(analysis)
@@ -336,15 +547,59 @@ class LLMProjectChatbot:
                 self.project_data = {}
             
             # Despedida inteligente
-            goodbye_msg = "O usuário está encerrando a sessão. Faça uma despedida amigável e profissional."
-            goodbye = self.get_llm_response(goodbye_msg)
+            if self._despedida is None:
+                self._despedida = self.texto_fixo("despedida", GOODBYE_MSG)
+            goodbye = self.aguardar(self._despedida)
             print(f"\n🤖: {goodbye}")
             
         except KeyboardInterrupt:
             print(f"\n\n👋 Até logo!")
         except Exception as e:
             print(f"❌ Erro: {e}")
+        finally:
+            self.cancelar_analise()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.session.close()
+
+def gerar_textos(caminho, variantes=3):
+    """Gera o pool de textos fixos com o LLM (variantes por texto) e salva em JSON"""
+    chatbot = LLMProjectChatbot(textos=None)
+    try:
+        pedidos = {
+            "boas_vindas": [chatbot.em_paralelo(chatbot.get_llm_response, WELCOME_MSG, "", "boas_vindas")
+                            for _ in range(variantes)],
+            "despedida": [chatbot.em_paralelo(chatbot.get_llm_response, GOODBYE_MSG, "", "despedida")
+                          for _ in range(variantes)]
+        }
+        perguntas = {
+            campo: [chatbot.em_paralelo(chatbot.get_llm_response, REWRITE_QUESTION_PROMPT.format(pergunta=pergunta), "", "pergunta")
+                    for _ in range(variantes - 1)]
+            for campo, pergunta in PERGUNTAS_PADRAO.items()
+        }
+        
+        # Respostas de erro do LLM não entram no pool
+        textos = {chave: [t for t in (f.result() for f in futuros) if t != ERRO_LLM_MSG] for chave, futuros in pedidos.items()}
+        textos["perguntas"] = {
+            campo: [PERGUNTAS_PADRAO[campo]] + [t for t in (f.result() for f in futuros) if t != ERRO_LLM_MSG]
+            for campo, futuros in perguntas.items()
+        }
+    finally:
+        chatbot.executor.shutdown(wait=False, cancel_futures=True)
+        chatbot.session.close()
+    
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(textos, f, ensure_ascii=False, indent=2)
+    print(f"✅ Pool salvo em {caminho}: {len(textos['boas_vindas'])} boas-vindas, "
+          f"{len(textos['despedida'])} despedidas, {sum(map(len, textos['perguntas'].values()))} perguntas")
 
 if __name__ == "__main__":
-    chatbot = LLMProjectChatbot()
-    chatbot.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Chatbot de análise de projetos")
+    parser.add_argument("--gerar-textos", action="store_true", help="Gera o pool de textos fixos com o LLM e sai")
+    parser.add_argument("--variantes", type=int, default=3, help="Variantes por texto no pool")
+    args = parser.parse_args()
+    
+    if args.gerar_textos:
+        gerar_textos(CHATBOT_TEXTOS or "textos_estaticos.json", args.variantes)
+    else:
+        chatbot = LLMProjectChatbot()
+        chatbot.run()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Versão do formato colunar; incrementar quando a estrutura mudar
+COLUMNAR_FORMAT_VERSION = 1
+SCHEMA_FILENAME = 'schema.json'
+
+
+def is_columnar(path):
+    """Verdadeiro se path é um diretório de dataset colunar"""
+    return os.path.isfile(os.path.join(path, SCHEMA_FILENAME))
+
+
+def _codificar_coluna(serie, coluna, dtype, categorias=None):
+    """Converte uma coluna do DataFrame para o dtype compacto do schema"""
+    if categorias is not None:
+        valores = pd.Categorical(serie, categories=categorias).codes
+        if (valores < 0).any():
+            desconhecidos = sorted(set(np.asarray(serie)[valores < 0].astype(str)))
+            raise ValueError(f"Categorias desconhecidas em {coluna}: {desconhecidos}")
+    else:
+        valores = serie.to_numpy()
+
+    if len(valores) and np.issubdtype(dtype, np.integer):
+        limites = np.iinfo(dtype)
+        if valores.min() < limites.min or valores.max() > limites.max:
+            raise ValueError(f"Valores de {coluna} fora da faixa de {dtype.name}")
+    convertidos = valores.astype(dtype)
+    # O arquivo guarda exatamente o que veio: frações cortadas ou arredondadas são erro
+    alterados = convertidos != valores
+    if np.issubdtype(dtype, np.floating):
+        alterados &= ~(np.isnan(convertidos) & pd.isna(valores))
+    if np.any(alterados):
+        exemplo = np.asarray(valores)[alterados][0]
+        raise ValueError(f"Valores de {coluna} não cabem exatamente em {dtype.name} (ex.: {exemplo!r})")
+    return convertidos
+
+
+def write_columnar(path, chunks, dtypes, categories=None):
+    """Grava blocos de DataFrame em formato colunar: um binário por coluna + schema.json.
+
+    Colunas em categories viram códigos inteiros na ordem das categorias
+    informadas (a mesma dos encoders ajustados); as demais usam o dtype
+    compacto de dtypes. A escrita é atômica (diretório temporário + rename).
+    """
+    categories = categories or {}
+    dtypes = {coluna: np.dtype(dtype).newbyteorder('<') for coluna, dtype in dtypes.items()}
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    n_rows = 0
+    arquivos = {coluna: open(os.path.join(tmp_path, f"{coluna}.bin"), 'wb') for coluna in dtypes}
+    try:
+        for df in chunks:
+            for coluna, dtype in dtypes.items():
+                valores = _codificar_coluna(df[coluna], coluna, dtype, categories.get(coluna))
+                arquivos[coluna].write(valores.tobytes())
+            n_rows += len(df)
+    finally:
+        for f in arquivos.values():
+            f.close()
+
+    schema = {
+        'format_version': COLUMNAR_FORMAT_VERSION,
+        'n_rows': n_rows,
+        'columns': {
+            coluna: {'dtype': dtype.str, **({'categories': list(categories[coluna])} if coluna in categories else {})}
+            for coluna, dtype in dtypes.items()
+        }
+    }
+    with open(os.path.join(tmp_path, SCHEMA_FILENAME), 'w') as f:
+        json.dump(schema, f, indent=2, ensure_ascii=False)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return n_rows
+
+
+class ColumnarDataset:
+    """Leitura de um dataset gravado por write_columnar.
+
+    Com mmap, cada coluna é um np.memmap somente leitura: nada é
+    interpretado como texto e só as páginas acessadas são lidas do disco.
+    """
+
+    def __init__(self, path, mmap=True):
+        with open(os.path.join(path, SCHEMA_FILENAME), 'r') as f:
+            self.schema = json.load(f)
+        if self.schema.get('format_version') != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(
+                f"Formato colunar não suportado: {self.schema.get('format_version')} "
+                f"(esperado {COLUMNAR_FORMAT_VERSION})"
+            )
+        self.path = path
+        self.n_rows = self.schema['n_rows']
+        self.columns = {}
+        for coluna, info in self.schema['columns'].items():
+            arquivo = os.path.join(path, f"{coluna}.bin")
+            dtype = np.dtype(info['dtype'])
+            if mmap and self.n_rows:
+                self.columns[coluna] = np.memmap(arquivo, dtype=dtype, mode='r', shape=(self.n_rows,))
+            else:
+                self.columns[coluna] = np.fromfile(arquivo, dtype=dtype)
+
+    def __len__(self):
+        return self.n_rows
+
+    def categories(self, coluna):
+        """Categorias de uma coluna dicionarizada, na ordem dos códigos (None se numérica)"""
+        return self.schema['columns'][coluna].get('categories')
+
+    def to_pandas(self, inicio=0, fim=None):
+        """Fatia [inicio, fim) como DataFrame, com as categóricas decodificadas"""
+        dados = {}
+        for coluna, valores in self.columns.items():
+            categorias = self.categories(coluna)
+            fatia = valores[inicio:fim]
+            dados[coluna] = pd.Categorical.from_codes(fatia, categorias) if categorias else np.asarray(fatia)
+        return pd.DataFrame(dados)
+
+    def iter_chunks(self, chunk_size):
+        for inicio in range(0, self.n_rows, chunk_size):
+            yield self.to_pandas(inicio, inicio + chunk_size)
@@ -0,0 +1,254 @@
+import numpy as np
+
+# Linhas avaliadas por bloco em FlatForest.predict_proba (mantém os arrays no cache)
+BLOCO_LINHAS = 512
+# Nós convertidos por chamada a tolist(): uma conversão grande é uma chamada C só, que
+# segura o GIL e travaria o event loop enquanto um modelo novo carrega em outra thread
+BLOCO_LISTA = 4096
+
+
+def _lista(array):
+    """array.tolist() em blocos de BLOCO_LISTA linhas"""
+    return [item for inicio in range(0, len(array), BLOCO_LISTA) for item in array[inicio:inicio + BLOCO_LISTA].tolist()]
+
+
+def _threshold_float32(threshold):
+    """Maior float32 <= threshold.
+
+    As árvores comparam X em float32 contra limiares float64; com o limiar
+    arredondado para baixo, x <= t vale exatamente nas mesmas condições
+    comparando tudo em float32.
+    """
+    t32 = threshold.astype(np.float32)
+    acima = t32.astype(np.float64) > threshold
+    t32[acima] = np.nextafter(t32[acima], np.float32(-np.inf))
+    return t32
+
+
+def flatten_forest(model):
+    """Achata as árvores de um RandomForestClassifier em arrays contíguos.
+
+    Todos os nós ficam em um único vetor global; as folhas apontam para si
+    mesmas, de forma que a avaliação pode andar max_depth passos em todas as
+    árvores ao mesmo tempo. value guarda as probabilidades de cada nó
+    normalizadas como em DecisionTreeClassifier.predict_proba.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    values = []
+    for tree in trees:
+        proba = tree.value[:, 0, :model.n_classes_].copy()
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba /= normalizer
+        values.append(proba)
+    return _flatten_trees(trees, values, model.n_features_in_, model.classes_)
+
+
+def flatten_distilled(student, classes):
+    """Achata um modelo destilado: árvore ou floresta de regressão treinada na
+    probabilidade da classe positiva do professor. O valor de cada nó vira
+    [1 - p, p], então FlatForest.predict_proba funciona sem mudanças."""
+    trees = [estimator.tree_ for estimator in getattr(student, 'estimators_', [student])]
+    values = []
+    for tree in trees:
+        p = np.clip(tree.value[:, 0, 0], 0.0, 1.0)
+        values.append(np.column_stack([1.0 - p, p]))
+    return _flatten_trees(trees, values, student.n_features_in_, classes)
+
+
+def _flatten_trees(trees, values, n_features, classes):
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    feature, threshold, left, right = [], [], [], []
+    for tree, offset in zip(trees, offsets[:-1]):
+        ids = np.arange(tree.node_count)
+        folha = tree.children_left == -1
+
+        feature.append(np.where(folha, 0, tree.feature))
+        threshold.append(np.where(folha, np.inf, tree.threshold))
+        left.append(np.where(folha, ids, tree.children_left) + offset)
+        right.append(np.where(folha, ids, tree.children_right) + offset)
+
+    arrays = {
+        'feature': np.concatenate(feature).astype(np.int8),
+        'threshold': _threshold_float32(np.concatenate(threshold)),
+        'children_left': np.concatenate(left).astype(np.int32),
+        'children_right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(values).astype(np.float64),
+        'roots': offsets[:-1].astype(np.int32),
+        'max_depth': np.int32(max(tree.max_depth for tree in trees)),
+        'n_features': np.int32(n_features),
+        'classes': np.asarray(classes)
+    }
+    arrays.update(_layout_avaliacao(arrays))
+    return arrays
+
+
+def _layout_avaliacao(arrays):
+    """Layout usado na avaliação: cada nó ocupa duas posições (2*nó e 2*nó + 1),
+    e o filho é lido direto em 2*nó + (vai para a direita).
+
+    Vai junto no bundle salvo para que, carregado com mmap, a avaliação use
+    as páginas compartilhadas sem nenhuma cópia.
+    """
+    return {
+        'feature2': np.repeat(arrays['feature'], 2),
+        'threshold2': np.repeat(arrays['threshold'], 2),
+        'children2': 2 * np.stack([arrays['children_left'], arrays['children_right']], axis=1).ravel().astype(np.intp),
+        'roots2': 2 * arrays['roots'].astype(np.intp)
+    }
+
+
+class FlatForest:
+    """Avaliador vetorizado de uma floresta achatada por flatten_forest.
+
+    Percorre todas as árvores em paralelo com NumPy; o resultado é idêntico
+    a model.predict_proba (mesma comparação em float32, mesma ordem de soma
+    das árvores).
+    """
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children_left = arrays['children_left']
+        self.children_right = arrays['children_right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+        self.classes_ = arrays['classes']
+        self.n_estimators = len(self.roots)
+
+        if 'feature2' not in arrays:
+            arrays = dict(arrays, **_layout_avaliacao(arrays))
+        self._feature2 = arrays['feature2']
+        self._threshold2 = arrays['threshold2']
+        self._children2 = arrays['children2']
+        self._roots2 = arrays['roots2']
+        self._listas = None
+        self._contribuicoes = {}
+        self._contribuicoes_listas = {}
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(flatten_forest(model))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self._feature2, self._threshold2, self._children2,
+                                      self.value, self._roots2))
+
+    def apply(self, X):
+        """Índice global da folha alcançada em cada árvore: shape (n_arvores, n_linhas)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        valores = X.ravel()
+        base = np.arange(X.shape[0], dtype=np.intp) * X.shape[1]
+        nos = np.repeat(self._roots2[:, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            direita = valores[base + self._feature2[nos]] <= self._threshold2[nos]
+            np.logical_not(direita, out=direita)  # NaN vai para a direita, como no sklearn
+            nos = self._children2[nos + direita]
+        return nos // 2
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for inicio in range(0, X.shape[0], BLOCO_LINHAS):
+            valores = self.value[self.apply(X[inicio:inicio + BLOCO_LINHAS])]
+            # cumsum ao longo das árvores soma na mesma ordem do sklearn
+            np.cumsum(valores, axis=0, out=valores)
+            proba[inicio:inicio + BLOCO_LINHAS] = valores[-1]
+        proba /= self.n_estimators
+        return proba
+
+    def _listas_python(self):
+        if self._listas is None:
+            self._listas = (
+                _lista(self.feature), _lista(self.threshold.astype(np.float64)),
+                _lista(self.children_left), _lista(self.children_right),
+                _lista(self.value), self.roots.tolist()
+            )
+        return self._listas
+
+    def predict_proba_one(self, linha):
+        """Probabilidades de uma única linha, andando nas árvores em Python puro.
+
+        Para uma linha, a avaliação vetorizada paga o overhead do NumPy a cada
+        nível; com poucas árvores (um modelo destilado, por exemplo) percorrer
+        listas é muito mais barato. linha deve conter floats já convertidos
+        para float32; a soma segue a mesma ordem das árvores de predict_proba.
+        """
+        feature, threshold, left, right, value, roots = self._listas_python()
+        soma = [0.0] * len(self.classes_)
+        for no in roots:
+            while left[no] != no:
+                no = left[no] if linha[feature[no]] <= threshold[no] else right[no]
+            soma = [s + v for s, v in zip(soma, value[no])]
+        return [s / self.n_estimators for s in soma]
+
+    def _tabela_contribuicoes(self, classe):
+        """Valor base e contribuições acumuladas da raiz até cada nó (método de Saabas).
+
+        Ao descer de um nó para o filho, a variação de value[:, classe] é
+        creditada à feature do nó. A linha de cada folha soma essas variações
+        ao longo do caminho, então base + soma da linha = value da folha.
+        Calculada uma vez por classe a partir dos arrays da floresta.
+        """
+        if classe not in self._contribuicoes:
+            v = self.value[:, classe]
+            tabela = np.zeros((len(self.feature), self.n_features), dtype=np.float64)
+            nos = self.roots
+            while len(nos):
+                internos = nos[self.children_left[nos] != nos]
+                filhos = []
+                for lado in (self.children_left[internos], self.children_right[internos]):
+                    tabela[lado] = tabela[internos]
+                    tabela[lado, self.feature[internos]] += v[lado] - v[internos]
+                    filhos.append(lado)
+                nos = np.concatenate(filhos)
+            base = float(v[self.roots].sum() / self.n_estimators)
+            self._contribuicoes[classe] = (base, tabela)
+        return self._contribuicoes[classe]
+
+    def explicar(self, X, classe):
+        """predict_proba com a contribuição de cada feature para a coluna classe.
+
+        Retorna (proba, base, contribuicoes) com contribuicoes de shape
+        (n_linhas, n_features): base + contribuicoes.sum(axis=1) reproduz
+        proba[:, classe]. Usa as mesmas folhas de predict_proba, então a
+        probabilidade é idêntica.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        base, tabela = self._tabela_contribuicoes(classe)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        contribuicoes = np.empty((X.shape[0], self.n_features), dtype=np.float64)
+        for inicio in range(0, X.shape[0], BLOCO_LINHAS):
+            folhas = self.apply(X[inicio:inicio + BLOCO_LINHAS])
+            valores = self.value[folhas]
+            np.cumsum(valores, axis=0, out=valores)
+            proba[inicio:inicio + BLOCO_LINHAS] = valores[-1]
+            contribuicoes[inicio:inicio + BLOCO_LINHAS] = tabela[folhas].sum(axis=0)
+        proba /= self.n_estimators
+        contribuicoes /= self.n_estimators
+        return proba, base, contribuicoes
+
+    def explicar_one(self, linha, classe):
+        """explicar para uma linha em Python puro (como predict_proba_one)"""
+        base, tabela = self._tabela_contribuicoes(classe)
+        if classe not in self._contribuicoes_listas:
+            # Só o caminho de uma linha em Python puro usa a tabela como listas
+            self._contribuicoes_listas[classe] = _lista(tabela)
+        tabela = self._contribuicoes_listas[classe]
+        feature, threshold, left, right, value, roots = self._listas_python()
+        soma = [0.0] * len(self.classes_)
+        contribuicoes = [0.0] * self.n_features
+        for no in roots:
+            while left[no] != no:
+                no = left[no] if linha[feature[no]] <= threshold[no] else right[no]
+            soma = [s + v for s, v in zip(soma, value[no])]
+            contribuicoes = [c + t for c, t in zip(contribuicoes, tabela[no])]
+        n = self.n_estimators
+        return [s / n for s in soma], base, [c / n for c in contribuicoes]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
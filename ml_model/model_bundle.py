@@ -0,0 +1,78 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+
+import joblib
+
+from flat_forest import flatten_distilled, flatten_forest
+
+# Versão do formato do bundle; incrementar quando a estrutura mudar
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_FILENAME = 'model_bundle.joblib'
+
+
+def model_version(forest_arrays):
+    """Identificador do modelo: hash do conteúdo da floresta achatada"""
+    digest = hashlib.sha256()
+    for nome in sorted(forest_arrays):
+        digest.update(nome.encode())
+        digest.update(forest_arrays[nome].tobytes())
+    return digest.hexdigest()[:12]
+
+
+def save_model_bundle(model, encoders, metadata, path, student=None, student_margin=None):
+    """Salva floresta achatada, encoders e metadados em um único arquivo.
+
+    Os arrays da floresta são gravados sem compressão para que
+    load_model_bundle possa mapeá-los em memória; os encoders viram listas
+    de classes, então carregar o bundle não exige importar o sklearn.
+    Com student, o modelo destilado e sua margem de incerteza vão junto.
+    A escrita é atômica (arquivo temporário + rename).
+    """
+    forest = flatten_forest(model)
+    bundle = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': model_version(forest),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'metadata': metadata,
+        'encoders': {campo: encoder.classes_.tolist() for campo, encoder in encoders.items()},
+        'forest': forest,
+        'student': None
+    }
+    if student is not None:
+        bundle['student'] = {
+            'forest': flatten_distilled(student, model.classes_),
+            'margin': float(student_margin)
+        }
+    tmp_path = f"{path}.tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return bundle['model_version']
+
+
+def load_model_bundle(path, mmap=True):
+    """Carrega o bundle; com mmap os arrays da floresta ficam no page cache,
+    compartilhados entre os processos que abrem o mesmo arquivo."""
+    bundle = joblib.load(path, mmap_mode='r' if mmap else None)
+    if bundle.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Formato de bundle não suportado: {bundle.get('format_version')} "
+            f"(esperado {BUNDLE_FORMAT_VERSION})"
+        )
+    return bundle
+
+
+if __name__ == "__main__":
+    # Gera o bundle a partir dos artefatos legados, sem retreinar
+    import json
+
+    model = joblib.load('data/trained_model.pkl')
+    encoders = {
+        'recursos_disponiveis': joblib.load('data/le_recursos.pkl'),
+        'complexidade': joblib.load('data/le_complexidade.pkl'),
+        'tipo_projeto': joblib.load('data/le_tipo.pkl')
+    }
+    with open('data/model_metadata.json', 'r') as f:
+        metadata = json.load(f)
+    versao = save_model_bundle(model, encoders, metadata, f'data/{BUNDLE_FILENAME}')
+    print(f"📦 Bundle salvo em data/{BUNDLE_FILENAME} (versão {versao})")
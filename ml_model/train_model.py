@@ -3,75 +3,107 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import json
 import os
+import argparse
+import resource
+import sys
+import time
 
-def create_project_data():
-    """Cria dataset sintético de projetos"""
-    np.random.seed(42)
-    n_samples = 1000
-    
-    data = {
-        'duracao_meses': np.random.randint(3, 24, n_samples),
-        'orcamento': np.random.randint(100000, 5000000, n_samples),
-        'tamanho_equipe': np.random.randint(3, 25, n_samples),
-        'recursos_disponiveis': np.random.choice(['Baixo', 'Médio', 'Alto'], n_samples),
-        'complexidade': np.random.choice(['Baixa', 'Média', 'Alta'], n_samples),
-        'experiencia_gerente': np.random.randint(1, 20, n_samples),
-        'tipo_projeto': np.random.choice(['TI', 'Construção', 'Marketing', 'P&D'], n_samples)
-    }
+from columnar import ColumnarDataset, is_columnar, write_columnar
+from flat_forest import FlatForest, flatten_distilled
+from model_bundle import BUNDLE_FILENAME, save_model_bundle
+
+# Categorias na ordem sorteada pelo gerador
+RECURSOS = np.array(['Baixo', 'Médio', 'Alto'])
+COMPLEXIDADES = np.array(['Baixa', 'Média', 'Alta'])
+TIPOS_PROJETO = np.array(['TI', 'Construção', 'Marketing', 'P&D'])
+
+# Pontos de cada categoria no score (mesma ordem das listas acima)
+PONTOS_RECURSOS = np.array([-1, 1, 3])
+PONTOS_COMPLEXIDADE = np.array([2, 0, -2])
+
+def _gerar_bloco(rng, n_samples):
+    """Sorteia n_samples projetos e calcula o sucesso de forma vetorizada.
+
+    Os sorteios seguem a mesma ordem da versão original (colunas e depois o
+    ruído), então com a mesma semente o resultado é idêntico.
+    """
+    duracao = rng.randint(3, 24, n_samples)
+    orcamento = rng.randint(100000, 5000000, n_samples)
+    equipe = rng.randint(3, 25, n_samples)
+    recursos = rng.randint(0, len(RECURSOS), n_samples)
+    complexidade = rng.randint(0, len(COMPLEXIDADES), n_samples)
+    experiencia = rng.randint(1, 20, n_samples)
+    tipo = rng.randint(0, len(TIPOS_PROJETO), n_samples)
     
     # Criar variável alvo com lógica
-    sucessos = []
-    for i in range(n_samples):
-        score = 0
-        
-        # Duração ideal
-        if 6 <= data['duracao_meses'][i] <= 15:
-            score += 2
-        elif data['duracao_meses'][i] > 18:
-            score -= 1
-            
-        # Orçamento adequado
-        if data['orcamento'][i] > 500000:
-            score += 1
-            
-        # Tamanho de equipe
-        if 5 <= data['tamanho_equipe'][i] <= 15:
-            score += 2
-        elif data['tamanho_equipe'][i] > 20:
-            score -= 1
-            
-        # Recursos
-        if data['recursos_disponiveis'][i] == 'Alto':
-            score += 3
-        elif data['recursos_disponiveis'][i] == 'Médio':
-            score += 1
-        else:
-            score -= 1
-            
-        # Complexidade
-        if data['complexidade'][i] == 'Baixa':
-            score += 2
-        elif data['complexidade'][i] == 'Alta':
-            score -= 2
-            
-        # Experiência
-        if data['experiencia_gerente'][i] > 10:
-            score += 2
-        elif data['experiencia_gerente'][i] > 5:
-            score += 1
-            
-        # Ruído
-        score += np.random.normal(0, 1)
-        
-        sucessos.append(1 if score > 2 else 0)
+    score = np.zeros(n_samples, dtype=np.int64)
+    
+    # Duração ideal
+    score += np.where((duracao >= 6) & (duracao <= 15), 2, np.where(duracao > 18, -1, 0))
+    
+    # Orçamento adequado
+    score += orcamento > 500000
+    
+    # Tamanho de equipe
+    score += np.where((equipe >= 5) & (equipe <= 15), 2, np.where(equipe > 20, -1, 0))
     
-    data['sucesso'] = sucessos
-    return pd.DataFrame(data)
+    # Recursos e complexidade
+    score += PONTOS_RECURSOS[recursos]
+    score += PONTOS_COMPLEXIDADE[complexidade]
+    
+    # Experiência
+    score += np.where(experiencia > 10, 2, np.where(experiencia > 5, 1, 0))
+    
+    # Ruído
+    sucesso = (score + rng.normal(0, 1, n_samples) > 2).astype(np.int64)
+    
+    return pd.DataFrame({
+        'duracao_meses': duracao,
+        'orcamento': orcamento,
+        'tamanho_equipe': equipe,
+        'recursos_disponiveis': pd.Categorical.from_codes(recursos, RECURSOS),
+        'complexidade': pd.Categorical.from_codes(complexidade, COMPLEXIDADES),
+        'experiencia_gerente': experiencia,
+        'tipo_projeto': pd.Categorical.from_codes(tipo, TIPOS_PROJETO),
+        'sucesso': sucesso
+    })
+
+def create_project_data(n_samples=1000, seed=42):
+    """Cria dataset sintético de projetos"""
+    return _gerar_bloco(np.random.RandomState(seed), n_samples)
+
+def _iter_blocos_gerados(n_samples, chunk_size, seed):
+    """Blocos do dataset sintético tirados de um único gerador"""
+    rng = np.random.RandomState(seed)
+    for inicio in range(0, n_samples, chunk_size):
+        yield _gerar_bloco(rng, min(chunk_size, n_samples - inicio))
+
+def write_project_data(path, n_samples, chunk_size=1_000_000, seed=42):
+    """Gera o dataset em blocos direto para o disco, com memória limitada ao bloco.
+
+    Caminhos terminados em .cols usam o formato colunar; os demais, CSV.
+    Um único gerador percorre todos os blocos: o arquivo depende só de
+    (n_samples, chunk_size, seed), e com chunk_size >= n_samples é igual a
+    create_project_data(n_samples, seed).
+    """
+    blocos = _iter_blocos_gerados(n_samples, chunk_size, seed)
+    if path.endswith(SUFIXO_COLUNAR):
+        return write_columnar(path, blocos, DTYPES_COLUNAR, categorias_encoders())
+    
+    tmp_path = f"{path}.tmp"
+    escritos = 0
+    with open(tmp_path, 'w', newline='') as f:
+        for bloco in blocos:
+            bloco.to_csv(f, index=False, header=escritos == 0)
+            escritos += len(bloco)
+    os.replace(tmp_path, path)
+    return escritos
 
 def create_user_data():
     """Cria dataset de usuários"""
@@ -88,72 +120,426 @@ def create_user_data():
     }
     return pd.DataFrame(users_data)
 
-def train_model():
-    """Função principal de treinamento"""
-    print("🚀 Iniciando treinamento do modelo...")
+# Colunas do CSV de projetos usadas no treino
+CAMPOS_NUMERICOS = ['duracao_meses', 'orcamento', 'tamanho_equipe', 'experiencia_gerente']
+CAMPOS_CATEGORICOS = {
+    'recursos_disponiveis': RECURSOS,
+    'complexidade': COMPLEXIDADES,
+    'tipo_projeto': TIPOS_PROJETO
+}
+# Campo categórico -> feature codificada correspondente
+FEATURES_CODIFICADAS = {
+    'recursos_disponiveis': 'recursos_encoded',
+    'complexidade': 'complexidade_encoded',
+    'tipo_projeto': 'tipo_encoded'
+}
+FEATURES = ['duracao_meses', 'orcamento', 'tamanho_equipe', 'recursos_encoded',
+            'complexidade_encoded', 'experiencia_gerente', 'tipo_encoded']
+CHUNK_LEITURA = 200_000
+
+# Hiperparâmetros padrão da floresta (tuning.py busca alternativas)
+HIPERPARAMETROS = {'n_estimators': 100, 'max_depth': 10}
+
+# Formato colunar: dtypes compactos; as categóricas guardam o código do encoder.
+# O orçamento pode ter centavos: float64 guarda o valor do CSV sem perda
+SUFIXO_COLUNAR = '.cols'
+DTYPES_COLUNAR = {
+    'duracao_meses': 'uint8',
+    'orcamento': 'float64',
+    'tamanho_equipe': 'uint8',
+    'recursos_disponiveis': 'uint8',
+    'complexidade': 'uint8',
+    'experiencia_gerente': 'uint8',
+    'tipo_projeto': 'uint8',
+    'sucesso': 'uint8'
+}
+
+def iter_project_chunks(path, chunk_size=CHUNK_LEITURA):
+    """Lê o dataset de projetos (colunar, CSV ou Parquet) em blocos de DataFrame"""
+    colunas = CAMPOS_NUMERICOS + list(CAMPOS_CATEGORICOS) + ['sucesso']
+    if is_columnar(path):
+        yield from ColumnarDataset(path).iter_chunks(chunk_size)
+    elif path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Leitura de Parquet requer o pacote pyarrow (pip install pyarrow)")
+        for lote in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        tipos = {campo: 'category' for campo in CAMPOS_CATEGORICOS}
+        yield from pd.read_csv(path, usecols=colunas, dtype=tipos, chunksize=chunk_size)
+
+def create_encoders():
+    """LabelEncoders dos campos categóricos, ajustados no domínio conhecido"""
+    return {campo: LabelEncoder().fit(categorias.astype(object)) for campo, categorias in CAMPOS_CATEGORICOS.items()}
+
+def categorias_encoders():
+    """Categorias de cada campo na ordem dos códigos dos encoders"""
+    return {campo: encoder.classes_.tolist() for campo, encoder in create_encoders().items()}
+
+def convert_to_columnar(path, destino, chunk_size=CHUNK_LEITURA):
+    """Converte um dataset CSV/Parquet para o formato colunar, em blocos"""
+    return write_columnar(destino, iter_project_chunks(path, chunk_size), DTYPES_COLUNAR, categorias_encoders())
+
+def encode_projects(df, encoders):
+    """Converte um bloco de projetos em X (float32, ordem de FEATURES) e y (int8)"""
+    X = np.empty((len(df), len(FEATURES)), dtype=np.float32)
+    colunas = {campo: df[campo].to_numpy() for campo in CAMPOS_NUMERICOS}
+    for campo, encoder in encoders.items():
+        codigos = pd.Categorical(df[campo], categories=encoder.classes_).codes
+        if (codigos < 0).any():
+            desconhecidos = sorted(set(df[campo][codigos < 0].astype(str)))
+            raise ValueError(f"Categorias desconhecidas em {campo}: {desconhecidos}")
+        colunas[FEATURES_CODIFICADAS[campo]] = codigos
+    for j, feature in enumerate(FEATURES):
+        X[:, j] = colunas[feature]
+    return X, df['sucesso'].to_numpy(dtype=np.int8)
+
+def _iter_columnar_encoded(path, encoders, chunk_size):
+    """Blocos (X, y) lidos direto das colunas mapeadas em memória, sem passar pelo pandas"""
+    dataset = ColumnarDataset(path)
+    mapas = {}
+    for campo, encoder in encoders.items():
+        # Código do dataset -> código do encoder (identidade quando as categorias coincidem)
+        indices = {classe: i for i, classe in enumerate(encoder.classes_)}
+        desconhecidas = [c for c in dataset.categories(campo) if c not in indices]
+        if desconhecidas:
+            raise ValueError(f"Categorias desconhecidas em {campo}: {desconhecidas}")
+        mapas[FEATURES_CODIFICADAS[campo]] = (
+            dataset.columns[campo], np.array([indices[c] for c in dataset.categories(campo)], dtype=np.float32)
+        )
     
-    # Criar dados
-    df_projects = create_project_data()
-    df_users = create_user_data()
+    for inicio in range(0, len(dataset), chunk_size):
+        fim = min(inicio + chunk_size, len(dataset))
+        X = np.empty((fim - inicio, len(FEATURES)), dtype=np.float32)
+        for j, feature in enumerate(FEATURES):
+            if feature in mapas:
+                codigos, mapa = mapas[feature]
+                X[:, j] = mapa[codigos[inicio:fim]]
+            else:
+                X[:, j] = dataset.columns[feature][inicio:fim]
+        yield X, dataset.columns['sucesso'][inicio:fim].astype(np.int8)
+
+def iter_encoded_chunks(path, encoders, chunk_size=CHUNK_LEITURA):
+    """Blocos (X float32, y int8) do dataset, em qualquer formato suportado"""
+    if is_columnar(path):
+        yield from _iter_columnar_encoded(path, encoders, chunk_size)
+    else:
+        for df in iter_project_chunks(path, chunk_size):
+            yield encode_projects(df, encoders)
+
+def load_training_data(path, encoders, chunk_size=CHUNK_LEITURA):
+    """Lê e codifica o dataset inteiro em blocos; só os arrays compactos ficam em memória"""
+    blocos = list(iter_encoded_chunks(path, encoders, chunk_size))
+    return np.concatenate([X for X, _ in blocos]), np.concatenate([y for _, y in blocos])
+
+def _iter_particao(path, encoders, test_size, chunk_size, seed):
+    """Blocos (X, y, no_teste): cada linha vai para o teste com probabilidade test_size.
+
+    O sorteio depende só da semente e da ordem dos blocos, então toda
+    passada pelo arquivo vê a mesma partição treino/teste.
+    """
+    rng = np.random.RandomState(seed)
+    for X, y in iter_encoded_chunks(path, encoders, chunk_size):
+        yield X, y, rng.random_sample(len(y)) < test_size
+
+def load_test_sample(path, encoders, test_size=0.2, max_test=200_000, chunk_size=CHUNK_LEITURA, seed=42):
+    """Amostra uniforme de até max_test linhas da partição de teste, em uma passada.
+
+    Cada linha de teste recebe uma chave aleatória e ficam as max_test menores
+    (bottom-k): a memória é limitada a max_test linhas mais um bloco.
+    """
+    rng = np.random.RandomState([seed, 0])
+    X_teste = np.empty((0, len(FEATURES)), dtype=np.float32)
+    y_teste = np.empty(0, dtype=np.int8)
+    chaves = np.empty(0)
+    for X, y, no_teste in _iter_particao(path, encoders, test_size, chunk_size, seed):
+        X_teste = np.concatenate([X_teste, X[no_teste]])
+        y_teste = np.concatenate([y_teste, y[no_teste]])
+        chaves = np.concatenate([chaves, rng.random_sample(int(no_teste.sum()))])
+        if len(chaves) > max_test:
+            manter = np.sort(np.argpartition(chaves, max_test)[:max_test])
+            X_teste, y_teste, chaves = X_teste[manter], y_teste[manter], chaves[manter]
+    return X_teste, y_teste
+
+def iter_bootstrap_shards(path, encoders, n_shards, shard_fraction, test_size=0.2,
+                          chunk_size=CHUNK_LEITURA, seed=42):
+    """Shards bootstrap montados um de cada vez, uma passada pelo arquivo por shard.
+
+    As linhas de treino (fora da partição de teste) entram no shard um número
+    Poisson(shard_fraction) de vezes (bootstrap online). Só o shard corrente
+    fica em memória: quem consome deve soltá-lo antes de pedir o próximo.
+    """
+    for i in range(n_shards):
+        rng = np.random.RandomState([seed, i + 1])
+        Xs, ys = [], []
+        for X, y, no_teste in _iter_particao(path, encoders, test_size, chunk_size, seed):
+            X, y = X[~no_teste], y[~no_teste]
+            indices = np.repeat(np.arange(len(y)), rng.poisson(shard_fraction, len(y)))
+            Xs.append(X[indices])
+            ys.append(y[indices])
+        X, y = np.concatenate(Xs), np.concatenate(ys)
+        del Xs, ys
+        yield X, y
+
+def fit_sharded_forest(shards, n_shards, params=None, n_jobs=-1, seed=42):
+    """Treina uma floresta por shard e junta todas as árvores em um único modelo.
+
+    shards pode ser um gerador (iter_bootstrap_shards): cada shard é solto
+    depois do treino. Devolve o modelo e, por shard, linhas, árvores e o
+    pico de memória do processo ao fim do treino.
+    """
+    params = dict(HIPERPARAMETROS, **(params or {}))
+    n_estimators = params.pop('n_estimators')
+    base = n_estimators // n_shards
+    modelo_final = None
+    relatorio = []
+    for i, (X, y) in enumerate(shards):
+        arvores = base + (1 if i < n_estimators % n_shards else 0)
+        modelo = RandomForestClassifier(
+            n_estimators=arvores, random_state=seed + i, n_jobs=n_jobs, **params
+        )
+        modelo.fit(pd.DataFrame(X, columns=FEATURES), y)
+        linhas = len(y)
+        del X, y
+        if modelo_final is None:
+            modelo_final = modelo
+        elif not np.array_equal(modelo.classes_, modelo_final.classes_):
+            raise ValueError(f"Shard {i} não contém todas as classes; aumente shard_fraction")
+        else:
+            modelo_final.estimators_ += modelo.estimators_
+        relatorio.append({'linhas': int(linhas), 'arvores': arvores, 'peak_memory_mb': round(peak_memory_mb(), 1)})
+        print(f"  🌲 Shard {i + 1}/{n_shards}: {linhas} linhas, {arvores} árvores, pico {peak_memory_mb():.0f}MB")
     
-    # Salvar dados
-    df_projects.to_csv('data/projects_data.csv', index=False)
-    df_users.to_csv('data/users_data.csv', index=False)
+    modelo_final.n_estimators = len(modelo_final.estimators_)
+    return modelo_final, relatorio
+
+def _latencia_uma_linha_ms(prever, repeticoes=300):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        prever()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos) * 1000)
+
+def distill_model(teacher, encoders, X_test, y_test, seed=42, n_transfer=200_000,
+                  max_depth=12, min_samples_leaf=5, fidelidade_alvo=0.998):
+    """Destila a floresta em uma única árvore de regressão sobre P(sucesso) do professor.
+
+    O conjunto de transferência é gerado pelo próprio gerador sintético (o
+    professor pode ser consultado em qualquer ponto). A margem de incerteza é
+    a menor |p - 0.5| a partir da qual o aluno concorda com o professor em
+    pelo menos fidelidade_alvo dos casos; abaixo dela a API usa o professor.
+    Retorna (aluno, margem, relatório de fidelidade).
+    """
+    professor = FlatForest.from_model(teacher)
+    indice = int(np.flatnonzero(teacher.classes_ == 1)[0])
+    X, _ = encode_projects(_gerar_bloco(np.random.RandomState(seed + 1), n_transfer), encoders)
+    p_professor = professor.predict_proba(X)[:, indice]
     
-    print(f"📊 Dados criados: {len(df_projects)} projetos")
-    print(f"Distribuição: {df_projects['sucesso'].value_counts().to_dict()}")
+    n_fit = int(len(X) * 0.8)
+    student = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=min_samples_leaf, random_state=seed)
+    student.fit(X[:n_fit], p_professor[:n_fit])
+    aluno = FlatForest(flatten_distilled(student, teacher.classes_))
     
-    # Encoding
-    le_recursos = LabelEncoder()
-    le_complexidade = LabelEncoder()
-    le_tipo = LabelEncoder()
+    # Fidelidade no restante do conjunto de transferência
+    p_aluno = aluno.predict_proba(X[n_fit:])[:, indice]
+    concorda = (p_aluno > 0.5) == (p_professor[n_fit:] > 0.5)
+    confianca = np.abs(p_aluno - 0.5)
+    margem = 0.5
+    for candidata in np.arange(0.0, 0.5, 0.01):
+        confiantes = confianca >= candidata
+        if not confiantes.any() or concorda[confiantes].mean() >= fidelidade_alvo:
+            margem = float(round(candidata, 2))
+            break
+    confiantes = confianca >= margem
+    
+    # Acurácia no teste: professor vs aluno com fallback
+    p_teste_professor = professor.predict_proba(X_test)[:, indice]
+    p_teste_aluno = aluno.predict_proba(X_test)[:, indice]
+    p_teste_servido = np.where(np.abs(p_teste_aluno - 0.5) < margem, p_teste_professor, p_teste_aluno)
     
-    df_projects['recursos_encoded'] = le_recursos.fit_transform(df_projects['recursos_disponiveis'])
-    df_projects['complexidade_encoded'] = le_complexidade.fit_transform(df_projects['complexidade'])
-    df_projects['tipo_encoded'] = le_tipo.fit_transform(df_projects['tipo_projeto'])
+    relatorio = {
+        'student': f'DecisionTreeRegressor(max_depth={max_depth}, min_samples_leaf={min_samples_leaf})',
+        'n_transfer': int(len(X)),
+        'agreement': float(concorda.mean()),
+        'mae': float(np.abs(p_aluno - p_professor[n_fit:]).mean()),
+        'margin': margem,
+        'student_coverage': float(confiantes.mean()),
+        'served_agreement': float(np.mean(np.where(confiantes, concorda, True))),
+        'teacher_accuracy': float(np.mean((p_teste_professor > 0.5) == y_test)),
+        'served_accuracy': float(np.mean((p_teste_servido > 0.5) == y_test)),
+        'student_nodes': int(len(aluno.feature)),
+        'teacher_nodes': int(len(professor.feature)),
+        # Caminho de uma linha usado pela API para cada modelo
+        'student_latency_ms': _latencia_uma_linha_ms(lambda: aluno.predict_proba_one(X_test[0].tolist())),
+        'teacher_latency_ms': _latencia_uma_linha_ms(lambda: professor.predict_proba(X_test[:1]))
+    }
+    return student, margem, relatorio
+
+def peak_memory_mb():
+    """Pico de memória residente do processo (Linux reporta em KB, macOS em bytes)"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+def _gravar_atomico(path, gravar):
+    """Grava em path.tmp e renomeia: a API em execução nunca lê um arquivo pela metade"""
+    tmp_path = f"{path}.tmp"
+    gravar(tmp_path)
+    os.replace(tmp_path, path)
+
+def save_trained_model(model, encoders, metadata, data_dir='data', student=None, student_margin=None):
+    """Salva modelo, encoders, bundle e metadados; devolve a versão do modelo"""
+    for objeto, arquivo in [(model, 'trained_model.pkl'), (encoders['recursos_disponiveis'], 'le_recursos.pkl'),
+                            (encoders['complexidade'], 'le_complexidade.pkl'), (encoders['tipo_projeto'], 'le_tipo.pkl')]:
+        _gravar_atomico(os.path.join(data_dir, arquivo), lambda tmp_path: joblib.dump(objeto, tmp_path))
     
-    # Salvar encoders
-    joblib.dump(le_recursos, 'data/le_recursos.pkl')
-    joblib.dump(le_complexidade, 'data/le_complexidade.pkl')
-    joblib.dump(le_tipo, 'data/le_tipo.pkl')
+    # Bundle único servido pela API: floresta achatada + encoders + metadados
+    metadata['model_version'] = save_model_bundle(
+        model, encoders, metadata, os.path.join(data_dir, BUNDLE_FILENAME), student, student_margin
+    )
     
-    # Features e target
-    features = ['duracao_meses', 'orcamento', 'tamanho_equipe', 'recursos_encoded', 
-               'complexidade_encoded', 'experiencia_gerente', 'tipo_encoded']
-    X = df_projects[features]
-    y = df_projects['sucesso']
+    def gravar_metadata(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+    _gravar_atomico(os.path.join(data_dir, 'model_metadata.json'), gravar_metadata)
+    return metadata['model_version']
+
+def train_model(n_samples=1000, seed=42, data_path=None, chunk_size=CHUNK_LEITURA,
+                n_jobs=-1, shards=0, shard_fraction=0.2, max_test=200_000, params=None, distill=True):
+    """Função principal de treinamento.
+
+    Sem data_path, gera o dataset sintético como antes. Com shards > 0, treina
+    em shards bootstrap do arquivo, um por vez (para datasets maiores que a
+    memória), e avalia em até max_test linhas sorteadas da partição de teste.
+    Com distill, um modelo destilado vai junto no bundle servido pela API.
+    """
+    print("🚀 Iniciando treinamento do modelo...")
+    inicio = time.perf_counter()
     
-    # Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    if data_path is None:
+        # Criar dados
+        df_projects = create_project_data(n_samples, seed)
+        df_users = create_user_data()
+        
+        # Salvar dados
+        df_projects.to_csv('data/projects_data.csv', index=False)
+        df_users.to_csv('data/users_data.csv', index=False)
+        data_path = 'data/projects_data.csv'
+        del df_projects
     
-    # Treinar
-    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
-    model.fit(X_train, y_train)
+    # Encoding
+    encoders = create_encoders()
+    params = dict(HIPERPARAMETROS, **(params or {}))
+    
+    if shards:
+        # Fora da memória: um shard bootstrap por vez, árvores treinadas por shard e unidas
+        X_test, y_test = load_test_sample(data_path, encoders, max_test=max_test, chunk_size=chunk_size, seed=seed)
+        print(f"📊 Dados lidos de {data_path}: {shards} shards, {len(y_test)} projetos de teste")
+        model, relatorio_shards = fit_sharded_forest(
+            iter_bootstrap_shards(data_path, encoders, shards, shard_fraction, chunk_size=chunk_size, seed=seed),
+            shards, params, n_jobs=n_jobs, seed=seed
+        )
+        n_treino = sum(shard['linhas'] for shard in relatorio_shards)
+    else:
+        relatorio_shards = None
+        X, y = load_training_data(data_path, encoders, chunk_size)
+        print(f"📊 Dados lidos de {data_path}: {len(y)} projetos")
+        print(f"Distribuição: {dict(enumerate(np.bincount(y).tolist()))}")
+        
+        # Split
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+        del X, y
+        n_treino = len(y_train)
+        
+        # Treinar (árvores em paralelo em todos os núcleos)
+        model = RandomForestClassifier(random_state=seed, n_jobs=n_jobs, **params)
+        model.fit(pd.DataFrame(X_train, columns=FEATURES), y_train)
+        del X_train, y_train
     
     # Avaliar
-    y_pred = model.predict(X_test)
+    y_pred = model.predict(pd.DataFrame(X_test, columns=FEATURES))
     accuracy = accuracy_score(y_test, y_pred)
+    tempo_treino = time.perf_counter() - inicio
     
     print(f"🎯 Acurácia: {accuracy:.3f}")
+    print(f"⏱️  Tempo total: {tempo_treino:.1f}s | Pico de memória: {peak_memory_mb():.0f}MB")
     print("\n📊 Relatório:")
     print(classification_report(y_test, y_pred))
     
-    # Salvar modelo
-    joblib.dump(model, 'data/trained_model.pkl')
+    # Destilação: aluno compacto servido pela API, com a floresta de fallback
+    student, margem, destilacao = None, None, None
+    if distill:
+        student, margem, destilacao = distill_model(model, encoders, X_test, y_test, seed=seed)
+        print(f"🎓 Destilação: fidelidade {destilacao['agreement']:.4f} (servida {destilacao['served_agreement']:.4f}), "
+              f"aluno responde {destilacao['student_coverage']:.1%} com margem {margem}")
+        print(f"   Acurácia professor {destilacao['teacher_accuracy']:.3f} vs servida {destilacao['served_accuracy']:.3f} | "
+              f"{destilacao['student_nodes']} vs {destilacao['teacher_nodes']} nós | "
+              f"{destilacao['student_latency_ms']:.3f}ms vs {destilacao['teacher_latency_ms']:.3f}ms por linha")
     
     # Metadados
     metadata = {
         'accuracy': accuracy,
-        'features': features,
-        'classes': model.classes_.tolist()
+        'features': FEATURES,
+        'classes': model.classes_.tolist(),
+        'hyperparameters': params,
+        'training': {
+            'data_path': data_path,
+            'mode': 'shards' if shards else 'memoria',
+            'shards': shards,
+            'shard_detalhes': relatorio_shards,
+            'n_train': int(n_treino),
+            'n_test': int(len(y_test)),
+            'n_jobs': n_jobs,
+            'wall_time_s': round(tempo_treino, 3),
+            'peak_memory_mb': round(peak_memory_mb(), 1)
+        },
+        'distillation': destilacao
     }
     
-    with open('data/model_metadata.json', 'w') as f:
-        json.dump(metadata, f, indent=2)
+    # Salvar modelo
+    versao = save_trained_model(model, encoders, metadata, student=student, student_margin=margem)
+    print(f"📦 Bundle do modelo salvo (versão {versao})")
     
     print("✅ Modelo treinado e salvo!")
     return model, accuracy
 
 if __name__ == "__main__":
-    model, accuracy = train_model()
-    print(f"\n🎉 Concluído! Acurácia: {accuracy:.3f}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Treina o modelo de sucesso de projetos")
+    parser.add_argument("--gerar", metavar="CSV",
+                        help="Apenas gera o dataset sintético em blocos neste arquivo, sem treinar")
+    parser.add_argument("--converter", nargs=2, metavar=("ORIGEM", "DESTINO.cols"),
+                        help="Converte um dataset CSV/Parquet para o formato colunar, sem treinar")
+    parser.add_argument("--dados", metavar="CSV|PARQUET|COLS",
+                        help="Treina a partir de um dataset existente em vez de gerar um novo")
+    parser.add_argument("--n-samples", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int,
+                        help="Linhas por bloco na geração (padrão 1M) e na leitura (padrão 200k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Treina em N shards bootstrap (datasets maiores que a memória)")
+    parser.add_argument("--shard-fraction", type=float, default=0.2,
+                        help="Fração esperada das linhas de treino em cada shard")
+    parser.add_argument("--max-teste", type=int, default=200_000,
+                        help="Com --shards, máximo de linhas de teste mantidas em memória")
+    parser.add_argument("--sem-destilacao", action="store_true",
+                        help="Não gera o modelo destilado servido pela API")
+    args = parser.parse_args()
+    
+    if args.gerar:
+        inicio = time.perf_counter()
+        n = write_project_data(args.gerar, args.n_samples, args.chunk_size or 1_000_000, args.seed)
+        print(f"📊 {n} projetos gravados em {args.gerar} ({time.perf_counter() - inicio:.1f}s)")
+    elif args.converter:
+        inicio = time.perf_counter()
+        n = convert_to_columnar(*args.converter, chunk_size=args.chunk_size or CHUNK_LEITURA)
+        print(f"📊 {n} projetos convertidos para {args.converter[1]} ({time.perf_counter() - inicio:.1f}s)")
+    else:
+        model, accuracy = train_model(
+            args.n_samples, args.seed, data_path=args.dados, chunk_size=args.chunk_size or CHUNK_LEITURA,
+            n_jobs=args.n_jobs, shards=args.shards, shard_fraction=args.shard_fraction, max_test=args.max_teste,
+            distill=not args.sem_destilacao
+        )
+        print(f"\n🎉 Concluído! Acurácia: {accuracy:.3f}")
@@ -0,0 +1,245 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from flat_forest import FlatForest
+from train_model import (FEATURES, create_encoders, distill_model, load_training_data,
+                         peak_memory_mb, save_trained_model)
+
+# Espaço de busca dos hiperparâmetros da floresta
+ESPACO_BUSCA = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [4, 6, 8, 10, 14],
+    'min_samples_leaf': [1, 2, 5, 10],
+    'max_features': ['sqrt', 0.5, 1.0]
+}
+
+# Dados de treino/validação de cada processo do pool (preenchidos no initializer)
+_dados = {}
+
+
+def sample_configs(n_configs, seed=42):
+    """Sorteia n_configs combinações distintas do espaço de busca"""
+    nomes = list(ESPACO_BUSCA)
+    todas = list(itertools.product(*ESPACO_BUSCA.values()))
+    rng = np.random.RandomState(seed)
+    escolhidas = rng.choice(len(todas), min(n_configs, len(todas)), replace=False)
+    return [dict(zip(nomes, todas[i])) for i in escolhidas]
+
+
+def measure_latency(forest, X, repeticoes=200):
+    """Latência de inferência no caminho servido (FlatForest): 1 linha e lote de 1000"""
+    linha = np.ascontiguousarray(X[:1], dtype=np.float32)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        forest.predict_proba(linha)
+        tempos.append(time.perf_counter() - inicio)
+
+    lote = np.ascontiguousarray(np.resize(X, (1000, X.shape[1])), dtype=np.float32)
+    tempos_lote = []
+    for _ in range(5):
+        inicio = time.perf_counter()
+        forest.predict_proba(lote)
+        tempos_lote.append(time.perf_counter() - inicio)
+    return {
+        'latency_ms': float(np.median(tempos) * 1000),
+        'batch_1000_ms': float(min(tempos_lote) * 1000)
+    }
+
+
+def _iniciar_worker(X_train, y_train, X_val, y_val):
+    _dados.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+
+def _avaliar(config, n_linhas, seed, devolver_modelo=False):
+    """Treina config nas primeiras n_linhas do treino e mede acurácia, latência e tamanho"""
+    X = pd.DataFrame(_dados['X_train'][:n_linhas], columns=FEATURES)
+    y = _dados['y_train'][:n_linhas]
+
+    inicio = time.perf_counter()
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **config).fit(X, y)
+    tempo_fit = time.perf_counter() - inicio
+
+    forest = FlatForest.from_model(model)
+    resultado = {
+        'config': config,
+        'n_linhas': n_linhas,
+        'accuracy': float(np.mean(forest.predict(_dados['X_val']) == _dados['y_val'])),
+        'fit_s': tempo_fit,
+        'n_nodes': int(len(forest.feature)),
+        'size_bytes': int(forest.nbytes),
+        **measure_latency(forest, _dados['X_val'])
+    }
+    return resultado, (model if devolver_modelo else None)
+
+
+def successive_halving(configs, X_train, y_train, X_val, y_val, eta=3, min_linhas=200,
+                       workers=None, seed=42):
+    """Successive halving com orçamento em linhas de treino, avaliado em um pool de processos.
+
+    A cada rodada só o melhor 1/eta das configurações (por acurácia de
+    validação) segue para a próxima, com eta vezes mais linhas; a última
+    rodada usa todo o treino e devolve também os modelos treinados.
+    """
+    n_rodadas = max(1, int(math.log(len(configs), eta)))
+    orcamentos = [max(min_linhas, len(y_train) // eta ** (n_rodadas - 1 - r)) for r in range(n_rodadas)]
+    orcamentos[-1] = len(y_train)
+
+    historico = []
+    sobreviventes = configs
+    avaliados = []
+    with ProcessPoolExecutor(workers, initializer=_iniciar_worker,
+                             initargs=(X_train, y_train, X_val, y_val)) as pool:
+        for rodada, n_linhas in enumerate(orcamentos):
+            final = rodada == n_rodadas - 1
+            if not final and rodada and n_linhas == orcamentos[rodada - 1]:
+                # Mesmo orçamento da rodada anterior (dataset pequeno): só corta de novo
+                avaliados = [item for item in avaliados if item[0]['config'] in sobreviventes]
+            else:
+                avaliados = list(pool.map(
+                    partial(_avaliar, n_linhas=n_linhas, seed=seed, devolver_modelo=final),
+                    sobreviventes
+                ))
+                for resultado, _ in avaliados:
+                    historico.append(dict(resultado, rodada=rodada))
+            print(f"  🔎 Rodada {rodada + 1}/{n_rodadas}: {len(sobreviventes)} configurações "
+                  f"com {n_linhas} linhas, melhor acurácia {max(r['accuracy'] for r, _ in avaliados):.3f}")
+            if final:
+                return historico, avaliados
+
+            avaliados.sort(key=lambda item: (-item[0]['accuracy'], item[0]['latency_ms']))
+            sobreviventes = [r['config'] for r, _ in avaliados[:max(1, math.ceil(len(avaliados) / eta))]]
+
+
+def select_fastest(finalistas, X_val, min_accuracy):
+    """Modelo mais rápido (1 linha) entre os que atingem min_accuracy; sem nenhum, o mais preciso.
+
+    A latência dos finalistas é medida de novo aqui, em sequência, para não
+    sofrer com a concorrência do pool.
+    """
+    candidatos = []
+    for resultado, model in finalistas:
+        resultado.update(measure_latency(FlatForest.from_model(model), X_val))
+        candidatos.append((resultado, model))
+
+    aprovados = [c for c in candidatos if c[0]['accuracy'] >= min_accuracy]
+    if aprovados:
+        return min(aprovados, key=lambda c: c[0]['latency_ms'])
+    return max(candidatos, key=lambda c: (c[0]['accuracy'], -c[0]['latency_ms']))
+
+
+def served_accuracy(X_test, y_test, data_dir='data'):
+    """Acurácia do modelo servido hoje no mesmo conjunto de teste (None se ainda não há modelo)"""
+    path = os.path.join(data_dir, 'trained_model.pkl')
+    if not os.path.exists(path):
+        return None
+    atual = joblib.load(path)
+    return float(np.mean(atual.predict(pd.DataFrame(X_test, columns=FEATURES)) == y_test))
+
+
+def tune(data_path='data/projects_data.csv', n_configs=27, eta=3, min_accuracy=0.88, min_linhas=200,
+         workers=None, seed=42, salvar=False, tolerancia=0.01, saida='data/tuning_results.json'):
+    """Busca hiperparâmetros e escolhe o modelo mais rápido que atinge min_accuracy.
+
+    Com salvar, o escolhido substitui o artefato servido, mas só se a acurácia
+    de teste dele não ficar mais de tolerancia abaixo da do modelo servido.
+    """
+    print("🔧 Iniciando busca de hiperparâmetros...")
+    inicio = time.perf_counter()
+
+    encoders = create_encoders()
+    X, y = load_training_data(data_path, encoders)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train, test_size=0.25, random_state=seed, stratify=y_train
+    )
+
+    configs = sample_configs(n_configs, seed)
+    print(f"📊 {len(y_train)} projetos de treino, {len(y_val)} de validação, {len(configs)} configurações")
+    historico, finalistas = successive_halving(
+        configs, X_train, y_train, X_val, y_val, eta=eta, min_linhas=min_linhas, workers=workers, seed=seed
+    )
+    escolhido, model = select_fastest(finalistas, X_val, min_accuracy)
+    accuracy = float(np.mean(model.predict(pd.DataFrame(X_test, columns=FEATURES)) == y_test))
+    tempo = time.perf_counter() - inicio
+
+    print(f"\n{'config':<72} {'acc':>6} {'lat(ms)':>8} {'nós':>7}")
+    for resultado, _ in sorted(finalistas, key=lambda c: c[0]['latency_ms']):
+        marca = "👉" if resultado is escolhido else "  "
+        print(f"{marca}{json.dumps(resultado['config']):<70} {resultado['accuracy']:6.3f} "
+              f"{resultado['latency_ms']:8.3f} {resultado['n_nodes']:7d}")
+    print(f"\n🎯 Escolhido: {escolhido['config']} | acurácia de teste {accuracy:.3f} | "
+          f"{escolhido['latency_ms']:.3f}ms por previsão | {tempo:.1f}s de busca")
+
+    resumo = {
+        'data_path': data_path,
+        'min_accuracy': min_accuracy,
+        'eta': eta,
+        'n_configs': len(configs),
+        'wall_time_s': round(tempo, 3),
+        'selected': escolhido,
+        'trials': historico
+    }
+    if saida:
+        with open(saida, 'w') as f:
+            json.dump(resumo, f, indent=2)
+
+    referencia = served_accuracy(X_test, y_test) if salvar else None
+    if referencia is not None and accuracy < referencia - tolerancia:
+        print(f"⛔ Modelo servido mantido: acurácia {accuracy:.3f} abaixo de {referencia:.3f} "
+              f"(atual) menos a tolerância de {tolerancia:g}")
+    elif salvar:
+        student, margem, destilacao = distill_model(model, encoders, X_test, y_test, seed=seed)
+        metadata = {
+            'accuracy': accuracy,
+            'features': FEATURES,
+            'classes': model.classes_.tolist(),
+            'hyperparameters': escolhido['config'],
+            'training': {
+                'data_path': data_path,
+                'mode': 'tuning',
+                'n_train': int(len(y_train)),
+                'n_test': int(len(y_test)),
+                'wall_time_s': round(tempo, 3),
+                'peak_memory_mb': round(peak_memory_mb(), 1),
+                'latency_ms': round(escolhido['latency_ms'], 4),
+                'val_accuracy': escolhido['accuracy']
+            },
+            'distillation': destilacao
+        }
+        versao = save_trained_model(model, encoders, metadata, student=student, student_margin=margem)
+        print(f"📦 Modelo escolhido salvo como artefato servido (versão {versao})")
+    return escolhido, accuracy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros com successive halving")
+    parser.add_argument("--dados", default="data/projects_data.csv", metavar="CSV|PARQUET|COLS")
+    parser.add_argument("--configs", type=int, default=27, help="Configurações sorteadas do espaço de busca")
+    parser.add_argument("--eta", type=int, default=3, help="Fator de corte do successive halving")
+    parser.add_argument("--min-acuracia", type=float, default=0.88,
+                        help="Acurácia de validação mínima para o modelo escolhido")
+    parser.add_argument("--min-linhas", type=int, default=200, help="Linhas de treino na primeira rodada")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", default="data/tuning_results.json", help="JSON com todas as avaliações")
+    parser.add_argument("--salvar", action="store_true",
+                        help="Substitui o modelo servido pelo escolhido (se não perder acurácia além da tolerância)")
+    parser.add_argument("--tolerancia", type=float, default=0.01,
+                        help="Perda máxima de acurácia de teste aceita em relação ao modelo servido")
+    args = parser.parse_args()
+
+    tune(args.dados, args.configs, args.eta, args.min_acuracia, args.min_linhas,
+         args.workers, args.seed, salvar=args.salvar, tolerancia=args.tolerancia, saida=args.saida)
@@ -0,0 +1,201 @@
+import csv
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+
+# Acentos separados da letra pela decomposição NFKD
+_ACENTOS = re.compile("[\u0300-\u036f]")
+
+
+def _normalizar(texto):
+    """Forma de busca dos nomes: sem acentos, em minúsculas e com espaços simples"""
+    return " ".join(_ACENTOS.sub("", unicodedata.normalize("NFKD", str(texto))).casefold().split())
+
+
+def _converter_coluna(valores):
+    """Coluna do CSV como ints, floats ou texto (o primeiro tipo que serve para todos os valores)"""
+    for tipo in (int, float):
+        try:
+            return list(map(tipo, valores))
+        except ValueError:
+            pass
+    return list(valores)
+
+
+class UserStore:
+    """Diretório de usuários (users_data.csv) indexado em memória.
+
+    O arquivo é lido uma vez, no primeiro acesso; depois a busca por
+    usuario_id é uma consulta em dict e a busca por nome usa um índice
+    ordenado de prefixos (a partir do início de cada palavra do nome, sem
+    acentos nem caixa). Mudanças no arquivo são verificadas no máximo a cada
+    intervalo segundos: se a parte já lida não mudou (mesmo hash), só as
+    linhas acrescentadas são lidas e indexadas; qualquer outra alteração
+    reconstrói o índice. Com usuario_id repetido, vale a última linha.
+
+    Leituras não usam lock: uma recarga monta as estruturas novas e as
+    publica de uma vez.
+    """
+
+    def __init__(self, path, intervalo=2.0):
+        self.path = path
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._dados = None
+        self._proxima_verificacao = 0.0
+        self.recargas = 0
+        self.recargas_incrementais = 0
+
+    def _carregar(self):
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            conteudo = f.read()
+        cabecalho, _, corpo = conteudo.partition(b"\n")
+        colunas = next(csv.reader([cabecalho.decode("utf-8-sig")]))
+        dados = {
+            "colunas": colunas,
+            "indice_id": colunas.index("usuario_id"),
+            "indice_nome": colunas.index("nome"),
+            "linhas": [],
+            "por_id": {},
+            "chaves": [],
+            "posicoes": [],
+            "lido": len(cabecalho) + 1,
+            "hash": hashlib.sha1(cabecalho + b"\n"),
+            "stat": stat
+        }
+        self._acrescentar(dados, corpo, completo=True)
+        return dados
+
+    def _acrescentar(self, dados, trecho, completo=False):
+        """Indexa as linhas de trecho, que começa em dados["lido"] no arquivo.
+
+        Sem completo, uma linha final sem quebra pode estar no meio da
+        escrita e fica para a próxima verificação.
+        """
+        fim = len(trecho) if completo else trecho.rfind(b"\n") + 1
+        campos = [linha for linha in csv.reader(io.StringIO(trecho[:fim].decode("utf-8"))) if linha]
+        if campos:
+            # Conversão por coluna: um map(int) no C em vez de um try por campo
+            novas = list(zip(*(_converter_coluna(coluna) for coluna in zip(*campos))))
+            primeira = len(dados["linhas"])
+            dados["linhas"].extend(novas)
+            indice_id, indice_nome = dados["indice_id"], dados["indice_nome"]
+            chaves, posicoes = [], []
+            for posicao, linha in enumerate(novas, primeira):
+                dados["por_id"][linha[indice_id]] = posicao
+                palavras = _normalizar(linha[indice_nome]).split(" ")
+                for i in range(len(palavras)):
+                    chaves.append(" ".join(palavras[i:]))
+                    posicoes.append(posicao)
+            ordem = sorted(range(len(chaves)), key=chaves.__getitem__)
+            # Duas sequências ordenadas: o sort do Python só as intercala
+            chaves = dados["chaves"] + [chaves[i] for i in ordem]
+            posicoes = dados["posicoes"] + [posicoes[i] for i in ordem]
+            ordem = sorted(range(len(chaves)), key=chaves.__getitem__)
+            dados["chaves"] = [chaves[i] for i in ordem]
+            dados["posicoes"] = [posicoes[i] for i in ordem]
+        dados["lido"] += fim
+        dados["hash"].update(trecho[:fim])
+        dados["termina_em_quebra"] = trecho[:fim].endswith(b"\n") or (fim == 0 and dados.get("termina_em_quebra", True))
+
+    def _dados_atuais(self):
+        agora = time.monotonic()
+        if self._dados is None or agora >= self._proxima_verificacao:
+            with self._lock:
+                if self._dados is None:
+                    self._dados = self._carregar()
+                    self.recargas += 1
+                elif agora >= self._proxima_verificacao:
+                    self._verificar_mudancas()
+                self._proxima_verificacao = agora + self.intervalo
+        return self._dados
+
+    def _verificar_mudancas(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return  # mantém o último diretório carregado
+        anterior = self._dados
+        estavel = (stat.st_mtime_ns, stat.st_size, stat.st_ino) == (
+            anterior["stat"].st_mtime_ns, anterior["stat"].st_size, anterior["stat"].st_ino)
+        if estavel and anterior["lido"] == stat.st_size:
+            return
+
+        lido = anterior["lido"]
+        if stat.st_size >= lido:
+            with open(self.path, "rb") as f:
+                # Ler e comparar o hash custa bem menos que interpretar o CSV de novo
+                mesmo_inicio = hashlib.sha1(f.read(lido)).digest() == anterior["hash"].digest()
+                if mesmo_inicio:
+                    trecho = f.read()
+                    # Última linha indexada sem quebra: só segue se a escrita nova começa pela quebra
+                    mesmo_inicio = anterior["termina_em_quebra"] or trecho.startswith(b"\n")
+            if mesmo_inicio:
+                # Indexa sobre uma cópia: leituras em andamento continuam vendo a versão anterior
+                dados = dict(anterior, linhas=list(anterior["linhas"]), por_id=dict(anterior["por_id"]),
+                             hash=anterior["hash"].copy(), stat=stat)
+                # Arquivo parado desde a última verificação: a linha final sem quebra está completa
+                self._acrescentar(dados, trecho, completo=estavel)
+                self._dados = dados
+                self.recargas_incrementais += 1
+                return
+
+        self._dados = self._carregar()
+        self.recargas += 1
+
+    def _como_dict(self, dados, posicao):
+        return dict(zip(dados["colunas"], dados["linhas"][posicao]))
+
+    @staticmethod
+    def _atual(dados, posicao):
+        """Falso para linhas substituídas por outra com o mesmo usuario_id"""
+        return dados["por_id"][dados["linhas"][posicao][dados["indice_id"]]] == posicao
+
+    def get(self, usuario_id):
+        """Usuário pelo id (dict com as colunas do CSV) ou None"""
+        dados = self._dados_atuais()
+        posicao = dados["por_id"].get(usuario_id)
+        return None if posicao is None else self._como_dict(dados, posicao)
+
+    def buscar(self, prefixo="", pagina=1, por_pagina=20):
+        """Usuários com alguma palavra do nome começando por prefixo, em ordem alfabética.
+
+        Retorna (usuários da página, total). Sem prefixo, lista todos na
+        ordem do arquivo.
+        """
+        dados = self._dados_atuais()
+        inicio = (max(pagina, 1) - 1) * por_pagina
+        prefixo = _normalizar(prefixo)
+        if not prefixo:
+            if len(dados["por_id"]) == len(dados["linhas"]):
+                posicoes = range(inicio, min(inicio + por_pagina, len(dados["linhas"])))
+                return [self._como_dict(dados, p) for p in posicoes], len(dados["linhas"])
+            encontrados = [p for p in range(len(dados["linhas"])) if self._atual(dados, p)]
+        else:
+            primeira = bisect_left(dados["chaves"], prefixo)
+            ultima = bisect_left(dados["chaves"], prefixo + "￿", primeira)
+            # O mesmo usuário pode casar em mais de uma palavra do nome; conta uma vez
+            vistos, encontrados = set(), []
+            for posicao in dados["posicoes"][primeira:ultima]:
+                if posicao not in vistos and self._atual(dados, posicao):
+                    vistos.add(posicao)
+                    encontrados.append(posicao)
+        return [self._como_dict(dados, p) for p in encontrados[inicio:inicio + por_pagina]], len(encontrados)
+
+    def __len__(self):
+        return len(self._dados_atuais()["por_id"])
+
+    def stats(self):
+        dados = self._dados_atuais()
+        return {
+            "usuarios": len(dados["por_id"]),
+            "recargas": self.recargas,
+            "recargas_incrementais": self.recargas_incrementais
+        }
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Os módulos da API rodam a partir de api/ e importam o ml_model pelo caminho
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for pasta in ("api", "ml_model"):
+    caminho = os.path.join(RAIZ, pasta)
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+# A API lê os artefatos por caminhos relativos a api/; nos testes, os versionados em ml_model/data
+DADOS = os.path.join(RAIZ, "ml_model", "data")
+os.environ.setdefault("MODEL_DIR", DADOS)
+os.environ.setdefault("USERS_DATA_PATH", os.path.join(DADOS, "users_data.csv"))
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+
+
+@pytest.fixture(scope="session")
+def dados_projetos():
+    """(X, y) codificados de 1500 projetos sintéticos, na ordem de FEATURES"""
+    from train_model import create_encoders, create_project_data, encode_projects
+    return encode_projects(create_project_data(1500, seed=11), create_encoders())
+
+
+@pytest.fixture(scope="session")
+def floresta_sklearn(dados_projetos):
+    from sklearn.ensemble import RandomForestClassifier
+    from train_model import FEATURES
+    X, y = dados_projetos
+    return RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0).fit(pd.DataFrame(X, columns=FEATURES), y)
+
+
+@pytest.fixture(scope="session")
+def aluno_sklearn(dados_projetos, floresta_sklearn):
+    """Árvore de regressão sobre P(sucesso) da floresta, como em distill_model"""
+    from sklearn.tree import DecisionTreeRegressor
+    from train_model import FEATURES
+    X, _ = dados_projetos
+    p = floresta_sklearn.predict_proba(pd.DataFrame(X, columns=FEATURES))[:, 1]
+    return DecisionTreeRegressor(max_depth=5, random_state=0).fit(X, p)
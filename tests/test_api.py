@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from cache import TTLCache
+
+PROJETO = {"duracao_meses": 12, "orcamento": 150000, "tamanho_equipe": 6, "recursos_disponiveis": "Baixo",
+           "complexidade": "Média", "experiencia_gerente": 8, "tipo_projeto": "TI"}
+
+
+@pytest.fixture
+def cliente():
+    with TestClient(app.app) as c:
+        yield c
+
+
+def test_primeira_analise_entra_no_cache_com_a_versao_do_modelo(cliente, monkeypatch):
+    chamadas = []
+
+    async def complete(**kwargs):
+        chamadas.append(kwargs)
+        return "análise do LLM"
+
+    monkeypatch.setattr(app.llm, "complete", complete)
+    monkeypatch.setattr(app, "llm_cache", TTLCache(maxsize=16, ttl=60))
+    # Primeira requisição depois de subir: modelo ainda não carregado
+    monkeypatch.setattr(app.registro, "atual", None)
+
+    for _ in range(2):
+        resposta = cliente.post("/analyze-with-llm", json=PROJETO)
+        assert resposta.status_code == 200
+        assert resposta.json()["llm_analysis"] == "análise do LLM"
+    assert len(chamadas) == 1
+
+
+def test_cadastro_de_usuarios_ausente_nao_vira_500(cliente, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "usuarios", app.UserStore(str(tmp_path / "nao_existe.csv")))
+
+    resposta = cliente.post("/predict", json=dict(PROJETO, usuario_id=1))
+    assert resposta.status_code == 422
+    assert "cadastro de usuários indisponível" in resposta.json()["detail"][0]["msg"]
+
+    assert cliente.post("/predict", json=PROJETO).status_code == 200
+    assert cliente.get("/users/1").status_code == 503
+    assert cliente.get("/users", params={"busca": "ana"}).status_code == 503
+
+
+def test_cadastro_que_some_depois_da_validacao_responde_503(cliente, monkeypatch):
+    class CadastroInstavel:
+        """Encontra o usuário na validação e falha na leitura seguinte"""
+
+        def __init__(self):
+            self.leituras = 0
+
+        def get(self, usuario_id):
+            self.leituras += 1
+            if self.leituras > 1:
+                raise PermissionError("users_data.csv")
+            return {"usuario_id": usuario_id}
+
+    monkeypatch.setattr(app, "usuarios", CadastroInstavel())
+    resposta = cliente.post("/predict", json=dict(PROJETO, usuario_id=1))
+    assert resposta.status_code == 503
+    assert "users_data.csv" in resposta.json()["detail"]
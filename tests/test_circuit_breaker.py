@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitoAberto
+
+
+class RelogioFalso:
+    """Relógio e sleep controlados pelo teste: dormir() só volta quando o teste avança"""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+        self._acordar = None
+
+    def __call__(self):
+        return self.agora
+
+    async def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self._acordar = asyncio.get_running_loop().create_future()
+        await self._acordar
+
+    def avancar(self):
+        self.agora += self.esperas[-1]
+        self._acordar.set_result(None)
+
+
+async def rodar_pendentes():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_fechado_aberto_meio_aberto_fechado():
+    async def cenario():
+        relogio = RelogioFalso()
+        respostas = []
+
+        async def sonda():
+            resposta = asyncio.get_running_loop().create_future()
+            respostas.append(resposta)
+            return await resposta
+
+        breaker = CircuitBreaker(sonda, limite_falhas=3, lento=10.0, espera=15.0, espera_maxima=20.0,
+                                 relogio=relogio, dormir=relogio.dormir)
+
+        # Fechado: sucessos zeram as falhas, resposta lenta conta como falha
+        breaker.verificar()
+        breaker.registrar_falha()
+        breaker.registrar_sucesso(0.5)
+        assert breaker.falhas_seguidas == 0
+        breaker.registrar_falha()
+        breaker.registrar_falha()
+        assert breaker.stats()["estado"] == "fechado"
+
+        # Terceira falha seguida abre; chamadas são recusadas sem tentar
+        breaker.registrar_sucesso(11.0)
+        assert breaker.stats()["estado"] == "aberto"
+        with pytest.raises(CircuitoAberto):
+            breaker.verificar()
+        assert breaker.stats()["recusadas"] == 1
+        await rodar_pendentes()
+        assert relogio.esperas == [15.0]
+        assert respostas == []
+
+        relogio.avancar()
+        await rodar_pendentes()
+        assert breaker.stats()["aberto_ha_s"] == 15.0
+
+        # Meio-aberto: só a sonda passa
+        assert breaker.stats()["estado"] == "meio-aberto"
+        with pytest.raises(CircuitoAberto):
+            breaker.verificar()
+
+        # Sonda falha: volta a aberto e a espera dobra até o teto
+        respostas[0].set_exception(ConnectionError("fora do ar"))
+        await rodar_pendentes()
+        assert breaker.stats()["estado"] == "aberto"
+        assert relogio.esperas == [15.0, 20.0]
+
+        relogio.avancar()
+        await rodar_pendentes()
+        assert breaker.stats()["estado"] == "meio-aberto"
+
+        # Sonda responde: circuito fechado e a tarefa de sondagem termina
+        respostas[1].set_result("ok")
+        await rodar_pendentes()
+        stats = breaker.stats()
+        assert stats["estado"] == "fechado"
+        assert stats["sondas"] == 2
+        assert stats["aberturas"] == 1
+        assert stats["aberto_ha_s"] is None
+        assert breaker.falhas_seguidas == 0
+        assert breaker._tarefa.done()
+        breaker.verificar()
+
+    asyncio.run(cenario())
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import ColumnarDataset, write_columnar
+from train_model import (DTYPES_COLUNAR, convert_to_columnar, create_encoders, create_project_data,
+                         iter_encoded_chunks)
+
+
+@pytest.fixture
+def csv_projetos(tmp_path):
+    df = create_project_data(300, seed=7)
+    # Orçamentos com centavos, como no CSV real
+    df['orcamento'] = df['orcamento'] + np.tile([0.0, 0.75, 0.5, 0.01], 75)
+    df.loc[0, 'orcamento'] = 4898669.75
+    path = tmp_path / "projetos.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_csv_cols_x_identicos(csv_projetos, tmp_path):
+    destino = str(tmp_path / "projetos.cols")
+    assert convert_to_columnar(csv_projetos, destino, chunk_size=128) == 300
+
+    original = pd.read_csv(csv_projetos)
+    relido = ColumnarDataset(destino).to_pandas()
+    assert relido['orcamento'][0] == 4898669.75
+    for coluna in original.columns:
+        assert (relido[coluna].astype(original[coluna].dtype) == original[coluna]).all(), coluna
+
+    encoders = create_encoders()
+    X_csv, y_csv = map(np.concatenate, zip(*iter_encoded_chunks(csv_projetos, encoders, 100)))
+    X_cols, y_cols = map(np.concatenate, zip(*iter_encoded_chunks(destino, encoders, 100)))
+    np.testing.assert_array_equal(X_cols, X_csv)
+    np.testing.assert_array_equal(y_cols, y_csv)
+
+
+def test_valor_que_o_dtype_alteraria_e_recusado(tmp_path):
+    df = create_project_data(10, seed=7)
+    df['duracao_meses'] = df['duracao_meses'] + 0.5
+    with pytest.raises(ValueError, match="duracao_meses"):
+        write_columnar(str(tmp_path / "x.cols"), [df], {'duracao_meses': DTYPES_COLUNAR['duracao_meses']})
+    assert not (tmp_path / "x.cols").exists()
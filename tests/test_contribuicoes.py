@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from flat_forest import FlatForest, flatten_distilled
+from inference import DistilledPredictor, FastPredictor
+from train_model import FEATURES
+
+
+@pytest.fixture
+def florestas(floresta_sklearn, aluno_sklearn):
+    return {
+        "professor": FlatForest.from_model(floresta_sklearn),
+        "aluno": FlatForest(flatten_distilled(aluno_sklearn, floresta_sklearn.classes_)),
+    }
+
+
+@pytest.mark.parametrize("nome", ["professor", "aluno"])
+def test_base_mais_contribuicoes_da_a_probabilidade(florestas, dados_projetos, nome):
+    flat = florestas[nome]
+    X, _ = dados_projetos
+    proba, base, contribuicoes = flat.explicar(X, 1)
+
+    np.testing.assert_array_equal(proba, flat.predict_proba(X))
+    assert contribuicoes.shape == (len(X), len(FEATURES))
+    np.testing.assert_allclose(base + contribuicoes.sum(axis=1), proba[:, 1], rtol=0, atol=1e-12)
+    # A base é a mesma para todo projeto: a média das raízes
+    assert base == pytest.approx(flat.value[flat.roots, 1].mean())
+
+    for i in range(0, len(X), 97):
+        proba_um, base_um, contribuicoes_um = flat.explicar_one(X[i].tolist(), 1)
+        assert proba_um == pytest.approx(proba[i].tolist(), abs=1e-12)
+        assert base_um == pytest.approx(base, abs=1e-12)
+        assert contribuicoes_um == pytest.approx(contribuicoes[i].tolist(), abs=1e-12)
+
+
+def test_explicacao_vem_do_modelo_que_respondeu(florestas, dados_projetos):
+    X, _ = dados_projetos
+    destilado = DistilledPredictor(florestas["aluno"], florestas["professor"], FEATURES, margin=0.2)
+    proba, base, contribuicoes = destilado.explicar(X)
+    incertos = np.abs(florestas["aluno"].predict_proba(X)[:, 1] - 0.5) < 0.2
+    np.testing.assert_allclose(base + contribuicoes.sum(axis=1), proba[:, 1], rtol=0, atol=1e-12)
+
+    _, base_professor, contribuicoes_professor = florestas["professor"].explicar(X[incertos], 1)
+    np.testing.assert_array_equal(base[incertos], base_professor)
+    np.testing.assert_array_equal(contribuicoes[incertos], contribuicoes_professor)
+
+    for preditor in (destilado, FastPredictor(florestas["professor"], FEATURES)):
+        for i in range(0, len(X), 151):
+            p, _, (base_um, contribuicoes_um) = preditor.predict_one(dict(zip(FEATURES, X[i].tolist())), explicar=True)
+            assert base_um + sum(contribuicoes_um) == pytest.approx(p, abs=1e-12)
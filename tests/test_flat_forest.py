@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from flat_forest import FlatForest
+from train_model import FEATURES
+
+
+def linhas_nos_limiares(model, n=400, seed=0):
+    """Linhas com valores exatamente nos limiares (e no float32 seguinte), onde a comparação é mais frágil"""
+    rng = np.random.RandomState(seed)
+    limiares = {i: [] for i in range(len(FEATURES))}
+    for arvore in model.estimators_:
+        for feature, limiar in zip(arvore.tree_.feature, arvore.tree_.threshold):
+            if feature >= 0:
+                limiares[feature].append(limiar)
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    for j in range(len(FEATURES)):
+        escolhidos = np.float32(rng.choice(limiares[j], n))
+        X[:, j] = np.where(rng.rand(n) < 0.5, escolhidos, np.nextafter(escolhidos, np.float32(np.inf)))
+    return X
+
+
+def test_probabilidades_identicas_ao_sklearn(floresta_sklearn, dados_projetos):
+    X, _ = dados_projetos
+    X = np.concatenate([X, linhas_nos_limiares(floresta_sklearn)])
+    flat = FlatForest.from_model(floresta_sklearn)
+    esperado = floresta_sklearn.predict_proba(pd.DataFrame(X, columns=FEATURES))
+
+    np.testing.assert_array_equal(flat.predict_proba(X), esperado)
+    np.testing.assert_array_equal(flat.predict(X), floresta_sklearn.predict(pd.DataFrame(X, columns=FEATURES)))
+    for linha, proba in zip(X[::37], esperado[::37]):
+        np.testing.assert_array_equal(flat.predict_proba_one(linha.tolist()), proba)
+
+
+def test_folhas_iguais_as_do_sklearn(floresta_sklearn, dados_projetos):
+    X, _ = dados_projetos
+    flat = FlatForest.from_model(floresta_sklearn)
+    folhas = flat.apply(X) - flat.roots[:, np.newaxis]
+    for t, arvore in enumerate(floresta_sklearn.estimators_):
+        np.testing.assert_array_equal(folhas[t], arvore.apply(X))
+
+
+def test_nan_vai_para_a_direita_como_no_sklearn(floresta_sklearn, dados_projetos):
+    X = dados_projetos[0][:50].copy()
+    X[::2, FEATURES.index('orcamento')] = np.nan
+    flat = FlatForest.from_model(floresta_sklearn)
+    # Nem toda versão do sklearn aceita NaN na floresta: a referência é a árvore percorrida à mão
+    for t, arvore in enumerate(floresta_sklearn.estimators_):
+        arvore_ = arvore.tree_
+        for i, linha in enumerate(X):
+            no = 0
+            while arvore_.children_left[no] != -1:
+                vai_esquerda = linha[arvore_.feature[no]] <= arvore_.threshold[no]
+                no = arvore_.children_left[no] if vai_esquerda else arvore_.children_right[no]
+            assert flat.apply(linha[np.newaxis])[t, 0] - flat.roots[t] == no
@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pytest
+
+from flat_forest import FlatForest, flatten_distilled
+from inference import DistilledPredictor
+from train_model import FEATURES
+
+
+@pytest.fixture
+def destilado(floresta_sklearn, aluno_sklearn):
+    aluno = FlatForest(flatten_distilled(aluno_sklearn, floresta_sklearn.classes_))
+    return DistilledPredictor(aluno, FlatForest.from_model(floresta_sklearn), FEATURES, margin=0.2)
+
+
+def como_dict(linha):
+    return dict(zip(FEATURES, linha.tolist()))
+
+
+def test_destilado_responde_com_o_aluno_e_recorre_ao_professor(destilado, dados_projetos):
+    X, _ = dados_projetos
+    p_aluno = destilado.student.predict_proba(X)[:, 1]
+    p_professor = destilado.forest.predict_proba(X)[:, 1]
+    incertos = np.abs(p_aluno - 0.5) < 0.2
+    assert 0 < incertos.sum() < len(X)
+
+    proba = destilado.predict_proba(X)
+    np.testing.assert_allclose(proba[:, 1], np.where(incertos, p_professor, p_aluno))
+    assert (destilado.student_hits, destilado.fallbacks) == (len(X) - incertos.sum(), incertos.sum())
+
+    # Uma linha, com e sem explicação, dá o mesmo que o lote
+    for i in np.flatnonzero(incertos)[:5].tolist() + np.flatnonzero(~incertos)[:5].tolist():
+        p, classe = destilado.predict_one(como_dict(X[i]))
+        p_explicado, classe_explicada, _ = destilado.predict_one(como_dict(X[i]), explicar=True)
+        assert p == pytest.approx(proba[i, 1]) == pytest.approx(p_explicado)
+        assert classe == classe_explicada == destilado.classes[np.argmax(proba[i])]
+
+
+def test_contadores_exatos_com_lotes_em_threads(destilado, dados_projetos):
+    X, _ = dados_projetos
+    lote = X[:200]
+    n_incertos = int((np.abs(destilado.student.predict_proba(lote)[:, 1] - 0.5) < 0.2).sum())
+    linhas = [como_dict(x) for x in X[:50]]
+    incertas_uma_linha = sum(abs(destilado.student.predict_proba_one(list(map(float, x)))[1] - 0.5) < 0.2
+                             for x in X[:50])
+    destilado.student_hits = destilado.fallbacks = 0
+
+    def lotes():
+        for _ in range(50):
+            destilado.explicar(lote)
+            destilado.predict_proba(lote)
+
+    threads = [threading.Thread(target=lotes) for _ in range(4)]
+    for t in threads:
+        t.start()
+    # Enquanto isso, o "event loop" prevê uma linha por vez
+    for _ in range(20):
+        for valores in linhas:
+            destilado.predict_one(valores)
+    for t in threads:
+        t.join()
+
+    stats = destilado.stats()
+    assert stats["fallbacks_professor"] == 4 * 100 * n_incertos + 20 * incertas_uma_linha
+    assert stats["respostas_aluno"] + stats["fallbacks_professor"] == 4 * 100 * len(lote) + 20 * len(linhas)
+
@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from flat_forest import FlatForest
+from inference import FastPredictor
+from micro_batcher import MicroBatcher
+from train_model import FEATURES
+
+
+@pytest.fixture
+def preditor(floresta_sklearn):
+    return FastPredictor(FlatForest.from_model(floresta_sklearn), FEATURES)
+
+
+def test_lotes_dao_o_mesmo_resultado_que_uma_linha(preditor, dados_projetos):
+    X, _ = dados_projetos
+    linhas = [dict(zip(FEATURES, x.tolist())) for x in X[:20]]
+    batcher = MicroBatcher(preditor, max_batch_size=8, max_wait=0.01)
+
+    async def cenario():
+        return await asyncio.gather(*(batcher.predict(valores) for valores in linhas))
+
+    resultados = asyncio.run(cenario())
+    proba, base, contribuicoes = preditor.explicar(X[:20])
+    for i, (valores, (p, classe, (b, c))) in enumerate(zip(linhas, resultados)):
+        p_um, classe_um, (b_um, c_um) = preditor.predict_one(valores, explicar=True)
+        assert p == pytest.approx(p_um, abs=1e-12)
+        assert p == pytest.approx(proba[i, 1], abs=1e-12)
+        assert classe == classe_um == preditor.classes[np.argmax(proba[i])]
+        assert b == pytest.approx(b_um, abs=1e-12)
+        assert c == pytest.approx(c_um, abs=1e-12)
+        assert c == pytest.approx(contribuicoes[i].tolist(), abs=1e-12)
+
+    # Dois lotes cheios e o resto pelo prazo
+    stats = batcher.stats()
+    assert (stats["lotes"], stats["linhas"], stats["maior_lote"]) == (3, 20, 8)
+
+
+def test_erro_do_preditor_chega_a_todo_o_lote(preditor):
+    batcher = MicroBatcher(preditor, max_batch_size=4, max_wait=0)
+
+    async def cenario():
+        # Falta uma feature: predict_many falha para o lote inteiro
+        return await asyncio.gather(*(batcher.predict({"duracao_meses": 12}) for _ in range(3)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(r, KeyError) for r in asyncio.run(cenario()))
+
+
+def test_chamada_cancelada_nao_afeta_as_demais(preditor, dados_projetos):
+    X, _ = dados_projetos
+    linhas = [dict(zip(FEATURES, x.tolist())) for x in X[:3]]
+    batcher = MicroBatcher(preditor, max_batch_size=8, max_wait=0.01)
+
+    async def cenario():
+        tarefas = [asyncio.ensure_future(batcher.predict(valores)) for valores in linhas]
+        await asyncio.sleep(0)
+        tarefas[1].cancel()
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+    resultados = asyncio.run(cenario())
+    assert isinstance(resultados[1], asyncio.CancelledError)
+    assert resultados[0] == preditor.predict_one(linhas[0], explicar=True)
+    assert resultados[2] == preditor.predict_one(linhas[2], explicar=True)
@@ -0,0 +1,244 @@
+import asyncio
+import os
+
+from model_registry import ARQUIVOS_LEGADO, ModelRegistry
+
+
+class MemoFalso:
+    def __init__(self):
+        self.dados = {}
+
+    def chave(self, valores):
+        return tuple(sorted(valores.items()))
+
+    def get(self, chave):
+        return self.dados.get(chave)
+
+    def set(self, chave, valor):
+        self.dados[chave] = valor
+
+
+class PreditorFalso:
+    def __init__(self, classe):
+        self.classe = classe
+
+    def predict_one(self, valores, explicar=False):
+        return 0.9, self.classe, {}
+
+
+class ModeloFalso:
+    def __init__(self, version, classe="Sucesso"):
+        self.version = version
+        self.fonte = f"falso/{version}"
+        self.memo = MemoFalso()
+        self.predictor = PreditorFalso(classe)
+
+
+class CarregadorFalso:
+    """carregar() que devolve os modelos da fila (ou lança a exceção da fila)"""
+
+    def __init__(self, *modelos):
+        self.fila = list(modelos)
+        self.chamadas = 0
+        self.durante = None
+
+    def __call__(self):
+        self.chamadas += 1
+        if self.durante is not None:
+            self.durante()
+        modelo = self.fila.pop(0)
+        if isinstance(modelo, Exception):
+            raise modelo
+        return modelo
+
+
+def gravar_artefatos(model_dir, conteudo=b"v1"):
+    for nome in ARQUIVOS_LEGADO:
+        with open(os.path.join(model_dir, nome), "wb") as f:
+            f.write(conteudo)
+
+
+def tocar(model_dir, conteudo):
+    """Regrava um artefato com outro tamanho e mtime"""
+    caminho = os.path.join(model_dir, ARQUIVOS_LEGADO[0])
+    with open(caminho, "wb") as f:
+        f.write(conteudo)
+    st = os.stat(caminho)
+    os.utime(caminho, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def registro(tmp_path, *modelos, **kwargs):
+    gravar_artefatos(tmp_path)
+    carregar = CarregadorFalso(ModeloFalso("v1"), *modelos)
+    reg = ModelRegistry(carregar, str(tmp_path), intervalo=0, **kwargs)
+    assert reg.obter().version == "v1"
+    return reg, carregar
+
+
+def test_troca_depois_que_os_arquivos_param(tmp_path):
+    reg, carregar = registro(tmp_path, ModeloFalso("v2"))
+
+    async def cenario():
+        await reg.verificar()
+        assert carregar.chamadas == 1  # nada mudou
+
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        assert carregar.chamadas == 1  # mudou agora: espera uma volta parada
+        assert reg.obter().version == "v1"
+
+        await reg.verificar()
+        assert carregar.chamadas == 2
+        assert reg.obter().version == "v2"
+
+        await reg.verificar()
+        assert carregar.chamadas == 2
+
+    asyncio.run(cenario())
+    stats = reg.stats()
+    assert stats["trocas"] == 1
+    assert stats["historico"][-1]["anterior"] == "v1"
+    assert stats["historico"][-1]["sombra"] is None
+
+
+def test_arquivo_alterado_durante_a_carga_nao_troca(tmp_path):
+    reg, carregar = registro(tmp_path, ModeloFalso("v2"), ModeloFalso("v3"))
+
+    async def cenario():
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        carregar.durante = lambda: tocar(tmp_path, b"versao 3 maior")
+        await reg.verificar()
+        carregar.durante = None
+        assert carregar.chamadas == 2
+        assert reg.obter().version == "v1"
+
+        # A versão final é carregada depois de ficar parada
+        await reg.verificar()
+        await reg.verificar()
+        assert reg.obter().version == "v3"
+
+    asyncio.run(cenario())
+    assert reg.trocas == 1
+
+
+def test_erro_na_carga_mantem_o_modelo_atual(tmp_path):
+    reg, carregar = registro(tmp_path, ValueError("pickle corrompido"), ModeloFalso("v3"))
+
+    async def cenario():
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        await reg.verificar()
+        assert reg.obter().version == "v1"
+        assert "pickle corrompido" in reg.stats()["erro"]
+
+        # Os mesmos arquivos não são tentados de novo
+        await reg.verificar()
+        await reg.verificar()
+        assert carregar.chamadas == 2
+
+        tocar(tmp_path, b"versao 3 corrigida")
+        await reg.verificar()
+        await reg.verificar()
+        assert reg.obter().version == "v3"
+        assert reg.stats()["erro"] is None
+
+    asyncio.run(cenario())
+
+
+async def sombrear(reg, n):
+    for i in range(n):
+        reg.observar({"orcamento": i}, (0.9, "Sucesso", {}), 0.001)
+        await asyncio.sleep(0)
+
+
+def test_sombra_concordante_promove_o_candidato(tmp_path):
+    reg, _ = registro(tmp_path, ModeloFalso("v2"), fracao_sombra=1.0, amostras_sombra=3)
+
+    async def cenario():
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        await reg.verificar()
+        assert reg.stats()["candidato"] == "v2"
+        assert reg.obter().version == "v1"  # o atual segue respondendo
+
+        await sombrear(reg, 3)
+
+    asyncio.run(cenario())
+    stats = reg.stats()
+    assert stats["versao"] == "v2"
+    assert stats["candidato"] is None
+    sombra = stats["historico"][-1]["sombra"]
+    assert sombra["amostras"] == 3
+    assert sombra["concordancia"] == 1.0
+
+
+def test_sombra_discordante_rejeita_o_candidato(tmp_path):
+    reg, carregar = registro(tmp_path, ModeloFalso("v2", classe="Fracasso"), fracao_sombra=1.0,
+                             amostras_sombra=2, concordancia_minima=0.9)
+
+    async def cenario():
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        await reg.verificar()
+        await sombrear(reg, 2)
+
+        # Rejeitado não é recarregado enquanto os arquivos não mudarem
+        await reg.verificar()
+        await reg.verificar()
+
+    asyncio.run(cenario())
+    stats = reg.stats()
+    assert stats["versao"] == "v1"
+    assert stats["rejeitados"] == 1
+    assert stats["historico"][-1]["trocado"] is False
+    assert stats["historico"][-1]["sombra"]["concordancia"] == 0.0
+    assert carregar.chamadas == 2
+
+
+def test_sombra_vencida_sem_minimo_de_concordancia_troca(tmp_path):
+    reg, _ = registro(tmp_path, ModeloFalso("v2"), fracao_sombra=0.5, sombra_max_s=0)
+
+    async def cenario():
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        await reg.verificar()
+        assert reg.stats()["candidato"] == "v2"
+        await reg.verificar()
+
+    asyncio.run(cenario())
+    assert reg.obter().version == "v2"
+    assert reg.stats()["historico"][-1]["sombra"]["amostras"] == 0
+
+
+def test_sombra_vencida_com_poucas_amostras_rejeita(tmp_path):
+    reg, carregar = registro(tmp_path, ModeloFalso("v2"), ModeloFalso("v3"), fracao_sombra=1.0,
+                             amostras_sombra=10, amostras_minimas=3, concordancia_minima=0.9)
+
+    async def cenario():
+        # Sem nenhuma previsão em sombra até o prazo
+        tocar(tmp_path, b"versao 2")
+        await reg.verificar()
+        await reg.verificar()
+        reg.sombra_max_s = 0
+        await reg.verificar()
+        assert reg.obter().version == "v1"
+        assert reg.stats()["rejeitados"] == 1
+        await reg.verificar()
+        assert carregar.chamadas == 2
+
+        # Concordância total, mas em menos previsões que o mínimo
+        tocar(tmp_path, b"versao 3 nova")
+        reg.sombra_max_s = 300
+        await reg.verificar()
+        await reg.verificar()
+        await sombrear(reg, 2)
+        reg.sombra_max_s = 0
+        await reg.verificar()
+
+    asyncio.run(cenario())
+    stats = reg.stats()
+    assert stats["versao"] == "v1"
+    assert stats["rejeitados"] == 2
+    assert [h["sombra"]["amostras"] for h in stats["historico"]] == [0, 2]
+    assert all(not h["trocado"] and "mínimo 3" in h["motivo"] for h in stats["historico"])
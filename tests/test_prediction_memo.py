@@ -0,0 +1,92 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from flat_forest import FlatForest
+from inference import FastPredictor
+from prediction_memo import PredictionMemo
+from train_model import FEATURES
+
+
+@pytest.fixture
+def preditor(floresta_sklearn):
+    return FastPredictor(FlatForest.from_model(floresta_sklearn), FEATURES)
+
+
+def mesmo_resultado(a, b):
+    p, classe, (base, contribuicoes) = a
+    assert p == pytest.approx(b[0], abs=1e-12)
+    assert classe == b[1]
+    assert base == pytest.approx(b[2][0], abs=1e-12)
+    assert contribuicoes == pytest.approx(b[2][1], abs=1e-12)
+
+
+def vizinho_no_intervalo(memo, valores, rng):
+    """Outro valor de cada feature no mesmo intervalo entre limiares"""
+    novo = {}
+    for nome, limiares in zip(FEATURES, memo.limiares):
+        valor = valores[nome]
+        i = memo.chave(valores)[FEATURES.index(nome)]
+        baixo = limiares[i - 1] if i > 0 else valor - 1000
+        alto = limiares[i] if i < len(limiares) else valor + 1000
+        # (baixo, alto]: acima do limiar anterior e até o próximo
+        novo[nome] = float(np.float32(rng.uniform(np.nextafter(np.float32(baixo), np.float32(np.inf)), alto)))
+    return novo
+
+
+def test_acerto_no_memo_e_exato(preditor, dados_projetos):
+    memo = PredictionMemo(preditor, FEATURES, maxsize=64)
+    rng = np.random.RandomState(1)
+    X, _ = dados_projetos
+    for linha in X[:100]:
+        valores = dict(zip(FEATURES, linha.tolist()))
+        chave = memo.chave(valores)
+        assert memo.get(chave) is None
+        memo.set(chave, preditor.predict_one(valores, explicar=True))
+
+        vizinho = vizinho_no_intervalo(memo, valores, rng)
+        assert memo.chave(vizinho) == chave
+        mesmo_resultado(memo.get(chave), preditor.predict_one(vizinho, explicar=True))
+    assert memo.stats()["hits"] == 100
+
+
+def test_tabela_pre_calculada_igual_ao_preditor(preditor):
+    memo = PredictionMemo(preditor, FEATURES)
+    regiao = {
+        'duracao_meses': [3, 6, 12, 18, 24],
+        'orcamento': [150000, 499999.5, 500000, 2_000_000],
+        'tamanho_equipe': [4, 10, 22],
+        'recursos_encoded': [0, 1, 2],
+        'complexidade_encoded': [0, 1, 2],
+        'experiencia_gerente': [2, 8, 15],
+        'tipo_encoded': [0, 1, 2, 3],
+    }
+    n_linhas = memo.precompute(regiao)
+    assert 0 < n_linhas <= math.prod(map(len, regiao.values()))
+
+    combinacoes = list(itertools.product(*(regiao[nome] for nome in FEATURES)))
+    for combinacao in combinacoes[::7]:
+        valores = dict(zip(FEATURES, combinacao))
+        mesmo_resultado(memo.get(memo.chave(valores)), preditor.predict_one(valores, explicar=True))
+    assert memo.stats()["table_hits"] == len(combinacoes[::7])
+
+    # Fora da região: a tabela não responde e o LRU está vazio
+    j = FEATURES.index('experiencia_gerente')
+    fora = next(dict(zip(FEATURES, combinacoes[0]), experiencia_gerente=e) for e in range(1, 40)
+                if memo.chave(dict(zip(FEATURES, combinacoes[0]), experiencia_gerente=e))[j]
+                not in memo.table["posicoes"][j])
+    assert memo.get(memo.chave(fora)) is None
+    assert memo.stats()["table_hits"] == len(combinacoes[::7])
+
+
+@pytest.mark.filterwarnings("ignore:overflow encountered in cast")
+@pytest.mark.parametrize("valor", [float("nan"), float("inf"), 1e39])
+def test_valores_nao_finitos_nao_passam_pelo_memo(preditor, valor):
+    memo = PredictionMemo(preditor, FEATURES)
+    valores = dict(zip(FEATURES, [12, valor, 6, 0, 1, 8, 0]))
+    assert memo.chave(valores) is None
+    memo.set(None, ("envenenado",))
+    assert memo.get(None) is None
+    assert memo.stats()["size"] == 0
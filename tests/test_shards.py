@@ -0,0 +1,53 @@
+import numpy as np
+
+from train_model import (FEATURES, create_encoders, create_project_data, fit_sharded_forest, iter_bootstrap_shards,
+                         load_test_sample)
+
+ORCAMENTO = FEATURES.index('orcamento')
+
+
+def csv_orcamentos_unicos(tmp_path, n=2000):
+    df = create_project_data(n, seed=3)
+    df['orcamento'] = np.arange(100000, 100000 + n)  # identifica cada linha
+    path = tmp_path / "projetos.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_shards_nao_usam_linhas_de_teste(tmp_path):
+    path = csv_orcamentos_unicos(tmp_path)
+    encoders = create_encoders()
+    X_teste, y_teste = load_test_sample(path, encoders, max_test=10_000, chunk_size=300)
+    teste = set(X_teste[:, ORCAMENTO].tolist())
+    assert 300 < len(teste) < 500  # ~20% de 2000
+
+    shards = list(iter_bootstrap_shards(path, encoders, 3, 0.5, chunk_size=300))
+    for X, y in shards:
+        assert len(X) == len(y)
+        assert teste.isdisjoint(X[:, ORCAMENTO].tolist())
+    # Cada shard tem o próprio sorteio bootstrap
+    assert not np.array_equal(shards[0][0], shards[1][0])
+
+    # Mesma semente, mesmos shards
+    de_novo = next(iter_bootstrap_shards(path, encoders, 3, 0.5, chunk_size=300))
+    np.testing.assert_array_equal(de_novo[0], shards[0][0])
+
+
+def test_amostra_de_teste_limitada(tmp_path):
+    path = csv_orcamentos_unicos(tmp_path)
+    encoders = create_encoders()
+    completo, _ = load_test_sample(path, encoders, max_test=10_000, chunk_size=300)
+    X, y = load_test_sample(path, encoders, max_test=50, chunk_size=300)
+    assert len(X) == len(y) == 50
+    # Subconjunto da partição de teste, na ordem do arquivo
+    assert set(X[:, ORCAMENTO].tolist()) <= set(completo[:, ORCAMENTO].tolist())
+    assert np.all(np.diff(X[:, ORCAMENTO]) > 0)
+
+
+def test_floresta_por_shard_registra_memoria(tmp_path):
+    path = csv_orcamentos_unicos(tmp_path)
+    shards = iter_bootstrap_shards(path, create_encoders(), 2, 0.5, chunk_size=300)
+    model, relatorio = fit_sharded_forest(shards, 2, {'n_estimators': 5, 'max_depth': 3}, n_jobs=1)
+    assert model.n_estimators == 5
+    assert [shard['arvores'] for shard in relatorio] == [3, 2]
+    assert all(shard['linhas'] > 0 and shard['peak_memory_mb'] > 0 for shard in relatorio)
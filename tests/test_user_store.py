@@ -0,0 +1,98 @@
+import pytest
+
+from user_store import UserStore
+
+CABECALHO = "usuario_id,nome,cargo,historico_projetos,experiencia_anos,sucesso_medio\n"
+LINHAS = [
+    "1,João Silva,Gerente de TI,15,5,80\n",
+    "2,Maria Santos,Analista de Projetos,10,3,65\n",
+    "3,Pedro Costa,Coordenador,25,8,90\n",
+]
+
+
+@pytest.fixture
+def csv_usuarios(tmp_path):
+    path = tmp_path / "users_data.csv"
+    path.write_text(CABECALHO + "".join(LINHAS), encoding="utf-8")
+    return path
+
+
+def acrescentar(path, texto):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(texto)
+
+
+def nomes(store, busca):
+    return [u["nome"] for u in store.buscar(busca)[0]]
+
+
+def test_busca_por_id_e_prefixo_de_palavra(csv_usuarios):
+    store = UserStore(str(csv_usuarios), intervalo=0)
+    assert store.get(2) == {"usuario_id": 2, "nome": "Maria Santos", "cargo": "Analista de Projetos",
+                            "historico_projetos": 10, "experiencia_anos": 3, "sucesso_medio": 65}
+    assert store.get(99) is None
+    assert nomes(store, "JOAO") == ["João Silva"]
+    assert nomes(store, "san") == ["Maria Santos"]
+    assert nomes(store, "") == ["João Silva", "Maria Santos", "Pedro Costa"]
+    assert store.buscar("", pagina=2, por_pagina=2) == ([store.get(3)], 3)
+
+
+def test_linhas_acrescentadas_recarregam_so_o_final(csv_usuarios):
+    store = UserStore(str(csv_usuarios), intervalo=0)
+    assert len(store) == 3
+
+    acrescentar(csv_usuarios, "4,Ana Oliveira,Gerente Sênior,30,12,95\n")
+    assert store.get(4)["nome"] == "Ana Oliveira"
+    assert nomes(store, "oliv") == ["Ana Oliveira"]
+    assert store.stats() == {"usuarios": 4, "recargas": 1, "recargas_incrementais": 1}
+
+    # Mesmo id de novo: vale a última linha, e a antiga sai da busca
+    acrescentar(csv_usuarios, "1,João Pereira,Diretor,40,20,88\n")
+    assert store.get(1)["nome"] == "João Pereira"
+    assert nomes(store, "silva") == []
+    assert nomes(store, "joao") == ["João Pereira"]
+    assert store.stats() == {"usuarios": 4, "recargas": 1, "recargas_incrementais": 2}
+
+
+def test_linha_sem_quebra_espera_o_arquivo_parar(csv_usuarios):
+    store = UserStore(str(csv_usuarios), intervalo=0)
+    store.get(1)
+
+    # Escrita em andamento: a linha final pode estar incompleta
+    acrescentar(csv_usuarios, "5,Carla Di")
+    assert store.get(5) is None
+    acrescentar(csv_usuarios, "as,Analista,4,2,70")
+    assert store.get(5) is None
+    # Arquivo parado desde a última verificação: a linha está completa
+    assert store.get(5)["nome"] == "Carla Dias"
+    assert store.stats()["recargas"] == 1
+
+    # A escrita seguinte começa pela quebra que faltava: continua incremental
+    acrescentar(csv_usuarios, "\n6,Rui Lima,Coordenador,8,4,75")
+    store.get(6)
+    assert store.get(6)["nome"] == "Rui Lima"
+    assert store.get(5)["nome"] == "Carla Dias"
+    assert store.stats()["recargas"] == 1
+
+    # Já esta continua a linha que parecia completa: o índice é reconstruído
+    acrescentar(csv_usuarios, "0\n")
+    assert store.get(6)["sucesso_medio"] == 750
+    assert store.stats()["recargas"] == 2
+
+
+def test_outras_mudancas_reconstroem_o_indice(csv_usuarios):
+    store = UserStore(str(csv_usuarios), intervalo=0)
+    store.get(1)
+    csv_usuarios.write_text(CABECALHO + LINHAS[1] + "7,Beatriz Souza,Gerente,12,6,85\n", encoding="utf-8")
+    assert store.get(1) is None
+    assert store.get(7)["nome"] == "Beatriz Souza"
+    assert store.stats() == {"usuarios": 2, "recargas": 2, "recargas_incrementais": 0}
+
+    # Arquivo removido: mantém o último índice
+    csv_usuarios.unlink()
+    assert store.get(7)["nome"] == "Beatriz Souza"
+
+
+def test_arquivo_ausente_na_primeira_leitura(tmp_path):
+    with pytest.raises(OSError):
+        UserStore(str(tmp_path / "nao_existe.csv")).get(1)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from what_if import Eixo, GradeMuitoGrande, avaliar_grade
+
+FEATURES = ["duracao_meses", "orcamento", "tamanho_equipe"]
+
+
+class PreditorDegrau:
+    """P(sucesso) 0.4, +0.4 com orçamento acima de 500 mil e +0.1 com até 10 meses; ignora a equipe"""
+
+    classes = np.array([0, 1])
+    indice_sucesso = 1
+
+    def predict_proba(self, X, contabilizar=True):
+        p = 0.4 + np.where(X[:, 1] > 500_000, 0.4, 0) + np.where(X[:, 0] <= 10, 0.1, 0)
+        return np.column_stack([1 - p, p])
+
+
+def test_variantes_que_nao_mudam_a_previsao_sao_omitidas():
+    # Limiares de aluno e professor unidos: 510k, 520k e 530k caem em intervalos diferentes
+    orcamentos = [150_000, 530_000, 520_000, 510_000]
+    eixos = {
+        "orcamento": Eixo("orcamento", orcamentos, orcamentos, [500_000, 515_000, 525_000]),
+        "duracao_meses": Eixo("duracao_meses", [12, 10], [12, 10], [11]),
+        "tamanho_equipe": Eixo("tamanho_equipe", [6, 8], [6, 8], [7]),
+    }
+    base = {"duracao_meses": 12, "orcamento": 150_000, "tamanho_equipe": 6}
+    resultado = avaliar_grade(PreditorDegrau(), FEATURES, base, eixos)
+    assert resultado["variantes_avaliadas"] == 16
+
+    # Orçamentos vizinhos com a mesma previsão e a equipe (sem efeito) ficam de fora
+    assert [v["alteracoes"] for v in resultado["melhores"]] == [
+        {"duracao_meses": {"de": 12, "para": 10}, "orcamento": {"de": 150_000, "para": 510_000}},
+        {"orcamento": {"de": 150_000, "para": 510_000}},
+        {"duracao_meses": {"de": 12, "para": 10}},
+    ]
+    assert resultado["por_campo"]["orcamento"]["alteracoes"]["orcamento"]["para"] == 510_000
+    assert resultado["por_campo"]["tamanho_equipe"] is None
+
+
+def test_contagens_de_grades_enormes_nao_estouram():
+    # 7 eixos com 600 intervalos distintos: 600**7 passa de 2**63
+    valores = list(range(600))
+    limiares = [v + 0.5 for v in valores]
+    nomes = [f"f{i}" for i in range(7)]
+    eixos = {nome: Eixo(nome, valores, valores, limiares) for nome in nomes}
+    with pytest.raises(GradeMuitoGrande, match=str(600 ** 7)):
+        avaliar_grade(PreditorDegrau(), nomes, dict.fromkeys(nomes, 0), eixos)
+
+    # 7 campos com 10000 valores pedidos cada, todos no mesmo intervalo
+    valores = list(range(10_000))
+    eixos = {nome: Eixo(nome, valores, valores, []) for nome in nomes}
+    resultado = avaliar_grade(PreditorDegrau(), nomes, dict.fromkeys(nomes, 0), eixos)
+    assert resultado["variantes_solicitadas"] == 10_000 ** 7
+    assert resultado["variantes_avaliadas"] == 1